@@ -1,39 +1,55 @@
-import bcrypt
 import jwt
+import time
 from uuid import UUID, uuid4
 from datetime import datetime, timedelta
-from typing import Optional
-from google.auth import jwt as google_jwt
+from typing import Dict, Optional
 from domain.ports.inbound.auth_service_port import AuthServicePort
 from domain.ports.outbound.auth_repository_port import AuthRepositoryPort
 from domain.ports.outbound.token_repository_port import TokenRepositoryPort
 from domain.ports.outbound.user_service_client_port import UserServiceClientPort
+from domain.ports.outbound.id_token_verifier_port import IdTokenVerifierPort
+from domain.ports.outbound.rate_limiter_port import RateLimiterPort
 from domain.models.auth_user import AuthUser
 from domain.models.token import RefreshToken, ResetToken
-from domain.exceptions import AuthenticationError, InvalidInputError
+from domain.exceptions import AuthenticationError, InvalidInputError, RateLimitExceededError, ServiceOverloadedError
 from application.dto.auth_dto import RegisterDTO, LoginDTO, AuthResponseDTO, RefreshTokenDTO, GoogleLoginDTO, TelegramLoginDTO, RequestPasswordResetDTO, ResetPasswordDTO
 from application.utils.logging_utils import log_execution_time, filter_sensitive_data
+from application.utils.cpu_executor import BoundedExecutor
+from application.utils.password_utils import hash_password, verify_password
 from config import settings
 from structlog import get_logger
 
 logger = get_logger(__name__)
 
 class AuthService(AuthServicePort):
-    def __init__(self, auth_repo: AuthRepositoryPort, token_repo: TokenRepositoryPort, user_service_client: UserServiceClientPort):
+    def __init__(self, auth_repo: AuthRepositoryPort, token_repo: TokenRepositoryPort, user_service_client: UserServiceClientPort, password_executor: BoundedExecutor, google_verifier: IdTokenVerifierPort, rate_limiter: Optional[RateLimiterPort] = None):
         self.auth_repo = auth_repo
         self.token_repo = token_repo
         self.user_service_client = user_service_client
+        self.password_executor = password_executor
+        self.google_verifier = google_verifier
+        self.rate_limiter = rate_limiter
         self.secret_key = settings.jwt_secret_key
         self.access_ttl = settings.jwt_access_token_ttl
         self.refresh_ttl = settings.jwt_refresh_token_ttl
-        self.google_client_id = settings.google_client_id
+        self.embed_role_in_refresh_token = settings.refresh_token_embed_role
+        self.role_max_age = settings.user_cache_ttl
         self.logger = logger.bind(service="AuthService")
 
-    def _hash_password(self, password: str) -> str:
-        return bcrypt.hashpw(password.encode(), bcrypt.gensalt()).decode()
+    async def _hash_password(self, password: str) -> str:
+        return await self.password_executor.run(hash_password, password)
 
-    def _verify_password(self, password: str, hashed_password: str) -> bool:
-        return bcrypt.checkpw(password.encode(), hashed_password.encode())
+    async def _verify_password(self, password: str, hashed_password: str) -> bool:
+        return await self.password_executor.run(verify_password, password, hashed_password)
+
+    # Runs before any lookup or bcrypt work: a credential-stuffing burst is rejected for the price
+    # of one Redis call instead of a full password hash per attempt
+    async def _throttle(self, action: str, subjects: Dict[str, str], request_id: str) -> None:
+        if self.rate_limiter is None:
+            return
+        retry_after = await self.rate_limiter.hit(action, subjects, request_id)
+        if retry_after > 0:
+            raise RateLimitExceededError(f"Too many {action} attempts, retry in {retry_after:.1f}s")
 
     def _generate_access_token(self, user_id: UUID, role: str) -> str:
         payload = {
@@ -43,16 +59,30 @@ class AuthService(AuthServicePort):
         }
         return jwt.encode(payload, self.secret_key, algorithm="HS256")
 
-    def _generate_refresh_token(self, user_id: UUID) -> str:
+    def _generate_refresh_token(self, user_id: Optional[UUID] = None) -> str:
         return str(uuid4())
 
+    def _refresh_token_record(self, token: str, user_id: UUID, role: str) -> RefreshToken:
+        if not self.embed_role_in_refresh_token:
+            return RefreshToken(token=token, user_id=user_id)
+        return RefreshToken(token=token, user_id=user_id, role=role, role_issued_at=time.time())
+
+    def _embedded_role(self, token: RefreshToken) -> Optional[str]:
+        # Rotation copies the role forward; once it is older than the profile cache TTL it is
+        # re-read, so a role change reaches refreshed tokens as fast as it reaches logins
+        if not self.embed_role_in_refresh_token or token.role is None or token.role_issued_at is None:
+            return None
+        if time.time() - token.role_issued_at >= self.role_max_age:
+            return None
+        return token.role
+
     @log_execution_time
-    async def register(self, register_dto: RegisterDTO, request_id: str) -> AuthResponseDTO:
+    async def register(self, register_dto: RegisterDTO, request_id: str, client_address: str = "") -> AuthResponseDTO:
         logger = self.logger.bind(request_id=request_id)
         try:
             logger.info("Registering user", input_data=filter_sensitive_data(register_dto.dict()))
-            existing_user = await self.auth_repo.get_by_email(register_dto.email, request_id)
-            if existing_user:
+            await self._throttle("register", {"email": register_dto.email.lower(), "peer": client_address}, request_id)
+            if await self.auth_repo.get_id_by_email(register_dto.email, request_id):
                 logger.error("Email already exists", email=register_dto.email)
                 raise InvalidInputError(f"Email {register_dto.email} already exists")
             user_id = uuid4()
@@ -60,7 +90,7 @@ class AuthService(AuthServicePort):
             auth_user = AuthUser(
                 user_id=user_id,
                 email=register_dto.email,
-                hashed_password=self._hash_password(register_dto.password),
+                hashed_password=await self._hash_password(register_dto.password),
                 login_methods=["email"],
                 created_at=datetime.utcnow()
             )
@@ -68,7 +98,7 @@ class AuthService(AuthServicePort):
             await self.user_service_client.create_user(user_id, register_dto.name, role, request_id)
             refresh_token = self._generate_refresh_token(user_id)
             await self.token_repo.store_refresh_token(
-                RefreshToken(token=refresh_token, user_id=user_id),
+                self._refresh_token_record(refresh_token, user_id, role),
                 request_id
             )
             access_token = self._generate_access_token(user_id, role)
@@ -78,35 +108,48 @@ class AuthService(AuthServicePort):
         except InvalidInputError as e:
             logger.error("Invalid input for registration", error=str(e))
             raise
+        except RateLimitExceededError as e:
+            logger.warning("Registration rejected, too many attempts", error=str(e))
+            raise
+        except ServiceOverloadedError as e:
+            logger.warning("Registration rejected, password hasher overloaded", error=str(e))
+            raise
         except Exception as e:
             logger.error("Unexpected error in registration", error=str(e))
             raise RuntimeError(f"Unexpected error in registration: {str(e)}")
 
     @log_execution_time
-    async def login(self, login_dto: LoginDTO, request_id: str) -> AuthResponseDTO:
+    async def login(self, login_dto: LoginDTO, request_id: str, client_address: str = "") -> AuthResponseDTO:
         logger = self.logger.bind(request_id=request_id)
         try:
             logger.info("Processing login", email=login_dto.email)
-            auth_user = await self.auth_repo.get_by_email(login_dto.email, request_id)
-            if not auth_user or not self._verify_password(login_dto.password, auth_user.hashed_password):
+            await self._throttle("login", {"email": login_dto.email.lower(), "peer": client_address}, request_id)
+            credentials = await self.auth_repo.get_credentials_by_email(login_dto.email, request_id)
+            if not credentials or not credentials.hashed_password or not await self._verify_password(login_dto.password, credentials.hashed_password):
                 logger.error("Invalid credentials", email=login_dto.email)
                 raise AuthenticationError("Invalid email or password")
-            user = await self.user_service_client.get_user_by_id(auth_user.user_id, request_id)
+            user = await self.user_service_client.get_user_by_id(credentials.user_id, request_id)
             if not user:
-                logger.error("User profile not found", user_id=str(auth_user.user_id))
+                logger.error("User profile not found", user_id=str(credentials.user_id))
                 raise AuthenticationError("User profile not found")
-            refresh_token = self._generate_refresh_token(auth_user.user_id)
+            refresh_token = self._generate_refresh_token(credentials.user_id)
             await self.token_repo.store_refresh_token(
-                RefreshToken(token=refresh_token, user_id=auth_user.user_id),
+                self._refresh_token_record(refresh_token, credentials.user_id, user.role),
                 request_id
             )
-            access_token = self._generate_access_token(auth_user.user_id, user.role)
+            access_token = self._generate_access_token(credentials.user_id, user.role)
             response = AuthResponseDTO(access_token=access_token, refresh_token=refresh_token)
-            logger.info("User logged in successfully", user_id=str(auth_user.user_id))
+            logger.info("User logged in successfully", user_id=str(credentials.user_id))
             return response
         except AuthenticationError as e:
             logger.error("Authentication failed", error=str(e))
             raise
+        except RateLimitExceededError as e:
+            logger.warning("Login rejected, too many attempts", error=str(e))
+            raise
+        except ServiceOverloadedError as e:
+            logger.warning("Login rejected, password hasher overloaded", error=str(e))
+            raise
         except Exception as e:
             logger.error("Unexpected error in login", error=str(e))
             raise AuthenticationError(f"Unexpected error in login: {str(e)}")
@@ -116,13 +159,10 @@ class AuthService(AuthServicePort):
         logger = self.logger.bind(request_id=request_id)
         try:
             logger.info("Processing Google login")
-            decoded_token = google_jwt.decode(google_dto.id_token, verify=True, certs_url="https://www.googleapis.com/oauth2/v3/certs")
-            if decoded_token["aud"] != self.google_client_id:
-                logger.error("Invalid Google client ID")
-                raise AuthenticationError("Invalid Google client ID")
+            decoded_token = await self.google_verifier.verify(google_dto.id_token, request_id)
             email = decoded_token["email"]
-            auth_user = await self.auth_repo.get_by_email(email, request_id)
-            if not auth_user:
+            user_id = await self.auth_repo.get_id_by_email(email, request_id)
+            if not user_id:
                 user_id = uuid4()
                 auth_user = AuthUser(
                     user_id=user_id,
@@ -133,18 +173,18 @@ class AuthService(AuthServicePort):
                 )
                 await self.auth_repo.create(auth_user, request_id)
                 await self.user_service_client.create_user(user_id, decoded_token.get("name", "Google User"), "user", request_id)
-            user = await self.user_service_client.get_user_by_id(auth_user.user_id, request_id)
+            user = await self.user_service_client.get_user_by_id(user_id, request_id)
             if not user:
-                logger.error("User profile not found", user_id=str(auth_user.user_id))
+                logger.error("User profile not found", user_id=str(user_id))
                 raise AuthenticationError("User profile not found")
-            refresh_token = self._generate_refresh_token(auth_user.user_id)
+            refresh_token = self._generate_refresh_token(user_id)
             await self.token_repo.store_refresh_token(
-                RefreshToken(token=refresh_token, user_id=auth_user.user_id),
+                self._refresh_token_record(refresh_token, user_id, user.role),
                 request_id
             )
-            access_token = self._generate_access_token(auth_user.user_id, user.role)
+            access_token = self._generate_access_token(user_id, user.role)
             response = AuthResponseDTO(access_token=access_token, refresh_token=refresh_token)
-            logger.info("Google login successful", user_id=str(auth_user.user_id))
+            logger.info("Google login successful", user_id=str(user_id))
             return response
         except Exception as e:
             logger.error("Unexpected error in Google login", error=str(e))
@@ -155,8 +195,8 @@ class AuthService(AuthServicePort):
         logger = self.logger.bind(request_id=request_id)
         try:
             logger.info("Processing Telegram login", telegram_id=telegram_dto.telegram_id)
-            auth_user = await self.auth_repo.get_by_telegram_id(telegram_dto.telegram_id, request_id)
-            if not auth_user:
+            user_id = await self.auth_repo.get_id_by_telegram_id(telegram_dto.telegram_id, request_id)
+            if not user_id:
                 user_id = uuid4()
                 auth_user = AuthUser(
                     user_id=user_id,
@@ -168,18 +208,18 @@ class AuthService(AuthServicePort):
                 )
                 await self.auth_repo.create(auth_user, request_id)
                 await self.user_service_client.create_user(user_id, "Telegram User", "user", request_id)
-            user = await self.user_service_client.get_user_by_id(auth_user.user_id, request_id)
+            user = await self.user_service_client.get_user_by_id(user_id, request_id)
             if not user:
-                logger.error("User profile not found", user_id=str(auth_user.user_id))
+                logger.error("User profile not found", user_id=str(user_id))
                 raise AuthenticationError("User profile not found")
-            refresh_token = self._generate_refresh_token(auth_user.user_id)
+            refresh_token = self._generate_refresh_token(user_id)
             await self.token_repo.store_refresh_token(
-                RefreshToken(token=refresh_token, user_id=auth_user.user_id),
+                self._refresh_token_record(refresh_token, user_id, user.role),
                 request_id
             )
-            access_token = self._generate_access_token(auth_user.user_id, user.role)
+            access_token = self._generate_access_token(user_id, user.role)
             response = AuthResponseDTO(access_token=access_token, refresh_token=refresh_token)
-            logger.info("Telegram login successful", user_id=str(auth_user.user_id))
+            logger.info("Telegram login successful", user_id=str(user_id))
             return response
         except Exception as e:
             logger.error("Unexpected error in Telegram login", error=str(e))
@@ -190,22 +230,26 @@ class AuthService(AuthServicePort):
         logger = self.logger.bind(request_id=request_id)
         try:
             logger.info("Refreshing token")
-            token = await self.token_repo.get_refresh_token(refresh_dto.refresh_token, request_id)
+            token = await self.token_repo.rotate_refresh_token(
+                refresh_dto.refresh_token,
+                self._generate_refresh_token(),
+                request_id
+            )
             if not token:
                 logger.error("Invalid refresh token")
                 raise AuthenticationError("Invalid refresh token")
-            user = await self.user_service_client.get_user_by_id(token.user_id, request_id)
-            if not user:
-                logger.error("User not found for refresh token", user_id=str(token.user_id))
-                raise AuthenticationError("User not found")
-            new_refresh_token = self._generate_refresh_token(token.user_id)
-            await self.token_repo.store_refresh_token(
-                RefreshToken(token=new_refresh_token, user_id=token.user_id),
-                request_id
-            )
-            await self.token_repo.delete_refresh_token(refresh_dto.refresh_token, request_id)
-            access_token = self._generate_access_token(token.user_id, user.role)
-            response = AuthResponseDTO(access_token=access_token, refresh_token=new_refresh_token)
+            role = self._embedded_role(token)
+            if role is None:
+                user = await self.user_service_client.get_user_by_id(token.user_id, request_id)
+                if not user:
+                    logger.error("User not found for refresh token", user_id=str(token.user_id))
+                    await self.token_repo.delete_refresh_token(token.token, request_id)
+                    raise AuthenticationError("User not found")
+                role = user.role
+                if self.embed_role_in_refresh_token:
+                    await self.token_repo.store_refresh_token(self._refresh_token_record(token.token, token.user_id, role), request_id)
+            access_token = self._generate_access_token(token.user_id, role)
+            response = AuthResponseDTO(access_token=access_token, refresh_token=token.token)
             logger.info("Token refreshed successfully", user_id=str(token.user_id))
             return response
         except AuthenticationError as e:
@@ -220,26 +264,27 @@ class AuthService(AuthServicePort):
         logger = self.logger.bind(request_id=request_id)
         try:
             logger.info("Requesting password reset", email=reset_dto.email)
-            auth_user = await self.auth_repo.get_by_email(reset_dto.email, request_id)
-            if not auth_user:
+            user_id = await self.auth_repo.get_id_by_email(reset_dto.email, request_id)
+            if not user_id:
                 logger.warning("User not found for password reset", email=reset_dto.email)
                 return False
             reset_token = str(uuid4())
             await self.token_repo.store_reset_token(
-                ResetToken(token=reset_token, user_id=auth_user.user_id, ttl=3600),
+                ResetToken(token=reset_token, user_id=user_id, ttl=3600),
                 request_id
             )
-            logger.info("Password reset token generated, notification pending", user_id=str(auth_user.user_id))
+            logger.info("Password reset token generated, notification pending", user_id=str(user_id))
             return True
         except Exception as e:
             logger.error("Unexpected error in password reset request", error=str(e))
             raise RuntimeError(f"Unexpected error in password reset request: {str(e)}")
 
     @log_execution_time
-    async def reset_password(self, reset_dto: ResetPasswordDTO, request_id: str) -> bool:
+    async def reset_password(self, reset_dto: ResetPasswordDTO, request_id: str, client_address: str = "") -> bool:
         logger = self.logger.bind(request_id=request_id)
         try:
             logger.info("Resetting password")
+            await self._throttle("reset_password", {"peer": client_address}, request_id)
             token = await self.token_repo.get_reset_token(reset_dto.reset_token, request_id)
             if not token:
                 logger.error("Invalid reset token")
@@ -248,7 +293,7 @@ class AuthService(AuthServicePort):
             if not auth_user:
                 logger.error("User not found for reset token", user_id=str(token.user_id))
                 raise AuthenticationError("User not found")
-            auth_user.set_hashed_password(self._hash_password(reset_dto.new_password))
+            auth_user.set_hashed_password(await self._hash_password(reset_dto.new_password))
             await self.auth_repo.update(auth_user, request_id)
             await self.token_repo.delete_reset_token(reset_dto.reset_token, request_id)
             logger.info("Password reset successfully", user_id=str(token.user_id))
@@ -256,6 +301,12 @@ class AuthService(AuthServicePort):
         except AuthenticationError as e:
             logger.error("Reset password failed", error=str(e))
             raise
+        except RateLimitExceededError as e:
+            logger.warning("Reset password rejected, too many attempts", error=str(e))
+            raise
+        except ServiceOverloadedError as e:
+            logger.warning("Reset password rejected, password hasher overloaded", error=str(e))
+            raise
         except Exception as e:
             logger.error("Unexpected error in reset password", error=str(e))
             raise RuntimeError(f"Unexpected error in reset password: {str(e)}")
\ No newline at end of file
@@ -0,0 +1,87 @@
+import asyncio
+import time
+from functools import partial
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Callable, Tuple, TypeVar
+from domain.exceptions import ServiceOverloadedError
+from shared.metrics.registry import Histogram
+from structlog import get_logger
+
+logger = get_logger(__name__)
+
+T = TypeVar('T')
+
+EXECUTOR_WAIT_SECONDS = Histogram("executor_wait_seconds", "Time a task waited for a free executor worker", ["executor"])
+
+
+def _timed_call(func: Callable[..., T], submitted_at: float, *args: Any) -> Tuple[float, T]:
+    # Выполняется в воркере: time.monotonic() общий для всех процессов хоста,
+    # поэтому время ожидания корректно считается и для пула процессов.
+    wait_s = time.monotonic() - submitted_at
+    return wait_s, func(*args)
+
+
+class BoundedExecutor:
+    def __init__(self, name: str, kind: str, max_workers: int, max_queue: int):
+        if kind == "process":
+            self._executor: Executor = ProcessPoolExecutor(max_workers=max_workers)
+        elif kind == "thread":
+            self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix=name)
+        else:
+            raise ValueError(f"Unknown executor kind: {kind}")
+        self.name = name
+        self.kind = kind
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self._in_flight = 0
+        self.completed = 0
+        self.rejected = 0
+        self.wait_total_s = 0.0
+        self.wait_max_s = 0.0
+        self.logger = logger.bind(executor=name)
+        self._wait_histogram = EXECUTOR_WAIT_SECONDS.labels(name)
+
+    @property
+    def in_flight(self) -> int:
+        return self._in_flight
+
+    @property
+    def queue_depth(self) -> int:
+        return max(0, self._in_flight - self.max_workers)
+
+    async def run(self, func: Callable[..., T], *args: Any) -> T:
+        if self.queue_depth >= self.max_queue:
+            self.rejected += 1
+            self.logger.warning("Executor queue is full", queue_depth=self.queue_depth, max_queue=self.max_queue)
+            raise ServiceOverloadedError(f"{self.name} is overloaded, try again later")
+        self._in_flight += 1
+        try:
+            loop = asyncio.get_running_loop()
+            wait_s, result = await loop.run_in_executor(self._executor, _timed_call, func, time.monotonic(), *args)
+        finally:
+            self._in_flight -= 1
+        self.completed += 1
+        self.wait_total_s += wait_s
+        self._wait_histogram.observe(wait_s)
+        if wait_s > self.wait_max_s:
+            self.wait_max_s = wait_s
+        return result
+
+    def stats(self) -> dict:
+        return {
+            "kind": self.kind,
+            "max_workers": self.max_workers,
+            "max_queue": self.max_queue,
+            "in_flight": self._in_flight,
+            "queue_depth": self.queue_depth,
+            "completed": self.completed,
+            "rejected": self.rejected,
+            "wait_avg_ms": (self.wait_total_s / self.completed * 1000) if self.completed else 0.0,
+            "wait_max_ms": self.wait_max_s * 1000,
+        }
+
+    async def shutdown(self) -> None:
+        # Waiting for running tasks blocks, so it happens off the event loop
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(None, partial(self._executor.shutdown, wait=True, cancel_futures=True))
+        self.logger.info("Executor shut down", **self.stats())
@@ -1,37 +1,26 @@
-from functools import wraps
+from typing import Tuple
 import grpc
-from structlog import get_logger
 from pydantic_core import ValidationError
-from domain.exceptions import AuthenticationError, InvalidInputError
-from application.utils.logging_utils import generate_request_id
+from domain.exceptions import AuthenticationError, InvalidInputError, RateLimitExceededError, ServiceOverloadedError
 
-logger = get_logger(__name__)
+# (exception type, gRPC code, log level, message); checked in order, first match wins
+EXCEPTION_STATUS_CODES = (
+    (ValidationError, grpc.StatusCode.INVALID_ARGUMENT, "error", "Validation error"),
+    (InvalidInputError, grpc.StatusCode.INVALID_ARGUMENT, "error", "Invalid input"),
+    (AuthenticationError, grpc.StatusCode.UNAUTHENTICATED, "error", "Authentication error"),
+    (ServiceOverloadedError, grpc.StatusCode.RESOURCE_EXHAUSTED, "warning", "Service overloaded"),
+    (RateLimitExceededError, grpc.StatusCode.RESOURCE_EXHAUSTED, "warning", "Too many attempts, try again later"),
+)
 
-def handle_grpc_exceptions(func):
-    @wraps(func)
-    async def wrapper(self, request, context, *args, **kwargs):
-        request_id = kwargs.get('request_id', generate_request_id())
-        logger_with_request = self.logger.bind(request_id=request_id)
-        try:
-            return await func(self, request, context, request_id=request_id)
-        except ValidationError as e:
-            logger_with_request.error(f"Validation error in {func.__name__}", error=str(e))
-            context.set_code(grpc.StatusCode.INVALID_ARGUMENT)
-            context.set_details(str(e))
-            raise
-        except InvalidInputError as e:
-            logger_with_request.error(f"Invalid input in {func.__name__}", error=str(e))
-            context.set_code(grpc.StatusCode.INVALID_ARGUMENT)
-            context.set_details(str(e))
-            raise
-        except AuthenticationError as e:
-            logger_with_request.error(f"Authentication error in {func.__name__}", error=str(e))
-            context.set_code(grpc.StatusCode.UNAUTHENTICATED)
-            context.set_details(str(e))
-            raise
-        except Exception as e:
-            logger_with_request.error(f"Unexpected error in {func.__name__}", error=str(e))
-            context.set_code(grpc.StatusCode.INTERNAL)
-            context.set_details(str(e))
-            raise
-    return wrapper
\ No newline at end of file
+def map_exception(error: Exception) -> Tuple[grpc.StatusCode, str, str]:
+    for exc_type, code, level, message in EXCEPTION_STATUS_CODES:
+        if isinstance(error, exc_type):
+            return code, level, message
+    return grpc.StatusCode.INTERNAL, "error", "Unexpected error"
+
+# "ipv4:10.0.0.1:53422" / "ipv6:[::1]:53422" -> client address without the ephemeral port
+def peer_address(peer: str) -> str:
+    kind, _, address = (peer or "").partition(":")
+    if kind in ("ipv4", "ipv6"):
+        return address.rsplit(":", 1)[0].strip("[]")
+    return address
@@ -1,16 +1,35 @@
+import logging
+import random
 import time
+from contextvars import ContextVar
 from functools import wraps
 from typing import Callable, TypeVar, Any
 from uuid import uuid4
 from structlog import get_logger
 
 logger = get_logger(__name__)
+_stdlib_logger = logging.getLogger(__name__)
 
 T = TypeVar('T')
 
+_timing_sample_rate = 1.0
+
+request_id_var: ContextVar[str] = ContextVar("request_id")
+
+def configure_timing_sampling(rate: float) -> None:
+    global _timing_sample_rate
+    _timing_sample_rate = min(max(rate, 0.0), 1.0)
+
+def timing_log_sampled() -> bool:
+    return _timing_sample_rate >= 1.0 or random.random() < _timing_sample_rate
+
 def generate_request_id() -> str:
     return str(uuid4())
 
+def current_request_id() -> str:
+    request_id = request_id_var.get(None)
+    return request_id if request_id is not None else generate_request_id()
+
 def filter_sensitive_data(data: dict) -> dict:
     return {k: v for k, v in data.items() if k not in ["password", "new_password", "auth_data"]}
 
@@ -18,22 +37,27 @@ def log_execution_time(func: Callable[..., T]) -> Callable[..., T]:
     @wraps(func)
     async def async_wrapper(*args, **kwargs) -> T:
         start_time = time.perf_counter()
-        request_id = kwargs.get('request_id', generate_request_id())
-        logger_with_request = logger.bind(request_id=request_id)
         try:
             result = await func(*args, **kwargs)
+            # Level and sampling are checked before any event fields are built; request_id is a field, not a bind
+            if not _stdlib_logger.isEnabledFor(logging.INFO) or not timing_log_sampled():
+                return result
             duration_ms = (time.perf_counter() - start_time) * 1000
-            logger_with_request.info(
+            logger.info(
                 f"Function {func.__name__} executed successfully",
+                request_id=kwargs.get('request_id') or current_request_id(),
                 duration_ms=f"{duration_ms:.2f}",
                 func_name=func.__name__,
                 module=func.__module__,
             )
             return result
         except Exception as e:
+            if not _stdlib_logger.isEnabledFor(logging.ERROR):
+                raise
             duration_ms = (time.perf_counter() - start_time) * 1000
-            logger_with_request.error(
+            logger.error(
                 f"Function {func.__name__} failed",
+                request_id=kwargs.get('request_id') or current_request_id(),
                 duration_ms=f"{duration_ms:.2f}",
                 func_name=func.__name__,
                 module=func.__module__,
@@ -0,0 +1,44 @@
+import time
+from typing import Dict, Hashable, Sequence, Tuple
+from application.utils.ttl_lru_cache import TtlLruCache
+
+
+# Token buckets per key: capacity tokens refilled evenly over window seconds.
+# A bucket untouched for window seconds is full again, so expiring it after window changes
+# nothing, and TtlLruCache bounds the memory spent on keys.
+class TokenBuckets:
+    def __init__(self, capacity: int, window: float, max_keys: int):
+        self.capacity = capacity
+        self.window = window
+        self.rate = capacity / window
+        # key -> (tokens, updated_at)
+        self._buckets: TtlLruCache[Hashable, Tuple[float, float]] = TtlLruCache(max_size=max_keys, ttl=window)
+
+    def _tokens(self, key: Hashable, now: float) -> float:
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            return float(self.capacity)
+        tokens, updated_at = bucket
+        return min(float(self.capacity), tokens + (now - updated_at) * self.rate)
+
+    def retry_after(self, key: Hashable, now: float) -> float:
+        tokens = self._tokens(key, now)
+        return 0.0 if tokens >= 1 else (1 - tokens) / self.rate
+
+    def take(self, key: Hashable, now: float) -> None:
+        self._buckets.set(key, (self._tokens(key, now) - 1, now))
+
+
+# Takes a token from every bucket only if all of them have one; otherwise returns the wait in seconds
+def take_all(buckets: Sequence[Tuple[TokenBuckets, Hashable]]) -> float:
+    now = time.monotonic()
+    retry_after = max((bucket.retry_after(key, now) for bucket, key in buckets), default=0.0)
+    if retry_after > 0:
+        return retry_after
+    for bucket, key in buckets:
+        bucket.take(key, now)
+    return 0.0
+
+
+def build_buckets(rules: Dict[str, Tuple[int, float]], max_keys: int) -> Dict[str, TokenBuckets]:
+    return {kind: TokenBuckets(limit, window, max_keys) for kind, (limit, window) in rules.items()}
@@ -5,6 +5,8 @@ class Settings(BaseSettings):
     mongo_uri: str = Field(..., env="MONGO_URI")
     mongo_db: str = Field("auth_service", env="MONGO_DB")
     mongo_uuid_representation: str = Field("standard", env="MONGO_UUID_REPRESENTATION")
+    mongo_min_pool_size: int = Field(10, env="MONGO_MIN_POOL_SIZE", ge=0)
+    mongo_index_check: str = Field("warn", env="MONGO_INDEX_CHECK", pattern="^(off|warn|fail)$")
     jwt_secret_key: str = Field(..., env="JWT_SECRET_KEY", min_length=32)
     jwt_access_token_ttl: int = Field(3600, env="JWT_ACCESS_TOKEN_TTL")
     jwt_refresh_token_ttl: int = Field(604800, env="JWT_REFRESH_TOKEN_TTL")
@@ -14,7 +16,38 @@ class Settings(BaseSettings):
     user_service_grpc_host: str = Field("user-service:50051", env="USER_SERVICE_GRPC_HOST")
     notification_service_grpc_host: str = Field("notification-service:50053", env="NOTIFICATION_SERVICE_GRPC_HOST")
     google_client_id: str = Field(..., env="GOOGLE_CLIENT_ID")
+    google_jwks_url: str = Field("https://www.googleapis.com/oauth2/v3/certs", env="GOOGLE_JWKS_URL")
+    jwks_default_max_age: int = Field(3600, env="JWKS_DEFAULT_MAX_AGE")
+    jwks_refresh_margin: int = Field(300, env="JWKS_REFRESH_MARGIN")
+    jwks_min_refetch_interval: float = Field(30.0, env="JWKS_MIN_REFETCH_INTERVAL")
+    jwks_fetch_timeout: float = Field(5.0, env="JWKS_FETCH_TIMEOUT")
     telegram_bot_token: str = Field(..., env="TELEGRAM_BOT_TOKEN")
+    log_level: str = Field("INFO", env="LOG_LEVEL")
+    log_levels: str = Field("", env="LOG_LEVELS")
+    log_timing_sample_rate: float = Field(1.0, env="LOG_TIMING_SAMPLE_RATE", ge=0.0, le=1.0)
+    log_queue_size: int = Field(10000, env="LOG_QUEUE_SIZE")
+    user_cache_max_size: int = Field(10000, env="USER_CACHE_MAX_SIZE", ge=0)
+    user_cache_ttl: int = Field(60, env="USER_CACHE_TTL", ge=1)
+    user_cache_invalidation_channel: str = Field("cache:invalidate", env="USER_CACHE_INVALIDATION_CHANNEL")
+    refresh_token_embed_role: bool = Field(False, env="REFRESH_TOKEN_EMBED_ROLE")
+    password_hasher_kind: str = Field("thread", env="PASSWORD_HASHER_KIND", pattern="^(thread|process)$")
+    password_hasher_workers: int = Field(4, env="PASSWORD_HASHER_WORKERS", ge=1)
+    password_hasher_max_queue: int = Field(64, env="PASSWORD_HASHER_MAX_QUEUE", ge=0)
+    login_throttle_enabled: bool = Field(True, env="LOGIN_THROTTLE_ENABLED")
+    login_throttle_window: float = Field(60.0, env="LOGIN_THROTTLE_WINDOW", gt=0)
+    login_throttle_email_limit: int = Field(10, env="LOGIN_THROTTLE_EMAIL_LIMIT", ge=1)
+    login_throttle_peer_limit: int = Field(30, env="LOGIN_THROTTLE_PEER_LIMIT", ge=1)
+    login_throttle_redis_timeout: float = Field(0.05, env="LOGIN_THROTTLE_REDIS_TIMEOUT", gt=0)
+    login_throttle_local_max_keys: int = Field(100000, env="LOGIN_THROTTLE_LOCAL_MAX_KEYS", ge=1)
+    grpc_workers: int = Field(1, env="GRPC_WORKERS", ge=1)
+    worker_heartbeat_timeout: float = Field(30.0, env="WORKER_HEARTBEAT_TIMEOUT", gt=0)
+    shutdown_grace_period: float = Field(10.0, env="SHUTDOWN_GRACE_PERIOD", ge=0)
+    concurrency_limit_enabled: bool = Field(True, env="CONCURRENCY_LIMIT_ENABLED")
+    concurrency_limits: str = Field("default=20:5:1000,password=8:2:80", env="CONCURRENCY_LIMITS")
+    grpc_max_concurrent_rpcs: int = Field(2000, env="GRPC_MAX_CONCURRENT_RPCS", ge=1)
+    warmup_timeout: float = Field(10.0, env="WARMUP_TIMEOUT", gt=0)
+    metrics_enabled: bool = Field(True, env="METRICS_ENABLED")
+    metrics_port: int = Field(9102, env="METRICS_PORT")
 
     class Config:
         env_file = ".env"
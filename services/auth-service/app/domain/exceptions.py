@@ -2,4 +2,10 @@ class AuthenticationError(Exception):
     pass
 
 class InvalidInputError(Exception):
-    pass
\ No newline at end of file
+    pass
+
+class ServiceOverloadedError(Exception):
+    pass
+
+class RateLimitExceededError(Exception):
+    pass
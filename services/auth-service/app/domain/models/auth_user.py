@@ -44,4 +44,10 @@ class AuthUser:
         if method not in ["email", "google", "telegram"]:
             raise ValueError("Invalid login method")
         if method not in self._login_methods:
-            self._login_methods.append(method)
\ No newline at end of file
+            self._login_methods.append(method)
+
+class AuthCredentials:
+    # Lightweight view for password login: only what verification and token issuing need
+    def __init__(self, user_id: UUID, hashed_password: Optional[str]):
+        self.user_id = user_id
+        self.hashed_password = hashed_password
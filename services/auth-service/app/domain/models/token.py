@@ -1,9 +1,13 @@
 from uuid import UUID
+from typing import Optional
 
 class RefreshToken:
-    def __init__(self, token: str, user_id: UUID):
+    def __init__(self, token: str, user_id: UUID, role: Optional[str] = None, role_issued_at: Optional[float] = None):
         self.token = token
         self.user_id = user_id
+        self.role = role
+        # Unix time the embedded role was read from user-service
+        self.role_issued_at = role_issued_at
 
 class ResetToken:
     def __init__(self, token: str, user_id: UUID, ttl: int):
@@ -3,11 +3,11 @@ from application.dto.auth_dto import RegisterDTO, LoginDTO, GoogleLoginDTO, Tele
 
 class AuthServicePort(ABC):
     @abstractmethod
-    async def register(self, register_dto: RegisterDTO, request_id: str) -> AuthResponseDTO:
+    async def register(self, register_dto: RegisterDTO, request_id: str, client_address: str = "") -> AuthResponseDTO:
         pass
 
     @abstractmethod
-    async def login(self, login_dto: LoginDTO, request_id: str) -> AuthResponseDTO:
+    async def login(self, login_dto: LoginDTO, request_id: str, client_address: str = "") -> AuthResponseDTO:
         pass
 
     @abstractmethod
@@ -27,5 +27,5 @@ class AuthServicePort(ABC):
         pass
 
     @abstractmethod
-    async def reset_password(self, reset_dto: ResetPasswordDTO, request_id: str) -> bool:
+    async def reset_password(self, reset_dto: ResetPasswordDTO, request_id: str, client_address: str = "") -> bool:
         pass
\ No newline at end of file
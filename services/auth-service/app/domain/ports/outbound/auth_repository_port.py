@@ -1,7 +1,7 @@
 from abc import ABC, abstractmethod
 from typing import Optional
 from uuid import UUID
-from domain.models.auth_user import AuthUser
+from domain.models.auth_user import AuthUser, AuthCredentials
 
 class AuthRepositoryPort(ABC):
     @abstractmethod
@@ -20,6 +20,18 @@ class AuthRepositoryPort(ABC):
     async def get_by_telegram_id(self, telegram_id: str, request_id: str) -> Optional[AuthUser]:
         pass
 
+    @abstractmethod
+    async def get_credentials_by_email(self, email: str, request_id: str) -> Optional[AuthCredentials]:
+        pass
+
+    @abstractmethod
+    async def get_id_by_email(self, email: str, request_id: str) -> Optional[UUID]:
+        pass
+
+    @abstractmethod
+    async def get_id_by_telegram_id(self, telegram_id: str, request_id: str) -> Optional[UUID]:
+        pass
+
     @abstractmethod
     async def update(self, auth_user: AuthUser, request_id: str) -> None:
         pass
\ No newline at end of file
@@ -0,0 +1,6 @@
+from abc import ABC, abstractmethod
+
+class IdTokenVerifierPort(ABC):
+    @abstractmethod
+    async def verify(self, id_token: str, request_id: str) -> dict:
+        pass
@@ -0,0 +1,9 @@
+from abc import ABC, abstractmethod
+from typing import Dict
+
+class RateLimiterPort(ABC):
+    # subjects: subject kind -> value, e.g. {"email": ..., "peer": ...}; empty values are not limited.
+    # Returns 0 if the attempt is admitted, otherwise seconds until it would be.
+    @abstractmethod
+    async def hit(self, action: str, subjects: Dict[str, str], request_id: str) -> float:
+        pass
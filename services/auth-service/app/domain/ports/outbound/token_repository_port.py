@@ -15,6 +15,10 @@ class TokenRepositoryPort(ABC):
     async def delete_refresh_token(self, token: str, request_id: str) -> None:
         pass
 
+    @abstractmethod
+    async def rotate_refresh_token(self, old_token: str, new_token: str, request_id: str) -> Optional[RefreshToken]:
+        pass
+
     @abstractmethod
     async def store_reset_token(self, token: ResetToken, request_id: str) -> None:
         pass
@@ -0,0 +1,27 @@
+"""Index maintenance for the auth_users collection.
+
+    python app/index_cli.py check
+    python app/index_cli.py rebuild email_1
+
+rebuild is a one-off migration for indexes whose options changed: the index is dropped
+and rebuilt, so its unique constraint is not enforced until the build finishes. Run it from
+a single process, not from every service worker.
+"""
+import sys
+from pymongo import AsyncMongoClient
+from config import settings
+from main import setup_logging
+from application.utils.logging_config import stop_logging
+from infrastructure.adapters.outbound.mongo.auth_repository import MongoAuthRepository
+from shared.mongo.indexes import run_index_cli
+
+def open_collection():
+    client = AsyncMongoClient(settings.mongo_uri, uuidRepresentation=settings.mongo_uuid_representation)
+    return client, client[settings.mongo_db]["auth_users"]
+
+if __name__ == "__main__":
+    setup_logging()
+    try:
+        sys.exit(run_index_cli(sys.argv[1:], open_collection, MongoAuthRepository.INDEXES, MongoAuthRepository.QUERY_SHAPES))
+    finally:
+        stop_logging()
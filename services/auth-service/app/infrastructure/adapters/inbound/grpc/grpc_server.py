@@ -1,141 +1,205 @@
+import logging
 import grpc
 import asyncio
+from typing import Dict, List
 from grpc.aio import server as aio_server
+from pymongo import AsyncMongoClient
+from redis.asyncio import Redis
 from grpc_reflection.v1alpha import reflection
-from dishka import AsyncContainer
 from config import settings
+from shared.metrics.exporter import start_metrics_server
+from shared.serving.concurrency_limiter import AdaptiveConcurrencyLimiter, parse_concurrency_limits
+from shared.serving.health import HEALTH_SERVICE_NAME, add_health_servicer, mark_serving
+from shared.serving.supervisor import install_shutdown_handler, run_heartbeat
+from shared.serving.warmup import run_warmup, warm_mongo_pool, warm_redis
 from infrastructure.di.container import get_container
 from application.auth_service_impl import AuthService
 from application.dto.auth_dto import RegisterDTO, LoginDTO, GoogleLoginDTO, TelegramLoginDTO, AuthResponseDTO, RefreshTokenDTO, RequestPasswordResetDTO, ResetPasswordDTO
-from application.utils.logging_utils import generate_request_id, log_execution_time, filter_sensitive_data
-from application.utils.grpc_utils import handle_grpc_exceptions
+from application.utils.logging_utils import current_request_id, filter_sensitive_data
+from application.utils.grpc_utils import peer_address
+from infrastructure.adapters.inbound.grpc.interceptors import ConcurrencyLimitInterceptor, RequestContextInterceptor
+from infrastructure.adapters.outbound.grpc.user_service_client import UserServiceClient
 from . import auth_pb2_grpc, auth_pb2
 from structlog import get_logger
 
 logger = get_logger(__name__)
+# Checked before building event fields, so input_data.dict() and the like are skipped when INFO is off
+_stdlib_logger = logging.getLogger(__name__)
 
-SERVICE_NAMES = (
+APP_SERVICE_NAMES = (
     auth_pb2.DESCRIPTOR.services_by_name['AuthService'].full_name,
-    reflection.SERVICE_NAME,
 )
+SERVICE_NAMES = APP_SERVICE_NAMES + (HEALTH_SERVICE_NAME, reflection.SERVICE_NAME)
+
+# bcrypt-bound methods get their own limit so a password flood cannot starve token refreshes
+LIMIT_CLASSES = {
+    "Register": "password",
+    "Login": "password",
+    "ResetPassword": "password",
+}
+
+def build_limiters(spec: str) -> Dict[str, AdaptiveConcurrencyLimiter]:
+    return {
+        name: AdaptiveConcurrencyLimiter(name, initial_limit=initial, min_limit=min_limit, max_limit=max_limit)
+        for name, (initial, min_limit, max_limit) in parse_concurrency_limits(spec).items()
+    }
+
+def build_interceptors() -> List[grpc.aio.ServerInterceptor]:
+    interceptors = [RequestContextInterceptor()]
+    if settings.concurrency_limit_enabled:
+        interceptors.append(ConcurrencyLimitInterceptor(build_limiters(settings.concurrency_limits), LIMIT_CLASSES))
+    return interceptors
 
 class AuthServiceGRPC(auth_pb2_grpc.AuthServiceServicer):
-    def __init__(self, container: AsyncContainer):
-        self.container = container
+    def __init__(self, auth_service: AuthService):
+        self.auth_service = auth_service
         self.logger = logger.bind(service="AuthServiceGRPC")
 
-    async def _get_auth_service(self):
-        return await self.container.get(AuthService)
-
-    @log_execution_time
-    @handle_grpc_exceptions
-    async def Register(self, request, context, request_id: str):
-        logger = self.logger.bind(request_id=request_id)
+    async def Register(self, request, context):
+        request_id = current_request_id()
         input_data = RegisterDTO(email=request.email, name=request.name, password=request.password)
-        logger.info("Processing Register", input_data=filter_sensitive_data(input_data.dict()))
-        auth_service = await self._get_auth_service()
-        response_dto = await auth_service.register(input_data, request_id)
+        if _stdlib_logger.isEnabledFor(logging.INFO):
+            self.logger.info("Processing Register", request_id=request_id, input_data=filter_sensitive_data(input_data.dict()))
+        response_dto = await self.auth_service.register(input_data, request_id, peer_address(context.peer()))
         response = auth_pb2.AuthResponse(
             access_token=response_dto.access_token,
             refresh_token=response_dto.refresh_token
         )
-        logger.info("Register request completed", response=response.__dict__)
+        if _stdlib_logger.isEnabledFor(logging.INFO):
+            self.logger.info("Register request completed", request_id=request_id, response=response.__dict__)
         return response
 
-    @log_execution_time
-    @handle_grpc_exceptions
-    async def Login(self, request, context, request_id: str):
-        logger = self.logger.bind(request_id=request_id)
+    async def Login(self, request, context):
+        request_id = current_request_id()
         input_data = LoginDTO(email=request.email, password=request.password)
-        logger.info("Processing Login", input_data=filter_sensitive_data(input_data.dict()))
-        auth_service = await self._get_auth_service()
-        response_dto = await auth_service.login(input_data, request_id)
+        if _stdlib_logger.isEnabledFor(logging.INFO):
+            self.logger.info("Processing Login", request_id=request_id, input_data=filter_sensitive_data(input_data.dict()))
+        response_dto = await self.auth_service.login(input_data, request_id, peer_address(context.peer()))
         response = auth_pb2.AuthResponse(
             access_token=response_dto.access_token,
             refresh_token=response_dto.refresh_token
         )
-        logger.info("Login request completed", response=response.__dict__)
+        if _stdlib_logger.isEnabledFor(logging.INFO):
+            self.logger.info("Login request completed", request_id=request_id, response=response.__dict__)
         return response
 
-    @log_execution_time
-    @handle_grpc_exceptions
-    async def LoginWithGoogle(self, request, context, request_id: str):
-        logger = self.logger.bind(request_id=request_id)
+    async def LoginWithGoogle(self, request, context):
+        request_id = current_request_id()
         input_data = GoogleLoginDTO(id_token=request.id_token)
-        logger.info("Processing LoginWithGoogle", input_data=filter_sensitive_data(input_data.dict()))
-        auth_service = await self._get_auth_service()
-        response_dto = await auth_service.login_with_google(input_data, request_id)
+        if _stdlib_logger.isEnabledFor(logging.INFO):
+            self.logger.info("Processing LoginWithGoogle", request_id=request_id, input_data=filter_sensitive_data(input_data.dict()))
+        response_dto = await self.auth_service.login_with_google(input_data, request_id)
         response = auth_pb2.AuthResponse(
             access_token=response_dto.access_token,
             refresh_token=response_dto.refresh_token
         )
-        logger.info("LoginWithGoogle request completed", response=response.__dict__)
+        if _stdlib_logger.isEnabledFor(logging.INFO):
+            self.logger.info("LoginWithGoogle request completed", request_id=request_id, response=response.__dict__)
         return response
 
-    @log_execution_time
-    @handle_grpc_exceptions
-    async def LoginWithTelegram(self, request, context, request_id: str):
-        logger = self.logger.bind(request_id=request_id)
+    async def LoginWithTelegram(self, request, context):
+        request_id = current_request_id()
         input_data = TelegramLoginDTO(telegram_id=request.telegram_id, auth_data=request.auth_data)
-        logger.info("Processing LoginWithTelegram", input_data=filter_sensitive_data(input_data.dict()))
-        auth_service = await self._get_auth_service()
-        response_dto = await auth_service.login_with_telegram(input_data, request_id)
+        if _stdlib_logger.isEnabledFor(logging.INFO):
+            self.logger.info("Processing LoginWithTelegram", request_id=request_id, input_data=filter_sensitive_data(input_data.dict()))
+        response_dto = await self.auth_service.login_with_telegram(input_data, request_id)
         response = auth_pb2.AuthResponse(
             access_token=response_dto.access_token,
             refresh_token=response_dto.refresh_token
         )
-        logger.info("LoginWithTelegram request completed", response=response.__dict__)
+        if _stdlib_logger.isEnabledFor(logging.INFO):
+            self.logger.info("LoginWithTelegram request completed", request_id=request_id, response=response.__dict__)
         return response
 
-    @log_execution_time
-    @handle_grpc_exceptions
-    async def RefreshToken(self, request, context, request_id: str):
-        logger = self.logger.bind(request_id=request_id)
+    async def RefreshToken(self, request, context):
+        request_id = current_request_id()
         input_data = RefreshTokenDTO(refresh_token=request.refresh_token)
-        logger.info("Processing RefreshToken", input_data=input_data.dict())
-        auth_service = await self._get_auth_service()
-        response_dto = await auth_service.refresh_token(input_data, request_id)
+        if _stdlib_logger.isEnabledFor(logging.INFO):
+            self.logger.info("Processing RefreshToken", request_id=request_id, input_data=input_data.dict())
+        response_dto = await self.auth_service.refresh_token(input_data, request_id)
         response = auth_pb2.AuthResponse(
             access_token=response_dto.access_token,
             refresh_token=response_dto.refresh_token
         )
-        logger.info("RefreshToken request completed", response=response.__dict__)
+        if _stdlib_logger.isEnabledFor(logging.INFO):
+            self.logger.info("RefreshToken request completed", request_id=request_id, response=response.__dict__)
         return response
 
-    @log_execution_time
-    @handle_grpc_exceptions
-    async def RequestPasswordReset(self, request, context, request_id: str):
-        logger = self.logger.bind(request_id=request_id)
+    async def RequestPasswordReset(self, request, context):
+        request_id = current_request_id()
         input_data = RequestPasswordResetDTO(email=request.email)
-        logger.info("Processing RequestPasswordReset", input_data=input_data.dict())
-        auth_service = await self._get_auth_service()
-        success = await auth_service.request_password_reset(input_data, request_id)
+        if _stdlib_logger.isEnabledFor(logging.INFO):
+            self.logger.info("Processing RequestPasswordReset", request_id=request_id, input_data=input_data.dict())
+        success = await self.auth_service.request_password_reset(input_data, request_id)
         response = auth_pb2.RequestPasswordResetResponse(success=success)
-        logger.info("RequestPasswordReset completed", response=response.__dict__)
+        if _stdlib_logger.isEnabledFor(logging.INFO):
+            self.logger.info("RequestPasswordReset completed", request_id=request_id, response=response.__dict__)
         return response
 
-    @log_execution_time
-    @handle_grpc_exceptions
-    async def ResetPassword(self, request, context, request_id: str):
-        logger = self.logger.bind(request_id=request_id)
+    async def ResetPassword(self, request, context):
+        request_id = current_request_id()
         input_data = ResetPasswordDTO(reset_token=request.reset_token, new_password=request.new_password)
-        logger.info("Processing ResetPassword", input_data=filter_sensitive_data(input_data.dict()))
-        auth_service = await self._get_auth_service()
-        success = await auth_service.reset_password(input_data, request_id)
+        if _stdlib_logger.isEnabledFor(logging.INFO):
+            self.logger.info("Processing ResetPassword", request_id=request_id, input_data=filter_sensitive_data(input_data.dict()))
+        success = await self.auth_service.reset_password(input_data, request_id, peer_address(context.peer()))
         response = auth_pb2.ResetPasswordResponse(success=success)
-        logger.info("ResetPassword completed", response=response.__dict__)
+        if _stdlib_logger.isEnabledFor(logging.INFO):
+            self.logger.info("ResetPassword completed", request_id=request_id, response=response.__dict__)
         return response
 
-async def serve():
+async def warm_up(container) -> None:
+    mongo_client = await container.get(AsyncMongoClient)
+    redis_client = await container.get(Redis)
+    user_service_client = await container.get(UserServiceClient)
+    await run_warmup(
+        {
+            "mongo": lambda: warm_mongo_pool(mongo_client, settings.mongo_min_pool_size),
+            "redis": lambda: warm_redis(redis_client),
+            "user_service_channel": user_service_client.wait_for_ready,
+        },
+        settings.warmup_timeout,
+    )
+
+async def serve(worker_index: int = 0, heartbeat=None):
+    # Heartbeat starts before the container so index builds (MONGO_INDEX_CHECK=fail) and warm-up
+    # do not look like a hung worker to the supervisor
+    heartbeat_task = asyncio.create_task(run_heartbeat(heartbeat)) if heartbeat is not None else None
     try:
         container = await get_container()
         async with container():
-            server = aio_server()
-            auth_pb2_grpc.add_AuthServiceServicer_to_server(AuthServiceGRPC(container), server)
+            server = aio_server(
+                interceptors=build_interceptors(),
+                maximum_concurrent_rpcs=settings.grpc_max_concurrent_rpcs,
+                options=[("grpc.so_reuseport", 1)],
+            )
+            # AuthService is APP-scoped: resolve it once instead of on every call
+            auth_pb2_grpc.add_AuthServiceServicer_to_server(AuthServiceGRPC(await container.get(AuthService)), server)
+            # NOT_SERVING until warm-up completes, so traffic arrives after connections are open
+            health = await add_health_servicer(server, APP_SERVICE_NAMES)
             reflection.enable_server_reflection(SERVICE_NAMES, server)
             server.add_insecure_port(f"[::]:{settings.grpc_port}")
-            logger.info(f"Server started on [::]:{settings.grpc_port} with reflection")
+            logger.info(f"Server started on [::]:{settings.grpc_port} with reflection", worker=worker_index)
             await server.start()
-            await server.wait_for_termination()
+            stopped = asyncio.Event()
+            install_shutdown_handler(stopped.set)
+            metrics_server = None
+            if settings.metrics_enabled:
+                # Each worker gets its own metrics port; a shared port would scrape a random process
+                metrics_port = settings.metrics_port + worker_index
+                metrics_server = await start_metrics_server(metrics_port)
+                logger.info(f"Metrics exposed on :{metrics_port}/metrics")
+            try:
+                await warm_up(container)
+                await mark_serving(health, APP_SERVICE_NAMES)
+                await stopped.wait()
+                logger.info("Shutdown requested, draining in-flight RPCs", grace_s=settings.shutdown_grace_period)
+                await health.enter_graceful_shutdown()
+                await server.stop(settings.shutdown_grace_period)
+            finally:
+                if metrics_server is not None:
+                    metrics_server.close()
     except Exception as e:
-        logger.error(f"Failed to start server: {e}")
\ No newline at end of file
+        logger.error(f"Failed to start server: {e}")
+    finally:
+        if heartbeat_task is not None:
+            heartbeat_task.cancel()
\ No newline at end of file
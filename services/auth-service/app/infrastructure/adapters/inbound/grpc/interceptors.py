@@ -0,0 +1,193 @@
+import time
+from abc import abstractmethod
+from typing import Dict, Optional, Tuple
+
+import grpc
+
+from application.utils.grpc_utils import map_exception
+from application.utils.logging_utils import generate_request_id, request_id_var, timing_log_sampled
+from shared.metrics.instruments import GRPC_SERVER_HANDLED, GRPC_SERVER_HANDLING_SECONDS
+from shared.serving.concurrency_limiter import AdaptiveConcurrencyLimiter
+from shared.serving.health import HEALTH_SERVICE_NAME
+from structlog import get_logger
+
+logger = get_logger(__name__)
+
+REQUEST_ID_METADATA_KEY = "x-request-id"
+
+DEFAULT_LIMIT_CLASS = "default"
+
+def _split_method(full_method: str) -> Tuple[str, str]:
+    _, service, method = full_method.split("/", 2)
+    return service, method
+
+def _get_metadata(context, key: str) -> Optional[str]:
+    for metadata_key, value in context.invocation_metadata() or ():
+        if metadata_key == key:
+            return value
+    return None
+
+class _WrappingInterceptor(grpc.aio.ServerInterceptor):
+    # Wraps each method handler once and reuses the wrapper for every later call
+
+    def __init__(self):
+        self._handlers: Dict[str, grpc.RpcMethodHandler] = {}
+
+    async def intercept_service(self, continuation, handler_call_details):
+        method = handler_call_details.method
+        handler = self._handlers.get(method)
+        if handler is None:
+            handler = await continuation(handler_call_details)
+            if handler is None:
+                # Unknown methods are not cached: the names come from the client
+                return None
+            # Health checks bypass the interceptors: no logs or limits, and Watch writes responses via context.write
+            if _split_method(method)[0] != HEALTH_SERVICE_NAME:
+                handler = self._wrap(method, handler)
+            self._handlers[method] = handler
+        return handler
+
+    def _wrap(self, method: str, handler: grpc.RpcMethodHandler) -> grpc.RpcMethodHandler:
+        if handler.unary_unary is not None:
+            return handler._replace(unary_unary=self._wrap_unary(method, handler.unary_unary))
+        if handler.unary_stream is not None:
+            return handler._replace(unary_stream=self._wrap_unary_stream(method, handler.unary_stream))
+        return handler
+
+    @abstractmethod
+    def _wrap_unary(self, method: str, behavior):
+        pass
+
+    @abstractmethod
+    def _wrap_unary_stream(self, method: str, behavior):
+        pass
+
+class RequestContextInterceptor(_WrappingInterceptor):
+    # request_id, timing, metrics and exception-to-status mapping for every RPC
+
+    def __init__(self):
+        super().__init__()
+        self.logger = logger.bind(interceptor="RequestContextInterceptor")
+
+    def _start(self, context) -> str:
+        request_id = _get_metadata(context, REQUEST_ID_METADATA_KEY) or generate_request_id()
+        request_id_var.set(request_id)
+        return request_id
+
+    def _fail(self, context, name: str, request_id: str, error: Exception, start_time: float) -> grpc.StatusCode:
+        code, level, message = map_exception(error)
+        getattr(self.logger, level)(
+            f"{message} in {name}",
+            request_id=request_id,
+            error=str(error),
+            duration_ms=f"{(time.perf_counter() - start_time) * 1000:.2f}",
+        )
+        return code
+
+    def _finish(self, service: str, name: str, request_id: str, code: grpc.StatusCode, start_time: float, latency) -> None:
+        duration = time.perf_counter() - start_time
+        latency.observe(duration)
+        GRPC_SERVER_HANDLED.labels(service, name, code.name).inc()
+        if code is grpc.StatusCode.OK and timing_log_sampled():
+            self.logger.info(
+                f"Function {name} executed successfully",
+                request_id=request_id,
+                duration_ms=f"{duration * 1000:.2f}",
+                func_name=name,
+                module=service,
+            )
+
+    def _wrap_unary(self, method: str, behavior):
+        service, name = _split_method(method)
+        latency = GRPC_SERVER_HANDLING_SECONDS.labels(service, name)
+
+        async def wrapper(request, context):
+            request_id = self._start(context)
+            start_time = time.perf_counter()
+            code = grpc.StatusCode.OK
+            try:
+                return await behavior(request, context)
+            except grpc.aio.AbortError:
+                code = context.code() or grpc.StatusCode.UNKNOWN
+                raise
+            except Exception as e:
+                code = self._fail(context, name, request_id, e, start_time)
+                await context.abort(code, str(e))
+            finally:
+                self._finish(service, name, request_id, code, start_time, latency)
+        return wrapper
+
+    def _wrap_unary_stream(self, method: str, behavior):
+        service, name = _split_method(method)
+        latency = GRPC_SERVER_HANDLING_SECONDS.labels(service, name)
+
+        async def wrapper(request, context):
+            request_id = self._start(context)
+            start_time = time.perf_counter()
+            code = grpc.StatusCode.OK
+            try:
+                async for response in behavior(request, context):
+                    yield response
+            except grpc.aio.AbortError:
+                code = context.code() or grpc.StatusCode.UNKNOWN
+                raise
+            except Exception as e:
+                code = self._fail(context, name, request_id, e, start_time)
+                await context.abort(code, str(e))
+            finally:
+                self._finish(service, name, request_id, code, start_time, latency)
+        return wrapper
+
+class ConcurrencyLimitInterceptor(_WrappingInterceptor):
+    # Admits up to the adaptive limit of concurrent RPCs per method class and rejects the rest immediately
+
+    def __init__(self, limiters: Dict[str, AdaptiveConcurrencyLimiter], method_classes: Dict[str, str]):
+        super().__init__()
+        if DEFAULT_LIMIT_CLASS not in limiters:
+            raise ValueError(f"Concurrency limits must define the '{DEFAULT_LIMIT_CLASS}' class")
+        self.limiters = limiters
+        self.method_classes = method_classes
+
+    def _limiter(self, method: str) -> AdaptiveConcurrencyLimiter:
+        _, name = _split_method(method)
+        return self.limiters.get(self.method_classes.get(name, DEFAULT_LIMIT_CLASS), self.limiters[DEFAULT_LIMIT_CLASS])
+
+    def _wrap_unary(self, method: str, behavior):
+        limiter = self._limiter(method)
+
+        async def wrapper(request, context):
+            if not limiter.try_acquire():
+                await context.abort(grpc.StatusCode.RESOURCE_EXHAUSTED, f"Concurrency limit exceeded ({limiter.name})")
+            start_time = time.perf_counter()
+            rtt = None
+            try:
+                response = await behavior(request, context)
+                rtt = time.perf_counter() - start_time
+                return response
+            except grpc.aio.AbortError:
+                # Aborted by a later interceptor (e.g. rejected before any work): not a latency sample
+                raise
+            except Exception as e:
+                # Only server-side failures are latency samples. Client errors and load rejections
+                # (invalid input, bad credentials, rate limits) return faster than real work and would
+                # drag the no-load RTT down, so a flood of bad requests would raise the limit
+                if map_exception(e)[0] == grpc.StatusCode.INTERNAL:
+                    rtt = time.perf_counter() - start_time
+                raise
+            finally:
+                limiter.release(rtt)
+        return wrapper
+
+    def _wrap_unary_stream(self, method: str, behavior):
+        limiter = self._limiter(method)
+
+        async def wrapper(request, context):
+            if not limiter.try_acquire():
+                await context.abort(grpc.StatusCode.RESOURCE_EXHAUSTED, f"Concurrency limit exceeded ({limiter.name})")
+            # Stream duration depends on the client, so it does not feed the latency estimate
+            try:
+                async for response in behavior(request, context):
+                    yield response
+            finally:
+                limiter.release()
+        return wrapper
@@ -0,0 +1,100 @@
+import asyncio
+import json
+from typing import List, Optional
+from uuid import UUID
+from redis.asyncio import Redis
+from domain.ports.outbound.user_service_client_port import UserServiceClientPort
+from shared.domain.models.user import User
+from application.utils.ttl_lru_cache import TtlLruCache
+from structlog import get_logger
+
+logger = get_logger(__name__)
+
+# Key prefix of profile entries in user-service's cache; its invalidation messages carry these keys
+USER_CACHE_KEY_PREFIX = "user:id:"
+
+
+# user-service publishes {"origin": ..., "keys": [...]} on its invalidation channel for every
+# profile write and delete (with LOCAL_CACHE_ENABLED). Listening to it evicts changed profiles here;
+# USER_CACHE_TTL still bounds staleness when a message is lost or the channel is not published to.
+class CachedUserServiceClient(UserServiceClientPort):
+    def __init__(self, client: UserServiceClientPort, cache: TtlLruCache[UUID, User], redis_client: Optional[Redis] = None, channel: str = ""):
+        self.client = client
+        self.cache = cache
+        self.redis = redis_client
+        self.channel = channel
+        self.invalidations_received = 0
+        self._invalidation_seq = 0
+        self._listener: Optional[asyncio.Task] = None
+        self.logger = logger.bind(service="CachedUserServiceClient")
+
+    async def create_user(self, user_id: UUID, name: str, role: str, request_id: str) -> User:
+        user = await self.client.create_user(user_id, name, role, request_id)
+        self.cache.set(user.id, user)
+        return user
+
+    async def get_user_by_id(self, user_id: UUID, request_id: str) -> Optional[User]:
+        user = self.cache.get(user_id)
+        if user is not None:
+            self.logger.debug("User served from local cache", request_id=request_id, user_id=str(user_id))
+            return user
+        seq = self._invalidation_seq
+        user = await self.client.get_user_by_id(user_id, request_id)
+        # An invalidation that arrived during the call may be newer than the profile we got
+        if user is not None and seq == self._invalidation_seq:
+            self.cache.set(user_id, user)
+        return user
+
+    def invalidate(self, user_ids: List[UUID]) -> None:
+        self._invalidation_seq += 1
+        for user_id in user_ids:
+            self.cache.invalidate(user_id)
+
+    def _clear(self) -> None:
+        self._invalidation_seq += 1
+        self.cache.clear()
+
+    def _on_message(self, data: str) -> None:
+        keys = json.loads(data).get("keys", [])
+        user_ids = [UUID(key[len(USER_CACHE_KEY_PREFIX):]) for key in keys if key.startswith(USER_CACHE_KEY_PREFIX)]
+        if user_ids:
+            self.invalidations_received += 1
+            self.invalidate(user_ids)
+
+    async def _listen(self) -> None:
+        while True:
+            pubsub = self.redis.pubsub()
+            try:
+                await pubsub.subscribe(self.channel)
+                # Invalidations published before the subscription was active are lost
+                self._clear()
+                self.logger.info("Subscribed to user cache invalidations", channel=self.channel)
+                async for message in pubsub.listen():
+                    if message["type"] == "message":
+                        self._on_message(message["data"])
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self.logger.error("User cache invalidation subscription lost, local cache cleared", error=str(e))
+                self._clear()
+                await asyncio.sleep(1)
+            finally:
+                await pubsub.aclose()
+
+    def start(self) -> None:
+        if self.redis is None:
+            return
+        if self._listener is None or self._listener.done():
+            self._listener = asyncio.create_task(self._listen())
+
+    async def close(self) -> None:
+        if self._listener is not None:
+            self._listener.cancel()
+            try:
+                await self._listener
+            except asyncio.CancelledError:
+                pass
+        self.logger.info("User service client cache stopped", invalidations_received=self.invalidations_received, **self.cache.stats())
+
+    def stats(self) -> dict:
+        return {**self.cache.stats(), "invalidations_received": self.invalidations_received}
@@ -8,6 +8,7 @@ from domain.ports.outbound.user_service_client_port import UserServiceClientPort
 from shared.domain.models.user import User  # Изменяем импорт
 from domain.exceptions import InvalidInputError
 from application.utils.logging_utils import log_execution_time
+from shared.metrics.instruments import ClientMetricsInterceptor
 from . import user_pb2, user_pb2_grpc
 from structlog import get_logger
 
@@ -15,7 +16,7 @@ logger = get_logger(__name__)
 
 class UserServiceClient(UserServiceClientPort):
     def __init__(self):
-        self.channel = grpc.aio.insecure_channel(settings.user_service_grpc_host)
+        self.channel = grpc.aio.insecure_channel(settings.user_service_grpc_host, interceptors=[ClientMetricsInterceptor()])
         self.stub = user_pb2_grpc.AdminServiceStub(self.channel)
         self.logger = logger.bind(service="UserServiceClient")
         self.service_jwt = jwt.encode(
@@ -24,11 +25,16 @@ class UserServiceClient(UserServiceClientPort):
             algorithm="HS256"
         )
 
+    async def wait_for_ready(self) -> None:
+        # Connect and handshake up front so the first Register/Login does not pay for it
+        await self.channel.channel_ready()
+        self.logger.info("User service channel ready", target=settings.user_service_grpc_host)
+
     @log_execution_time
     async def create_user(self, user_id: UUID, name: str, role: str, request_id: str) -> User:
         logger = self.logger.bind(request_id=request_id)
         try:
-            metadata = [("authorization", f"Bearer {self.service_jwt}")]
+            metadata = [("authorization", f"Bearer {self.service_jwt}"), ("x-request-id", request_id)]
             response = await self.stub.CreateUser(
                 user_pb2.CreateUserRequest(id=str(user_id), name=name, role=role),
                 metadata=metadata
@@ -51,7 +57,7 @@ class UserServiceClient(UserServiceClientPort):
     async def get_user_by_id(self, user_id: UUID, request_id: str) -> Optional[User]:
         logger = self.logger.bind(request_id=request_id)
         try:
-            metadata = [("authorization", f"Bearer {self.service_jwt}")]
+            metadata = [("authorization", f"Bearer {self.service_jwt}"), ("x-request-id", request_id)]
             response = await self.stub.GetUser(
                 user_pb2.GetUserRequest(id=str(user_id)),
                 metadata=metadata
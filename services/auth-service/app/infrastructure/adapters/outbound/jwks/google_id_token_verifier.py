@@ -0,0 +1,46 @@
+import jwt
+from domain.ports.outbound.id_token_verifier_port import IdTokenVerifierPort
+from domain.exceptions import AuthenticationError
+from infrastructure.adapters.outbound.jwks.jwks_cache import JwksCache
+from application.utils.logging_utils import log_execution_time
+from structlog import get_logger
+
+logger = get_logger(__name__)
+
+GOOGLE_ISSUERS = ["accounts.google.com", "https://accounts.google.com"]
+
+
+class GoogleIdTokenVerifier(IdTokenVerifierPort):
+    def __init__(self, jwks_cache: JwksCache, client_id: str):
+        self.jwks_cache = jwks_cache
+        self.client_id = client_id
+        self.logger = logger.bind(service="GoogleIdTokenVerifier")
+
+    @log_execution_time
+    async def verify(self, id_token: str, request_id: str) -> dict:
+        logger = self.logger.bind(request_id=request_id)
+        try:
+            header = jwt.get_unverified_header(id_token)
+        except jwt.InvalidTokenError as e:
+            logger.error("Malformed Google ID token", error=str(e))
+            raise AuthenticationError(f"Invalid Google ID token: {str(e)}")
+        kid = header.get("kid")
+        key = await self.jwks_cache.get_key(kid) if kid else None
+        if key is None:
+            logger.error("Unknown Google signing key", kid=kid)
+            raise AuthenticationError("Invalid Google ID token: unknown signing key")
+        try:
+            payload = jwt.decode(
+                id_token,
+                key.key,
+                algorithms=["RS256"],
+                audience=self.client_id,
+                options={"require": ["exp", "iss", "aud"]},
+            )
+        except jwt.InvalidTokenError as e:
+            logger.error("Google ID token verification failed", error=str(e))
+            raise AuthenticationError(f"Invalid Google ID token: {str(e)}")
+        if payload["iss"] not in GOOGLE_ISSUERS:
+            logger.error("Invalid Google ID token issuer", issuer=payload["iss"])
+            raise AuthenticationError("Invalid Google ID token: invalid issuer")
+        return payload
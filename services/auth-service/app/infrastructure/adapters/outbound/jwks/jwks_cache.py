@@ -0,0 +1,147 @@
+import asyncio
+import re
+import time
+from typing import Dict, Optional
+import httpx
+import jwt
+from structlog import get_logger
+
+logger = get_logger(__name__)
+
+_MAX_AGE_RE = re.compile(r"max-age=(\d+)")
+
+
+class JwksCache:
+    def __init__(
+        self,
+        jwks_url: str,
+        default_max_age: int,
+        refresh_margin: int,
+        min_refetch_interval: float,
+        fetch_timeout: float,
+    ):
+        self.jwks_url = jwks_url
+        self.default_max_age = default_max_age
+        self.refresh_margin = refresh_margin
+        self.min_refetch_interval = min_refetch_interval
+        self._client = httpx.AsyncClient(timeout=fetch_timeout)
+        self._keys: Dict[str, jwt.PyJWK] = {}
+        self._expires_at = 0.0
+        self._fetched_at = 0.0
+        self._failed_at = float("-inf")
+        self._generation = 0
+        self._lock = asyncio.Lock()
+        self._refresh_task: Optional[asyncio.Task] = None
+        self.hits = 0
+        self.misses = 0
+        self.refreshes = 0
+        self.refresh_failures = 0
+        self.refresh_skips = 0
+        self.logger = logger.bind(component="JwksCache", jwks_url=jwks_url)
+
+    def _max_age(self, response: httpx.Response) -> int:
+        match = _MAX_AGE_RE.search(response.headers.get("cache-control", ""))
+        return int(match.group(1)) if match else self.default_max_age
+
+    def _parse_keys(self, document: dict) -> Dict[str, jwt.PyJWK]:
+        keys = {}
+        for jwk in document.get("keys", []):
+            try:
+                key = jwt.PyJWK(jwk)
+            except jwt.PyJWKError as e:
+                self.logger.warning("Skipping unusable JWK", kid=jwk.get("kid"), error=str(e))
+                continue
+            if key.key_id:
+                keys[key.key_id] = key
+        if not keys:
+            raise ValueError("JWKS document contains no usable keys")
+        return keys
+
+    def _check_backoff(self, reason: str) -> None:
+        # После неудачного запроса не обращаемся к Google min_refetch_interval: при его недоступности
+        # каждый get_key иначе ждал бы HTTP-таймаут в очереди за блокировкой
+        if time.monotonic() - self._failed_at < self.min_refetch_interval:
+            self.refresh_skips += 1
+            raise RuntimeError(f"JWKS refresh ({reason}) skipped after a recent failure")
+
+    async def _refresh(self, reason: str, seen_generation: int) -> None:
+        self._check_backoff(reason)
+        async with self._lock:
+            # Пока ждали блокировку, ключи мог обновить другой запрос
+            if self._generation != seen_generation:
+                return
+            # ...или предыдущий запрос в очереди мог только что завершиться неудачей
+            self._check_backoff(reason)
+            try:
+                response = await self._client.get(self.jwks_url)
+                response.raise_for_status()
+                keys = self._parse_keys(response.json())
+            except Exception as e:
+                self._failed_at = time.monotonic()
+                self.refresh_failures += 1
+                self.logger.error("Failed to refresh JWKS", reason=reason, error=str(e))
+                raise
+            now = time.monotonic()
+            max_age = self._max_age(response)
+            self._keys = keys
+            self._fetched_at = now
+            self._expires_at = now + max_age
+            self._generation += 1
+            self.refreshes += 1
+            self.logger.info("JWKS refreshed", reason=reason, kids=list(keys), max_age=max_age)
+        if self._refresh_task is None or self._refresh_task.done():
+            self._refresh_task = asyncio.create_task(self._refresh_loop())
+
+    async def _refresh_loop(self) -> None:
+        while True:
+            delay = max(self._expires_at - self.refresh_margin - time.monotonic(), self.min_refetch_interval)
+            await asyncio.sleep(delay)
+            try:
+                await self._refresh("background", self._generation)
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                # Старые ключи остаются в силе до истечения max-age, повторим после min_refetch_interval
+                pass
+
+    async def get_key(self, kid: str) -> Optional[jwt.PyJWK]:
+        if time.monotonic() >= self._expires_at:
+            try:
+                await self._refresh("expired", self._generation)
+            except Exception:
+                # Если Google недоступен, продолжаем работать на последних известных ключах
+                if not self._keys:
+                    raise
+        key = self._keys.get(kid)
+        if key is not None:
+            self.hits += 1
+            return key
+        self.misses += 1
+        if time.monotonic() - self._fetched_at >= self.min_refetch_interval:
+            try:
+                await self._refresh("unknown_kid", self._generation)
+            except Exception:
+                return None
+            return self._keys.get(kid)
+        return None
+
+    def stats(self) -> dict:
+        return {
+            "keys": len(self._keys),
+            "hits": self.hits,
+            "misses": self.misses,
+            "refreshes": self.refreshes,
+            "refresh_failures": self.refresh_failures,
+            "refresh_skips": self.refresh_skips,
+            "expires_in_s": max(0.0, self._expires_at - time.monotonic()),
+        }
+
+    async def close(self) -> None:
+        if self._refresh_task is not None:
+            self._refresh_task.cancel()
+            try:
+                await self._refresh_task
+            except asyncio.CancelledError:
+                pass
+        await self._client.aclose()
+        self.logger.info("JWKS cache closed", **self.stats())
@@ -4,17 +4,65 @@ from typing import Optional
 from uuid import UUID
 from datetime import datetime
 from bson.binary import Binary, UUID_SUBTYPE
-from domain.models.auth_user import AuthUser
+from domain.models.auth_user import AuthUser, AuthCredentials
 from domain.exceptions import InvalidInputError
 from application.utils.logging_utils import log_execution_time
+from shared.mongo.indexes import IndexSpec, QueryShape
 from structlog import get_logger
 
 from domain.ports.outbound.auth_repository_port import AuthRepositoryPort
 
 logger = get_logger(__name__)
 
+# Projections of the covered lookups; any extra field forces a document fetch
+CREDENTIALS_PROJECTION = {"_id": 1, "hashed_password": 1}
+ID_PROJECTION = {"_id": 1}
+
+
+# The unique and covering indexes are partial on {"$type": "string"}; the planner only uses
+# a partial index when the query repeats its filter, so every lookup carries the predicate
+def _email_filter(email: str) -> dict:
+    return {"email": {"$eq": email, "$type": "string"}}
+
+
+def _telegram_id_filter(telegram_id: str) -> dict:
+    return {"telegram_id": {"$eq": telegram_id, "$type": "string"}}
+
+
+def _to_uuid(_id) -> UUID:
+    # Handle different types of _id
+    if isinstance(_id, UUID):
+        return _id  # Already a UUID, no conversion needed
+    if isinstance(_id, Binary):
+        return UUID(bytes=_id)  # Convert Binary to UUID
+    return UUID(_id)  # Assume string and convert to UUID
+
 
 class MongoAuthRepository(AuthRepositoryPort):
+    # Google and Telegram users have a null email, email users a null telegram_id:
+    # uniqueness is enforced among string values only
+    INDEXES = (
+        IndexSpec((("email", 1),), "email_1", unique=True, partial_filter={"email": {"$type": "string"}}),
+        IndexSpec((("telegram_id", 1),), "telegram_id_1", unique=True, partial_filter={"telegram_id": {"$type": "string"}}),
+        # Covering indexes: login and existence lookups project only fields stored in these
+        # keys, so MongoDB answers them from the index without fetching the document
+        IndexSpec(
+            (("email", 1), ("hashed_password", 1), ("_id", 1)),
+            "email_1_hashed_password_1__id_1",
+            partial_filter={"email": {"$type": "string"}},
+        ),
+        IndexSpec((("telegram_id", 1), ("_id", 1)), "telegram_id_1__id_1", partial_filter={"telegram_id": {"$type": "string"}}),
+    )
+    # Every query this repository issues, with sample values for explain()
+    QUERY_SHAPES = (
+        QueryShape("get_by_id", {"_id": Binary(bytes(16), UUID_SUBTYPE)}),
+        QueryShape("get_by_email", _email_filter("index-check@example.com")),
+        QueryShape("get_by_telegram_id", _telegram_id_filter("0")),
+        QueryShape("get_credentials_by_email", _email_filter("index-check@example.com"), projection=CREDENTIALS_PROJECTION),
+        QueryShape("get_id_by_email", _email_filter("index-check@example.com"), projection=ID_PROJECTION),
+        QueryShape("get_id_by_telegram_id", _telegram_id_filter("0"), projection=ID_PROJECTION),
+    )
+
     def __init__(self, collection: Collection):
         self.collection = collection
         self.logger = logger.bind(repository="MongoAuthRepository")
@@ -34,17 +82,8 @@ class MongoAuthRepository(AuthRepositoryPort):
         if isinstance(created_at, str):
             created_at = datetime.fromisoformat(created_at.replace("Z", "+00:00"))
 
-        # Handle different types of _id
-        _id = data["_id"]
-        if isinstance(_id, UUID):
-            user_id = _id  # Already a UUID, no conversion needed
-        elif isinstance(_id, Binary):
-            user_id = UUID(bytes=_id)  # Convert Binary to UUID
-        else:
-            user_id = UUID(_id)  # Assume string and convert to UUID
-
         return AuthUser(
-            user_id=user_id,
+            user_id=_to_uuid(data["_id"]),
             email=data["email"],
             hashed_password=data["hashed_password"],
             login_methods=data["login_methods"],
@@ -87,7 +126,7 @@ class MongoAuthRepository(AuthRepositoryPort):
         logger = self.logger.bind(request_id=request_id)
         try:
             logger.info("Fetching auth user by email from MongoDB", email=email)
-            data = await self.collection.find_one({"email": email})
+            data = await self.collection.find_one(_email_filter(email))
             if data:
                 logger.info("Auth user fetched", email=email)
                 return self._dict_to_auth_user(data)
@@ -102,7 +141,7 @@ class MongoAuthRepository(AuthRepositoryPort):
         logger = self.logger.bind(request_id=request_id)
         try:
             logger.info("Fetching auth user by telegram_id from MongoDB", telegram_id=telegram_id)
-            data = await self.collection.find_one({"telegram_id": telegram_id})
+            data = await self.collection.find_one(_telegram_id_filter(telegram_id))
             if data:
                 logger.info("Auth user fetched", telegram_id=telegram_id)
                 return self._dict_to_auth_user(data)
@@ -112,6 +151,40 @@ class MongoAuthRepository(AuthRepositoryPort):
             logger.error("Failed to fetch auth user by telegram_id", error=str(e), telegram_id=telegram_id)
             raise
 
+    @log_execution_time
+    async def get_credentials_by_email(self, email: str, request_id: str) -> Optional[AuthCredentials]:
+        logger = self.logger.bind(request_id=request_id)
+        try:
+            logger.info("Fetching auth credentials by email from MongoDB", email=email)
+            data = await self.collection.find_one(_email_filter(email), CREDENTIALS_PROJECTION)
+            if data:
+                return AuthCredentials(user_id=_to_uuid(data["_id"]), hashed_password=data.get("hashed_password"))
+            logger.warning("Auth user not found in MongoDB", email=email)
+            return None
+        except Exception as e:
+            logger.error("Failed to fetch auth credentials by email", error=str(e), email=email)
+            raise
+
+    @log_execution_time
+    async def get_id_by_email(self, email: str, request_id: str) -> Optional[UUID]:
+        logger = self.logger.bind(request_id=request_id)
+        try:
+            data = await self.collection.find_one(_email_filter(email), ID_PROJECTION)
+            return _to_uuid(data["_id"]) if data else None
+        except Exception as e:
+            logger.error("Failed to look up auth user ID by email", error=str(e), email=email)
+            raise
+
+    @log_execution_time
+    async def get_id_by_telegram_id(self, telegram_id: str, request_id: str) -> Optional[UUID]:
+        logger = self.logger.bind(request_id=request_id)
+        try:
+            data = await self.collection.find_one(_telegram_id_filter(telegram_id), ID_PROJECTION)
+            return _to_uuid(data["_id"]) if data else None
+        except Exception as e:
+            logger.error("Failed to look up auth user ID by telegram_id", error=str(e), telegram_id=telegram_id)
+            raise
+
     @log_execution_time
     async def update(self, auth_user: AuthUser, request_id: str) -> None:
         logger = self.logger.bind(request_id=request_id)
@@ -0,0 +1,102 @@
+import asyncio
+import time
+from typing import Dict, List, Tuple
+from uuid import uuid4
+from redis.asyncio import Redis
+from domain.ports.outbound.rate_limiter_port import RateLimiterPort
+from application.utils.token_bucket import TokenBuckets, take_all
+from shared.metrics.instruments import track_datastore_operation
+from structlog import get_logger
+
+logger = get_logger(__name__)
+
+# Sliding window of attempts per key in a single call, so checking every window and recording
+# the attempt is atomic. KEYS are the windows (sorted sets: member = attempt, score = time in ms),
+# ARGV[1] is a unique attempt id, followed by a (limit, window in ms) pair per key. The attempt is
+# recorded in all windows only if none of them is full, so rejected attempts do not extend a block.
+# Returns 0, or the ms until the fullest window frees a slot. Time comes from Redis, so worker
+# clocks on different hosts do not skew the count.
+SLIDING_WINDOW_SCRIPT = """
+local time = redis.call('TIME')
+local now = tonumber(time[1]) * 1000 + math.floor(tonumber(time[2]) / 1000)
+local retry_after = 0
+for i, key in ipairs(KEYS) do
+    local limit = tonumber(ARGV[2 * i])
+    local window = tonumber(ARGV[2 * i + 1])
+    redis.call('ZREMRANGEBYSCORE', key, '-inf', now - window)
+    if redis.call('ZCARD', key) >= limit then
+        local oldest = redis.call('ZRANGE', key, 0, 0, 'WITHSCORES')
+        retry_after = math.max(retry_after, tonumber(oldest[2]) + window - now)
+    end
+end
+if retry_after > 0 then
+    return retry_after
+end
+for i, key in ipairs(KEYS) do
+    redis.call('ZADD', key, now, ARGV[1])
+    redis.call('PEXPIRE', key, ARGV[2 * i + 1])
+end
+return 0
+"""
+
+class RedisRateLimiter(RateLimiterPort):
+    def __init__(self, redis_client: Redis, rules: Dict[str, Tuple[int, float]], timeout: float, fallback_buckets: Dict[str, TokenBuckets], fallback_cooldown: float = 1.0):
+        self.redis = redis_client
+        self.rules = rules
+        self.timeout = timeout
+        self.fallback_buckets = fallback_buckets
+        self.fallback_cooldown = fallback_cooldown
+        self._sliding_window = self.redis.register_script(SLIDING_WINDOW_SCRIPT)
+        self._redis_retry_at = 0.0
+        self.admitted = 0
+        self.rejected = 0
+        self.fallbacks = 0
+        self.logger = logger.bind(repository="RedisRateLimiter")
+
+    def _keys(self, action: str, subjects: Dict[str, str]) -> List[Tuple[str, str]]:
+        return [(kind, f"throttle:{action}:{kind}:{value}") for kind, value in subjects.items() if value and kind in self.rules]
+
+    @track_datastore_operation("redis", "evalsha")
+    async def _hit_redis(self, keys: List[Tuple[str, str]]) -> float:
+        args = [uuid4().hex]
+        for kind, _ in keys:
+            limit, window = self.rules[kind]
+            args += [limit, int(window * 1000)]
+        retry_after_ms = await self._sliding_window(keys=[key for _, key in keys], args=args)
+        return int(retry_after_ms) / 1000
+
+    def _hit_local(self, keys: List[Tuple[str, str]]) -> float:
+        self.fallbacks += 1
+        return take_all([(self.fallback_buckets[kind], key) for kind, key in keys])
+
+    async def hit(self, action: str, subjects: Dict[str, str], request_id: str) -> float:
+        keys = self._keys(action, subjects)
+        if not keys:
+            return 0.0
+        # The throttle sits in front of every password RPC, so a slow Redis must not stall logins:
+        # past the timeout this worker counts attempts locally and leaves Redis alone for a cooldown
+        if time.monotonic() < self._redis_retry_at:
+            retry_after = self._hit_local(keys)
+        else:
+            try:
+                retry_after = await asyncio.wait_for(self._hit_redis(keys), self.timeout)
+            except Exception as e:
+                self._redis_retry_at = time.monotonic() + self.fallback_cooldown
+                self.logger.warning(
+                    "Rate limiter falling back to local token buckets",
+                    request_id=request_id, error=repr(e), cooldown_s=self.fallback_cooldown,
+                )
+                retry_after = self._hit_local(keys)
+        if retry_after > 0:
+            self.rejected += 1
+            self.logger.warning("Attempt rate limited", request_id=request_id, action=action, retry_after_s=round(retry_after, 3))
+        else:
+            self.admitted += 1
+        return retry_after
+
+    def stats(self) -> dict:
+        return {
+            "admitted": self.admitted,
+            "rejected": self.rejected,
+            "fallbacks": self.fallbacks,
+        }
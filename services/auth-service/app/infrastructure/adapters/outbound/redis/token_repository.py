@@ -6,21 +6,39 @@ from domain.ports.outbound.token_repository_port import TokenRepositoryPort
 from domain.models.token import RefreshToken, ResetToken
 from structlog import get_logger
 from application.utils.logging_utils import log_execution_time
+from shared.metrics.instruments import track_datastore_operation
 from config import settings
 
 logger = get_logger(__name__)
 
+# Атомарно потребляет старый refresh-токен и сохраняет новый с теми же данными.
+# KEYS[1] - старый ключ, KEYS[2] - новый ключ, ARGV[1] - TTL нового ключа.
+ROTATE_REFRESH_TOKEN_SCRIPT = """
+local data = redis.call('GET', KEYS[1])
+if not data then
+    return false
+end
+redis.call('DEL', KEYS[1])
+redis.call('SET', KEYS[2], data, 'EX', ARGV[1])
+return data
+"""
+
 class RedisTokenRepository(TokenRepositoryPort):
     def __init__(self, redis_client: Redis):
         self.redis = redis_client
         self.logger = logger.bind(repository="RedisTokenRepository")
+        self._rotate_refresh_token = self.redis.register_script(ROTATE_REFRESH_TOKEN_SCRIPT)
 
     @log_execution_time
+    @track_datastore_operation("redis", "setex")
     async def store_refresh_token(self, token: RefreshToken, request_id: str) -> None:
         logger = self.logger.bind(request_id=request_id)
         try:
             key = f"refresh_token:{token.token}"
             data = {"user_id": str(token.user_id)}
+            if token.role:
+                data["role"] = token.role
+                data["role_issued_at"] = token.role_issued_at
             await self.redis.setex(key, settings.redis_ttl, json.dumps(data))
             logger.info("Refresh token stored", key=key)
         except Exception as e:
@@ -28,6 +46,7 @@ class RedisTokenRepository(TokenRepositoryPort):
             raise
 
     @log_execution_time
+    @track_datastore_operation("redis", "get")
     async def get_refresh_token(self, token: str, request_id: str) -> Optional[RefreshToken]:
         logger = self.logger.bind(request_id=request_id)
         try:
@@ -35,7 +54,7 @@ class RedisTokenRepository(TokenRepositoryPort):
             data = await self.redis.get(key)
             if data:
                 data_dict = json.loads(data)
-                return RefreshToken(token=token, user_id=UUID(data_dict["user_id"]))
+                return RefreshToken(token=token, user_id=UUID(data_dict["user_id"]), role=data_dict.get("role"), role_issued_at=data_dict.get("role_issued_at"))
             logger.info("Refresh token not found", key=key)
             return None
         except Exception as e:
@@ -43,6 +62,7 @@ class RedisTokenRepository(TokenRepositoryPort):
             raise
 
     @log_execution_time
+    @track_datastore_operation("redis", "del")
     async def delete_refresh_token(self, token: str, request_id: str) -> None:
         logger = self.logger.bind(request_id=request_id)
         try:
@@ -54,6 +74,25 @@ class RedisTokenRepository(TokenRepositoryPort):
             raise
 
     @log_execution_time
+    @track_datastore_operation("redis", "evalsha_rotate")
+    async def rotate_refresh_token(self, old_token: str, new_token: str, request_id: str) -> Optional[RefreshToken]:
+        logger = self.logger.bind(request_id=request_id)
+        try:
+            old_key = f"refresh_token:{old_token}"
+            new_key = f"refresh_token:{new_token}"
+            data = await self._rotate_refresh_token(keys=[old_key, new_key], args=[settings.redis_ttl])
+            if data:
+                data_dict = json.loads(data)
+                logger.info("Refresh token rotated", old_key=old_key, new_key=new_key)
+                return RefreshToken(token=new_token, user_id=UUID(data_dict["user_id"]), role=data_dict.get("role"), role_issued_at=data_dict.get("role_issued_at"))
+            logger.info("Refresh token not found for rotation", key=old_key)
+            return None
+        except Exception as e:
+            logger.error("Failed to rotate refresh token", error=str(e), key=old_key)
+            raise
+
+    @log_execution_time
+    @track_datastore_operation("redis", "setex")
     async def store_reset_token(self, token: ResetToken, request_id: str) -> None:
         logger = self.logger.bind(request_id=request_id)
         try:
@@ -66,6 +105,7 @@ class RedisTokenRepository(TokenRepositoryPort):
             raise
 
     @log_execution_time
+    @track_datastore_operation("redis", "get")
     async def get_reset_token(self, token: str, request_id: str) -> Optional[ResetToken]:
         logger = self.logger.bind(request_id=request_id)
         try:
@@ -81,6 +121,7 @@ class RedisTokenRepository(TokenRepositoryPort):
             raise
 
     @log_execution_time
+    @track_datastore_operation("redis", "del")
     async def delete_reset_token(self, token: str, request_id: str) -> None:
         logger = self.logger.bind(request_id=request_id)
         try:
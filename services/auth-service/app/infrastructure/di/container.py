@@ -1,14 +1,27 @@
+from typing import AsyncIterable, Optional
 from dishka import Provider, Scope, provide, make_async_container, AsyncContainer
 from pymongo import AsyncMongoClient
 from pymongo.collection import Collection
 from redis.asyncio import Redis
 from infrastructure.adapters.outbound.mongo.auth_repository import MongoAuthRepository
 from infrastructure.adapters.outbound.redis.token_repository import RedisTokenRepository
+from infrastructure.adapters.outbound.redis.rate_limiter import RedisRateLimiter
 from infrastructure.adapters.outbound.grpc.user_service_client import UserServiceClient
+from infrastructure.adapters.outbound.grpc.cached_user_service_client import CachedUserServiceClient
+from infrastructure.adapters.outbound.jwks.jwks_cache import JwksCache
+from infrastructure.adapters.outbound.jwks.google_id_token_verifier import GoogleIdTokenVerifier
 from application.auth_service_impl import AuthService
+from application.utils.cpu_executor import BoundedExecutor
+from application.utils.ttl_lru_cache import TtlLruCache
+from application.utils.token_bucket import build_buckets
 from domain.ports.outbound.auth_repository_port import AuthRepositoryPort
 from domain.ports.outbound.token_repository_port import TokenRepositoryPort
 from domain.ports.outbound.user_service_client_port import UserServiceClientPort
+from domain.ports.outbound.id_token_verifier_port import IdTokenVerifierPort
+from domain.ports.outbound.rate_limiter_port import RateLimiterPort
+from shared.metrics.mongo import MongoCommandMetricsListener
+from shared.mongo.indexes import start_index_maintenance
+from shared.metrics.registry import expose_stats
 from config import settings
 from structlog import get_logger
 
@@ -17,7 +30,12 @@ logger = get_logger(__name__)
 class AppProvider(Provider):
     @provide(scope=Scope.APP)
     async def get_mongo_client(self) -> AsyncMongoClient:
-        client = AsyncMongoClient(settings.mongo_uri, uuidRepresentation=settings.mongo_uuid_representation)
+        client = AsyncMongoClient(
+            settings.mongo_uri,
+            uuidRepresentation=settings.mongo_uuid_representation,
+            minPoolSize=settings.mongo_min_pool_size,
+            event_listeners=[MongoCommandMetricsListener()],
+        )
         logger.info("MongoDB client initialized")
         return client
 
@@ -25,7 +43,7 @@ class AppProvider(Provider):
     async def get_mongo_collection(self, client: AsyncMongoClient) -> Collection:
         db = client[settings.mongo_db]
         collection = db["auth_users"]
-        await collection.create_index("email", unique=True)
+        await start_index_maintenance(collection, MongoAuthRepository.INDEXES, MongoAuthRepository.QUERY_SHAPES, settings.mongo_index_check)
         logger.info("MongoDB collection initialized")
         return collection
 
@@ -46,14 +64,76 @@ class AppProvider(Provider):
         return RedisTokenRepository(redis_client)
 
     @provide(scope=Scope.APP)
-    async def get_user_service_client(self) -> UserServiceClientPort:
-        logger.info("User service client initialized")
+    async def get_rate_limiter(self, redis_client: Redis) -> Optional[RateLimiterPort]:
+        if not settings.login_throttle_enabled:
+            logger.info("Login throttle disabled")
+            return None
+        rules = {
+            "email": (settings.login_throttle_email_limit, settings.login_throttle_window),
+            "peer": (settings.login_throttle_peer_limit, settings.login_throttle_window),
+        }
+        limiter = RedisRateLimiter(
+            redis_client,
+            rules,
+            settings.login_throttle_redis_timeout,
+            build_buckets(rules, settings.login_throttle_local_max_keys),
+        )
+        expose_stats("login_throttle", limiter.stats)
+        logger.info("Login throttle initialized", email_limit=settings.login_throttle_email_limit, peer_limit=settings.login_throttle_peer_limit, window_s=settings.login_throttle_window)
+        return limiter
+
+    @provide(scope=Scope.APP)
+    async def get_grpc_user_service_client(self) -> UserServiceClient:
         return UserServiceClient()
 
     @provide(scope=Scope.APP)
-    async def get_auth_service(self, auth_repo: AuthRepositoryPort, token_repo: TokenRepositoryPort, user_service_client: UserServiceClientPort) -> AuthService:
+    async def get_user_service_client(self, client: UserServiceClient, redis_client: Redis) -> AsyncIterable[UserServiceClientPort]:
+        cache = TtlLruCache(max_size=settings.user_cache_max_size, ttl=settings.user_cache_ttl)
+        # Evict profiles changed in user-service as soon as its cache invalidation arrives
+        cached_client = CachedUserServiceClient(client, cache, redis_client, settings.user_cache_invalidation_channel)
+        if cache.max_size > 0:
+            cached_client.start()
+        expose_stats("user_client_cache", cached_client.stats)
+        logger.info("User service client initialized", cache_max_size=cache.max_size, cache_ttl=cache.ttl, invalidation_channel=settings.user_cache_invalidation_channel)
+        yield cached_client
+        await cached_client.close()
+
+    @provide(scope=Scope.APP)
+    async def get_jwks_cache(self) -> AsyncIterable[JwksCache]:
+        cache = JwksCache(
+            jwks_url=settings.google_jwks_url,
+            default_max_age=settings.jwks_default_max_age,
+            refresh_margin=settings.jwks_refresh_margin,
+            min_refetch_interval=settings.jwks_min_refetch_interval,
+            fetch_timeout=settings.jwks_fetch_timeout,
+        )
+        expose_stats("jwks_cache", cache.stats)
+        logger.info("JWKS cache initialized", jwks_url=settings.google_jwks_url)
+        yield cache
+        await cache.close()
+
+    @provide(scope=Scope.APP)
+    async def get_google_verifier(self, jwks_cache: JwksCache) -> IdTokenVerifierPort:
+        logger.info("Google ID token verifier initialized")
+        return GoogleIdTokenVerifier(jwks_cache, settings.google_client_id)
+
+    @provide(scope=Scope.APP)
+    async def get_password_executor(self) -> AsyncIterable[BoundedExecutor]:
+        executor = BoundedExecutor(
+            name="password-hasher",
+            kind=settings.password_hasher_kind,
+            max_workers=settings.password_hasher_workers,
+            max_queue=settings.password_hasher_max_queue,
+        )
+        expose_stats("executor", executor.stats, executor=executor.name)
+        logger.info("Password hasher executor initialized", kind=executor.kind, workers=executor.max_workers, max_queue=executor.max_queue)
+        yield executor
+        await executor.shutdown()
+
+    @provide(scope=Scope.APP)
+    async def get_auth_service(self, auth_repo: AuthRepositoryPort, token_repo: TokenRepositoryPort, user_service_client: UserServiceClientPort, password_executor: BoundedExecutor, google_verifier: IdTokenVerifierPort, rate_limiter: Optional[RateLimiterPort]) -> AuthService:
         logger.info("Auth service initialized")
-        return AuthService(auth_repo, token_repo, user_service_client)
+        return AuthService(auth_repo, token_repo, user_service_client, password_executor, google_verifier, rate_limiter)
 
 async def get_container() -> AsyncContainer:
     container = make_async_container(AppProvider())
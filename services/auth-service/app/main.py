@@ -1,26 +1,36 @@
-import structlog
 import asyncio
-from infrastructure.adapters.inbound.grpc.grpc_server import serve
-import logging
+from config import settings
+from application.utils.logging_config import configure_logging, parse_log_levels, stop_logging
+from shared.serving.supervisor import WorkerSupervisor
 
-logging.basicConfig(
-    level=logging.INFO,
-    format="%(message)s",
-)
+def setup_logging() -> None:
+    configure_logging(
+        level=settings.log_level,
+        logger_levels=parse_log_levels(settings.log_levels),
+        timing_sample_rate=settings.log_timing_sample_rate,
+        queue_size=settings.log_queue_size,
+    )
 
-structlog.configure(
-    processors=[
-        structlog.processors.TimeStamper(fmt="iso"),
-        structlog.stdlib.add_log_level,
-        structlog.stdlib.add_logger_name,
-        structlog.stdlib.PositionalArgumentsFormatter(),
-        structlog.processors.JSONRenderer(ensure_ascii=False),
-    ],
-    context_class=dict,
-    logger_factory=structlog.stdlib.LoggerFactory(),
-    wrapper_class=structlog.stdlib.BoundLogger,
-    cache_logger_on_first_use=True,
-)
+def run_worker(worker_index: int = 0, heartbeat=None) -> None:
+    # Imported here so the supervisor process never initializes gRPC
+    from infrastructure.adapters.inbound.grpc.grpc_server import serve
+    setup_logging()
+    try:
+        asyncio.run(serve(worker_index, heartbeat))
+    finally:
+        stop_logging()
 
 if __name__ == "__main__":
-    asyncio.run(serve())
\ No newline at end of file
+    if settings.grpc_workers > 1:
+        setup_logging()
+        try:
+            WorkerSupervisor(
+                run_worker,
+                workers=settings.grpc_workers,
+                heartbeat_timeout=settings.worker_heartbeat_timeout,
+                shutdown_timeout=settings.shutdown_grace_period + 5,
+            ).run()
+        finally:
+            stop_logging()
+    else:
+        run_worker()
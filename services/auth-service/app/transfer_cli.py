@@ -0,0 +1,35 @@
+"""NDJSON export and import of the auth_users collection.
+
+    python app/transfer_cli.py export /data/auth_users --partitions 16 --workers 4
+    python app/transfer_cli.py import /data/auth_users --workers 4
+
+Re-running the same command resumes from the last checkpoint.
+"""
+import sys
+from pymongo import AsyncMongoClient
+from config import settings
+from main import setup_logging
+from application.utils.logging_config import stop_logging
+from infrastructure.adapters.outbound.mongo.auth_repository import MongoAuthRepository
+from shared.datatransfer.ndjson_transfer import run_cli
+
+# Only the document conversions are used, never the collection
+_repository = MongoAuthRepository(None)
+
+def normalize(document: dict) -> dict:
+    return _repository._auth_user_to_dict(_repository._dict_to_auth_user(document))
+
+def open_collection():
+    client = AsyncMongoClient(settings.mongo_uri, uuidRepresentation=settings.mongo_uuid_representation)
+    return client, client[settings.mongo_db]["auth_users"]
+
+def init_process():
+    setup_logging()
+    return stop_logging
+
+if __name__ == "__main__":
+    teardown = init_process()
+    try:
+        sys.exit(run_cli(sys.argv[1:], "auth_users", open_collection, normalize, init=init_process))
+    finally:
+        teardown()
@@ -0,0 +1,109 @@
+"""Проверка GoogleIdTokenVerifier против локального JWKS-сервера и замер стоимости верификации.
+
+Запуск из каталога services/auth-service:
+    PYTHONPATH=app:../.. python benchmarks/bench_jwks_cache.py
+"""
+import asyncio
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import jwt
+from cryptography.hazmat.primitives.asymmetric import rsa
+
+from domain.exceptions import AuthenticationError
+from infrastructure.adapters.outbound.jwks.jwks_cache import JwksCache
+from infrastructure.adapters.outbound.jwks.google_id_token_verifier import GoogleIdTokenVerifier
+from fakes import percentile, silence_logging
+
+CLIENT_ID = "bench-client-id"
+REQUESTS = 2000
+
+
+class JwksStandIn:
+    """Локальная замена https://www.googleapis.com/oauth2/v3/certs."""
+
+    def __init__(self, max_age: int):
+        self.max_age = max_age
+        self.requests = 0
+        self.keys = {}
+        self.rotate("kid-1")
+        stand_in = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                stand_in.requests += 1
+                body = json.dumps(stand_in.document()).encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Cache-Control", f"public, max-age={stand_in.max_age}")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self.server.server_port}/certs"
+
+    def rotate(self, kid: str) -> None:
+        self.keys[kid] = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+
+    def document(self) -> dict:
+        keys = []
+        for kid, private_key in self.keys.items():
+            jwk = json.loads(jwt.algorithms.RSAAlgorithm.to_jwk(private_key.public_key()))
+            jwk.update({"kid": kid, "alg": "RS256", "use": "sig"})
+            keys.append(jwk)
+        return {"keys": keys}
+
+    def issue(self, kid: str, email: str) -> str:
+        payload = {
+            "iss": "https://accounts.google.com",
+            "aud": CLIENT_ID,
+            "email": email,
+            "exp": int(time.time()) + 3600,
+        }
+        return jwt.encode(payload, self.keys[kid], algorithm="RS256", headers={"kid": kid})
+
+
+async def main() -> None:
+    silence_logging()
+    stand_in = JwksStandIn(max_age=2)
+    cache = JwksCache(stand_in.url, default_max_age=3600, refresh_margin=1, min_refetch_interval=0.5, fetch_timeout=2.0)
+    verifier = GoogleIdTokenVerifier(cache, CLIENT_ID)
+    try:
+        token = stand_in.issue("kid-1", "bench@example.com")
+        latencies = []
+        for _ in range(REQUESTS):
+            started = time.perf_counter()
+            await verifier.verify(token, request_id="bench")
+            latencies.append((time.perf_counter() - started) * 1000)
+        print("cached verify: p50=%.3fms p99=%.3fms jwks_requests=%d" % (
+            percentile(latencies, 0.5), percentile(latencies, 0.99), stand_in.requests))
+
+        stand_in.rotate("kid-2")
+        await asyncio.sleep(cache.min_refetch_interval)
+        await verifier.verify(stand_in.issue("kid-2", "rotated@example.com"), request_id="bench")
+        print("after key rotation (unknown kid refetch):", cache.stats(), "jwks_requests:", stand_in.requests)
+
+        try:
+            await verifier.verify(jwt.encode({"aud": CLIENT_ID}, "x" * 32, algorithm="HS256", headers={"kid": "bogus"}), request_id="bench")
+        except AuthenticationError as e:
+            print("bogus kid rejected:", e)
+
+        await asyncio.sleep(2.5)
+        print("after background refresh:", cache.stats(), "jwks_requests:", stand_in.requests)
+    finally:
+        await cache.close()
+        stand_in.server.shutdown()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,94 @@
+"""Стоимость поиска пользователя при логине: полный документ против проекции.
+
+before: get_by_email - весь документ auth_users и сборка полного AuthUser.
+after: get_credentials_by_email - проекция {_id, hashed_password}, которую MongoDB
+отдаёт прямо из индекса email_1_hashed_password_1__id_1 (covered query).
+
+Без mongod коллекция эмулируется в памяти: документы хранятся в BSON и
+декодируются на каждый запрос, как ответ драйвера. Поэтому замер показывает
+клиентскую часть (декодирование + сборка модели) и объём ответа; серверная
+экономия covered query (totalDocsExamined: 0 в explain) здесь не видна.
+
+Запуск из каталога services/auth-service:
+    PYTHONPATH=app:../.. python benchmarks/bench_login_lookup.py
+"""
+import asyncio
+import time
+from datetime import datetime
+from uuid import uuid4
+
+import bcrypt
+import bson
+from bson.binary import Binary, UUID_SUBTYPE
+
+from infrastructure.adapters.outbound.mongo.auth_repository import MongoAuthRepository
+from fakes import percentile, silence_logging
+
+USERS = 10000
+LOOKUPS = 20000
+
+
+class BsonCollection:
+    """find_one по одному полю с проекцией; размер каждого ответа суммируется в bytes_sent."""
+
+    def __init__(self, documents):
+        self.by_field = {}
+        for document in documents:
+            raw = bson.encode(document)
+            for name in ("email", "telegram_id"):
+                if document.get(name) is not None:
+                    self.by_field[(name, document[name])] = raw
+        self.bytes_sent = 0
+
+    async def find_one(self, query, projection=None):
+        ((name, value),) = query.items()
+        raw = self.by_field.get((name, value))
+        if raw is None:
+            return None
+        document = bson.decode(raw)
+        if projection:
+            document = {key: document[key] for key in projection if key in document}
+            raw = bson.encode(document)
+        self.bytes_sent += len(raw)
+        return bson.decode(raw)
+
+
+async def measure(lookup, emails):
+    samples = []
+    for i in range(LOOKUPS):
+        started = time.perf_counter()
+        await lookup(emails[i % len(emails)], "bench")
+        samples.append(time.perf_counter() - started)
+    return samples
+
+
+async def main() -> None:
+    silence_logging()
+    hashed = bcrypt.hashpw(b"password", bcrypt.gensalt(rounds=4)).decode()
+    documents = [
+        {
+            "_id": Binary(uuid4().bytes, UUID_SUBTYPE),
+            "email": f"user{i}@example.com",
+            "hashed_password": hashed,
+            "login_methods": ["email", "google"],
+            "telegram_id": None,
+            "created_at": datetime.utcnow(),
+        }
+        for i in range(USERS)
+    ]
+    emails = [document["email"] for document in documents]
+
+    for label, method in (("before (full document)", "get_by_email"), (" after (covered projection)", "get_credentials_by_email")):
+        collection = BsonCollection(documents)
+        repo = MongoAuthRepository(collection)
+        await measure(getattr(repo, method), emails[:1000])  # прогрев
+        collection.bytes_sent = 0
+        samples = await measure(getattr(repo, method), emails)
+        print(
+            f"{label}: p50 {percentile(samples, 0.5) * 1e6:6.1f} us, p99 {percentile(samples, 0.99) * 1e6:6.1f} us, "
+            f"{collection.bytes_sent / LOOKUPS:5.1f} bytes/lookup"
+        )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
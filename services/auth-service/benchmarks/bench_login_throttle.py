@@ -0,0 +1,138 @@
+"""Credential stuffing против Login: без ограничения попыток и с ним.
+
+Атака: 5 адресов клиентов по 8 параллельных потоков перебирают 50 существующих email
+с неверными паролями. Одновременно 16 обычных пользователей входят раз в 5 секунд каждый со своего адреса.
+Окно и лимиты уменьшены вместе с длительностью прогона (3 попытки на email и на адрес за 10 с вместо
+LOGIN_THROTTLE_*), хэши - bcrypt с rounds=10, чтобы прогон укладывался в секунды и на одном ядре.
+Считаются проверки bcrypt, потраченные на атаку, и задержка обычных входов.
+no attack: задержка обычных входов без нагрузки.
+before: каждая попытка атакующего - полная проверка bcrypt, обычные входы ждут в общей очереди пула.
+after: скользящее окно в Redis (fakeredis с настоящим скриптом) на email и на адрес клиента
+отклоняет попытки до bcrypt.
+after, slow redis: скрипт отвечает дольше LOGIN_THROTTLE_REDIS_TIMEOUT - работают локальные token bucket.
+
+Запуск из каталога services/auth-service:
+    PYTHONPATH=app:../.. python benchmarks/bench_login_throttle.py
+"""
+import asyncio
+import time
+from datetime import datetime
+from typing import Optional
+from uuid import uuid4
+
+import bcrypt
+from fakeredis import FakeAsyncRedis
+
+from application.auth_service_impl import AuthService
+from application.dto.auth_dto import LoginDTO
+from application.utils.cpu_executor import BoundedExecutor
+from application.utils.token_bucket import build_buckets
+from config import settings
+from domain.exceptions import AuthenticationError, RateLimitExceededError, ServiceOverloadedError
+from domain.models.auth_user import AuthUser
+from infrastructure.adapters.outbound.redis.rate_limiter import RedisRateLimiter
+from fakes import InMemoryAuthRepository, InMemoryTokenRepository, InMemoryUserServiceClient, StaticIdTokenVerifier, percentile, silence_logging
+
+DURATION_S = 15.0
+WINDOW_S = 10.0
+ATTEMPTS_PER_WINDOW = 3
+VICTIMS = 50
+ATTACK_PEERS = 5
+TASKS_PER_PEER = 8
+LEGIT_USERS = 16
+LEGIT_INTERVAL_S = 5.0
+PASSWORD = "correct horse battery staple"
+
+
+async def seed(repo: InMemoryAuthRepository, users: InMemoryUserServiceClient, hashed: str, email: str) -> None:
+    user_id = uuid4()
+    await repo.create(AuthUser(user_id=user_id, email=email, hashed_password=hashed, login_methods=["email"], created_at=datetime.utcnow()), "seed")
+    await users.create_user(user_id, "Bench", "user", "seed")
+
+
+def build_limiter(redis: FakeAsyncRedis) -> RedisRateLimiter:
+    rules = {"email": (ATTEMPTS_PER_WINDOW, WINDOW_S), "peer": (ATTEMPTS_PER_WINDOW, WINDOW_S)}
+    return RedisRateLimiter(redis, rules, settings.login_throttle_redis_timeout, build_buckets(rules, settings.login_throttle_local_max_keys))
+
+
+async def run_scenario(label: str, limiter: Optional[RedisRateLimiter], hashed: str, attack_peers: int = ATTACK_PEERS) -> None:
+    executor = BoundedExecutor(name="password-hasher", kind="thread", max_workers=4, max_queue=64)
+    repo, users = InMemoryAuthRepository(), InMemoryUserServiceClient()
+    service = AuthService(repo, InMemoryTokenRepository(), users, executor, StaticIdTokenVerifier(), limiter)
+    victims = [f"victim{i}@example.com" for i in range(VICTIMS)]
+    legit = [f"user{i}@example.com" for i in range(LEGIT_USERS)]
+    for email in victims + legit:
+        await seed(repo, users, hashed, email)
+    stop = asyncio.Event()
+    attack = {"attempts": 0, "rejected": 0}
+    latencies, legit_failures = [], 0
+    verified = {"attack": 0, "legit": 0}
+    verify = service._verify_password
+
+    async def counted_verify(password: str, hashed_password: str) -> bool:
+        result = await verify(password, hashed_password)
+        verified["legit" if password == PASSWORD else "attack"] += 1
+        return result
+
+    service._verify_password = counted_verify
+
+    async def attacker(peer: str, offset: int) -> None:
+        i = offset
+        while not stop.is_set():
+            attack["attempts"] += 1
+            try:
+                await service.login(LoginDTO(email=victims[i % VICTIMS], password="wrong-password"), "attack", peer)
+            except AuthenticationError:
+                pass
+            except (RateLimitExceededError, ServiceOverloadedError):
+                attack["rejected"] += 1
+                await asyncio.sleep(0.001)
+            i += TASKS_PER_PEER
+
+    async def user(index: int) -> None:
+        nonlocal legit_failures
+        await asyncio.sleep(index * LEGIT_INTERVAL_S / LEGIT_USERS)
+        while not stop.is_set():
+            started = time.perf_counter()
+            try:
+                await service.login(LoginDTO(email=legit[index], password=PASSWORD), "legit", f"192.168.0.{index}")
+                latencies.append((time.perf_counter() - started) * 1000)
+            except (RateLimitExceededError, ServiceOverloadedError):
+                legit_failures += 1
+            await asyncio.sleep(LEGIT_INTERVAL_S)
+
+    tasks = [asyncio.create_task(attacker(f"10.0.0.{peer}", task)) for peer in range(attack_peers) for task in range(TASKS_PER_PEER)]
+    tasks += [asyncio.create_task(user(index)) for index in range(LEGIT_USERS)]
+    await asyncio.sleep(DURATION_S)
+    stop.set()
+    await asyncio.gather(*tasks)
+    await executor.shutdown()
+    legit_p = f"p50 {percentile(latencies, 0.5):6.1f} ms p99 {percentile(latencies, 0.99):6.1f} ms" if latencies else "no successful logins"
+    print(
+        f"{label}: attack {attack['attempts']} attempts, {attack['rejected']} rejected, {verified['attack']} bcrypt; "
+        f"legit {legit_p}, ok {len(latencies)} failed {legit_failures}" + (f"; throttle {limiter.stats()}" if limiter else "")
+    )
+
+
+async def main() -> None:
+    silence_logging()
+    hashed = bcrypt.hashpw(PASSWORD.encode(), bcrypt.gensalt(rounds=10)).decode()
+    await run_scenario("no attack", None, hashed, attack_peers=0)
+    await run_scenario("   before", None, hashed)
+    redis = FakeAsyncRedis(decode_responses=True)
+    await run_scenario("    after", build_limiter(redis), hashed)
+    await redis.flushall()
+    slow = build_limiter(redis)
+    original = slow._sliding_window
+
+    async def slow_script(**kwargs):
+        await asyncio.sleep(settings.login_throttle_redis_timeout * 4)
+        return await original(**kwargs)
+
+    slow._sliding_window = slow_script
+    await run_scenario("after, slow redis", slow, hashed)
+    await redis.aclose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,82 @@
+"""RefreshToken p99 под нагрузкой Login: bcrypt в event loop против bcrypt в BoundedExecutor.
+
+Запуск из каталога services/auth-service:
+    PYTHONPATH=app:../.. python benchmarks/bench_password_executor.py
+"""
+import asyncio
+import time
+from typing import Any, Callable
+
+from application.auth_service_impl import AuthService
+from application.dto.auth_dto import LoginDTO, RefreshTokenDTO, RegisterDTO
+from application.utils.cpu_executor import BoundedExecutor
+from domain.exceptions import AuthenticationError, ServiceOverloadedError
+from fakes import InMemoryAuthRepository, InMemoryTokenRepository, InMemoryUserServiceClient, StaticIdTokenVerifier, percentile, silence_logging
+
+LOGIN_CONCURRENCY = 32
+REFRESH_REQUESTS = 300
+EMAIL = "bench@example.com"
+PASSWORD = "correct horse battery staple"
+
+
+class InlineExecutor(BoundedExecutor):
+    """Поведение до изменения: bcrypt выполняется прямо в event loop."""
+
+    def __init__(self):
+        super().__init__(name="inline", kind="thread", max_workers=1, max_queue=0)
+
+    async def run(self, func: Callable[..., Any], *args: Any) -> Any:
+        return func(*args)
+
+
+async def run_scenario(executor: BoundedExecutor) -> dict:
+    service = AuthService(InMemoryAuthRepository(), InMemoryTokenRepository(), InMemoryUserServiceClient(), executor, StaticIdTokenVerifier())
+    tokens = await service.register(RegisterDTO(email=EMAIL, name="Bench", password=PASSWORD), request_id="bench")
+    refresh_token = tokens.refresh_token
+    stop = asyncio.Event()
+    logins = 0
+
+    async def login_loop() -> None:
+        nonlocal logins
+        while not stop.is_set():
+            try:
+                await service.login(LoginDTO(email=EMAIL, password=PASSWORD), request_id="bench")
+                logins += 1
+            except ServiceOverloadedError:
+                await asyncio.sleep(0.001)
+
+    login_tasks = [asyncio.create_task(login_loop()) for _ in range(LOGIN_CONCURRENCY)]
+    await asyncio.sleep(0.2)
+    latencies = []
+    for _ in range(REFRESH_REQUESTS):
+        started = time.perf_counter()
+        try:
+            response = await service.refresh_token(RefreshTokenDTO(refresh_token=refresh_token), request_id="bench")
+            refresh_token = response.refresh_token
+        except AuthenticationError:
+            pass
+        latencies.append((time.perf_counter() - started) * 1000)
+        await asyncio.sleep(0.005)
+    stop.set()
+    await asyncio.gather(*login_tasks)
+    return {
+        "refresh_p50_ms": round(percentile(latencies, 0.50), 2),
+        "refresh_p99_ms": round(percentile(latencies, 0.99), 2),
+        "logins": logins,
+        "executor": executor.stats(),
+    }
+
+
+async def main() -> None:
+    silence_logging()
+    print("inline:", await run_scenario(InlineExecutor()))
+    for kind in ("thread", "process"):
+        executor = BoundedExecutor(name="password-hasher", kind=kind, max_workers=4, max_queue=16)
+        try:
+            print(f"{kind}:", await run_scenario(executor))
+        finally:
+            await executor.shutdown()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,132 @@
+"""In-memory реализации портов auth-service для бенчмарков (без MongoDB, Redis и user-service)."""
+import asyncio
+import logging
+from datetime import datetime
+from typing import Dict, Optional
+from uuid import UUID
+
+import structlog
+
+from domain.models.auth_user import AuthUser, AuthCredentials
+from domain.models.token import RefreshToken, ResetToken
+from domain.ports.outbound.auth_repository_port import AuthRepositoryPort
+from domain.ports.outbound.token_repository_port import TokenRepositoryPort
+from domain.ports.outbound.user_service_client_port import UserServiceClientPort
+from domain.ports.outbound.id_token_verifier_port import IdTokenVerifierPort
+from shared.domain.models.user import User
+
+
+def silence_logging() -> None:
+    structlog.configure(wrapper_class=structlog.make_filtering_bound_logger(logging.CRITICAL))
+
+
+def percentile(samples, q: float) -> float:
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * q))]
+
+
+class InMemoryAuthRepository(AuthRepositoryPort):
+    def __init__(self, latency_s: float = 0.0):
+        self.latency_s = latency_s
+        self.by_id: Dict[UUID, AuthUser] = {}
+
+    async def _io(self) -> None:
+        await asyncio.sleep(self.latency_s)
+
+    async def create(self, auth_user: AuthUser, request_id: str) -> None:
+        await self._io()
+        self.by_id[auth_user.user_id] = auth_user
+
+    async def get_by_id(self, user_id: UUID, request_id: str) -> Optional[AuthUser]:
+        await self._io()
+        return self.by_id.get(user_id)
+
+    async def get_by_email(self, email: str, request_id: str) -> Optional[AuthUser]:
+        await self._io()
+        return next((u for u in self.by_id.values() if u.email == email), None)
+
+    async def get_by_telegram_id(self, telegram_id: str, request_id: str) -> Optional[AuthUser]:
+        await self._io()
+        return next((u for u in self.by_id.values() if u.telegram_id == telegram_id), None)
+
+    async def get_credentials_by_email(self, email: str, request_id: str) -> Optional[AuthCredentials]:
+        auth_user = await self.get_by_email(email, request_id)
+        return AuthCredentials(auth_user.user_id, auth_user.hashed_password) if auth_user else None
+
+    async def get_id_by_email(self, email: str, request_id: str) -> Optional[UUID]:
+        auth_user = await self.get_by_email(email, request_id)
+        return auth_user.user_id if auth_user else None
+
+    async def get_id_by_telegram_id(self, telegram_id: str, request_id: str) -> Optional[UUID]:
+        auth_user = await self.get_by_telegram_id(telegram_id, request_id)
+        return auth_user.user_id if auth_user else None
+
+    async def update(self, auth_user: AuthUser, request_id: str) -> None:
+        await self._io()
+        self.by_id[auth_user.user_id] = auth_user
+
+
+class InMemoryTokenRepository(TokenRepositoryPort):
+    def __init__(self, latency_s: float = 0.0):
+        self.latency_s = latency_s
+        self.refresh: Dict[str, RefreshToken] = {}
+        self.reset: Dict[str, ResetToken] = {}
+
+    async def _io(self) -> None:
+        await asyncio.sleep(self.latency_s)
+
+    async def store_refresh_token(self, token: RefreshToken, request_id: str) -> None:
+        await self._io()
+        self.refresh[token.token] = token
+
+    async def get_refresh_token(self, token: str, request_id: str) -> Optional[RefreshToken]:
+        await self._io()
+        return self.refresh.get(token)
+
+    async def delete_refresh_token(self, token: str, request_id: str) -> None:
+        await self._io()
+        self.refresh.pop(token, None)
+
+    async def rotate_refresh_token(self, old_token: str, new_token: str, request_id: str) -> Optional[RefreshToken]:
+        await self._io()
+        old = self.refresh.pop(old_token, None)
+        if old is None:
+            return None
+        token = RefreshToken(token=new_token, user_id=old.user_id, role=old.role, role_issued_at=old.role_issued_at)
+        self.refresh[new_token] = token
+        return token
+
+    async def store_reset_token(self, token: ResetToken, request_id: str) -> None:
+        await self._io()
+        self.reset[token.token] = token
+
+    async def get_reset_token(self, token: str, request_id: str) -> Optional[ResetToken]:
+        await self._io()
+        return self.reset.get(token)
+
+    async def delete_reset_token(self, token: str, request_id: str) -> None:
+        await self._io()
+        self.reset.pop(token, None)
+
+
+class InMemoryUserServiceClient(UserServiceClientPort):
+    def __init__(self, latency_s: float = 0.0):
+        self.latency_s = latency_s
+        self.users: Dict[UUID, User] = {}
+        self.calls = 0
+
+    async def create_user(self, user_id: UUID, name: str, role: str, request_id: str) -> User:
+        await asyncio.sleep(self.latency_s)
+        user = User(id=user_id, name=name, created_at=datetime.utcnow(), role=role)
+        self.users[user_id] = user
+        return user
+
+    async def get_user_by_id(self, user_id: UUID, request_id: str) -> Optional[User]:
+        self.calls += 1
+        await asyncio.sleep(self.latency_s)
+        return self.users.get(user_id)
+
+
+class StaticIdTokenVerifier(IdTokenVerifierPort):
+    async def verify(self, id_token: str, request_id: str) -> dict:
+        return {"email": id_token, "name": "Google User"}
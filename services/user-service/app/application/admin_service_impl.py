@@ -1,16 +1,25 @@
+import asyncio
 from uuid import UUID
 from datetime import datetime
-from typing import Optional
+from typing import AsyncIterator, List, Optional, Tuple, Union
+from pydantic import ValidationError
 from domain.ports.inbound.admin_usecase_port import AdminUseCasePort
 from domain.ports.outbound.user_repository_port import UserRepositoryPort
 from shared.domain.models.user import User  # Изменяем импорт
 from domain.exceptions import UserNotFoundError, InvalidInputError
-from application.dto.user_dto import CreateUserDTO, UpdateUserDTO, UserIdDTO, UserResponseDTO
+from application.dto.user_dto import CreateUserDTO, UpdateUserDTO, UserIdDTO, UserIdsDTO, UserResponseDTO, BatchUsersResponseDTO, ListUsersDTO, BulkCreateFailureDTO, BulkCreateResultDTO
+from application.utils.list_cursor import decode_list_cursor, encode_list_cursor
 from application.utils.logging_utils import log_execution_time
 from structlog import get_logger
 
 logger = get_logger(__name__)
 
+async def _enumerate(items: AsyncIterator[dict]) -> AsyncIterator[Tuple[int, dict]]:
+    index = 0
+    async for item in items:
+        yield index, item
+        index += 1
+
 class AdminService(AdminUseCasePort):
     def __init__(self, repo: UserRepositoryPort):
         self.repo = repo
@@ -70,17 +79,144 @@ class AdminService(AdminUseCasePort):
             logger.error("Unexpected error in getting user", error=str(e), user_id=str(user_id_dto.id))
             raise RuntimeError(f"Unexpected error in getting user: {str(e)}")
 
+    @log_execution_time
+    async def get_user_encoded(self, user_id_dto: UserIdDTO, request_id: str) -> Union[bytes, UserResponseDTO]:
+        """Как get_user, но попадание в кэш возвращается байтами записи кэша, без декодирования."""
+        logger = self.logger.bind(request_id=request_id)
+        try:
+            logger.info("Fetching user", user_id=str(user_id_dto.id))
+            user = await self.repo.get_encoded_by_id(user_id_dto.id, request_id)
+            if not user:
+                logger.warning("User not found", user_id=str(user_id_dto.id))
+                raise UserNotFoundError(f"User with ID {user_id_dto.id} not found")
+            if isinstance(user, bytes):
+                logger.info("User fetched from cache in encoded form", user_id=str(user_id_dto.id))
+                return user
+            response = UserResponseDTO(
+                id=user.id,
+                name=user.name,
+                created_at=user.created_at,
+                role=user.role
+            )
+            logger.info("User fetched successfully", response=response.dict())
+            return response
+        except UserNotFoundError as e:
+            logger.error("User not found", error=str(e), user_id=str(user_id_dto.id))
+            raise
+        except Exception as e:
+            logger.error("Unexpected error in getting user", error=str(e), user_id=str(user_id_dto.id))
+            raise RuntimeError(f"Unexpected error in getting user: {str(e)}")
+
+    @log_execution_time
+    async def batch_get_users(self, user_ids_dto: UserIdsDTO, request_id: str) -> BatchUsersResponseDTO:
+        logger = self.logger.bind(request_id=request_id)
+        try:
+            logger.info("Fetching users batch", count=len(user_ids_dto.ids))
+            users = await self.repo.get_many(user_ids_dto.ids, request_id)
+            found_ids = {user.id for user in users}
+            response = BatchUsersResponseDTO(
+                users=[
+                    UserResponseDTO(id=user.id, name=user.name, created_at=user.created_at, role=user.role)
+                    for user in users
+                ],
+                missing_ids=[user_id for user_id in dict.fromkeys(user_ids_dto.ids) if user_id not in found_ids]
+            )
+            logger.info("Users batch fetched successfully", found=len(response.users), missing=len(response.missing_ids))
+            return response
+        except InvalidInputError as e:
+            logger.error("Invalid input for getting users batch", error=str(e))
+            raise
+        except Exception as e:
+            logger.error("Unexpected error in getting users batch", error=str(e))
+            raise RuntimeError(f"Unexpected error in getting users batch: {str(e)}")
+
+    async def bulk_create_users(
+        self,
+        items: AsyncIterator[dict],
+        chunk_size: int,
+        max_in_flight_chunks: int,
+        max_reported_failures: int,
+        request_id: str,
+    ) -> BulkCreateResultDTO:
+        """Создаёт пользователей из потока пачками по chunk_size, одновременно пишется не больше
+        max_in_flight_chunks пачек. Ошибки отдельных записей не прерывают импорт, а попадают в результат."""
+        logger = self.logger.bind(request_id=request_id)
+        result = BulkCreateResultDTO()
+        slots = asyncio.Semaphore(max_in_flight_chunks)
+        pending = set()
+
+        def record_failure(index: int, user_id: str, error: str) -> None:
+            result.failed_count += 1
+            if len(result.failures) < max_reported_failures:
+                result.failures.append(BulkCreateFailureDTO(index=index, id=user_id, error=error))
+
+        async def write_chunk(chunk: List[Tuple[int, User]]) -> None:
+            try:
+                failures = await self.repo.create_many([user for _, user in chunk], request_id)
+            except Exception as e:
+                logger.error("Failed to write users chunk", error=str(e), size=len(chunk))
+                failures = dict.fromkeys(range(len(chunk)), f"Write failed: {str(e)}")
+            finally:
+                slots.release()
+            result.created_count += len(chunk) - len(failures)
+            for position, error in failures.items():
+                index, user = chunk[position]
+                record_failure(index, str(user.id), error)
+
+        async def flush(chunk: List[Tuple[int, User]]) -> None:
+            # Пока все слоты заняты, стрим не читается и клиент упирается в flow control
+            await slots.acquire()
+            task = asyncio.create_task(write_chunk(chunk))
+            pending.add(task)
+            task.add_done_callback(pending.discard)
+
+        logger.info("Bulk creating users", chunk_size=chunk_size, max_in_flight_chunks=max_in_flight_chunks)
+        chunk = []
+        index = -1
+        try:
+            async for index, item in _enumerate(items):
+                try:
+                    user_dto = CreateUserDTO(**item)
+                except ValidationError as e:
+                    record_failure(index, item.get("id", ""), "; ".join(f"{'.'.join(map(str, error['loc']))}: {error['msg']}" for error in e.errors()))
+                    continue
+                chunk.append((index, User(id=user_dto.id, name=user_dto.name, created_at=datetime.utcnow(), role=user_dto.role)))
+                if len(chunk) >= chunk_size:
+                    await flush(chunk)
+                    chunk = []
+            if chunk:
+                await flush(chunk)
+        finally:
+            # Уже начатые пачки дописываются, даже если клиент оборвал стрим
+            await asyncio.gather(*pending)
+        result.failures.sort(key=lambda failure: failure.index)
+        logger.info("Bulk create completed", received=index + 1, created=result.created_count, failed=result.failed_count)
+        return result
+
+    async def list_users(self, list_dto: ListUsersDTO, request_id: str) -> AsyncIterator[Tuple[UserResponseDTO, str]]:
+        """Пользователи с токеном продолжения после каждого: клиент может возобновить выдачу с любого места."""
+        logger = self.logger.bind(request_id=request_id)
+        after_id, after_created_at = None, None
+        if list_dto.cursor:
+            after_id, after_created_at = decode_list_cursor(list_dto.order_by, list_dto.cursor)
+        logger.info("Listing users", order_by=list_dto.order_by, resumed=after_id is not None, batch_size=list_dto.batch_size, limit=list_dto.limit)
+        try:
+            async for user in self.repo.iter_users(list_dto.order_by, after_id, after_created_at, list_dto.batch_size, list_dto.limit, request_id):
+                response = UserResponseDTO(id=user.id, name=user.name, created_at=user.created_at, role=user.role)
+                yield response, encode_list_cursor(list_dto.order_by, user)
+        except Exception as e:
+            logger.error("Unexpected error in listing users", error=str(e))
+            raise RuntimeError(f"Unexpected error in listing users: {str(e)}")
+
     @log_execution_time
     async def update_user(self, user_id: UUID, user_dto: UpdateUserDTO, request_id: str) -> UserResponseDTO:
         logger = self.logger.bind(request_id=request_id)
         try:
             logger.info("Updating user", user_id=str(user_id), input_data=user_dto.dict())
-            user = await self.repo.get_by_id(user_id, request_id)
-            if not user:
+            updated_user = await self.repo.update_fields(user_id, {"name": user_dto.name}, request_id)
+            if not updated_user:
                 logger.warning("User not found", user_id=str(user_id))
                 raise UserNotFoundError(f"User with ID {user_id} not found")
-            user.set_name(user_dto.name)
-            updated_user = await self.repo.update(user, request_id)
             response = UserResponseDTO(
                 id=updated_user.id,
                 name=updated_user.name,
@@ -104,11 +240,10 @@ class AdminService(AdminUseCasePort):
         logger = self.logger.bind(request_id=request_id)
         try:
             logger.info("Deleting user", user_id=str(user_id_dto.id))
-            user = await self.repo.get_by_id(user_id_dto.id, request_id)
-            if not user:
+            # deleted_count заменяет предварительный get_by_id: он стоил лишних запросов и возвращал удаляемого пользователя в кэш
+            if not await self.repo.delete(user_id_dto.id, request_id):
                 logger.warning("User not found", user_id=str(user_id_dto.id))
                 raise UserNotFoundError(f"User with ID {user_id_dto.id} not found")
-            await self.repo.delete(user_id_dto.id, request_id)
             logger.info("User deleted successfully", user_id=str(user_id_dto.id))
             return True
         except UserNotFoundError as e:
@@ -119,4 +254,19 @@ class AdminService(AdminUseCasePort):
             raise
         except Exception as e:
             logger.error("Unexpected error in deleting user", error=str(e), user_id=str(user_id_dto.id))
-            raise RuntimeError(f"Unexpected error in deleting user: {str(e)}")
\ No newline at end of file
+            raise RuntimeError(f"Unexpected error in deleting user: {str(e)}")
+
+    @log_execution_time
+    async def delete_users(self, user_ids_dto: UserIdsDTO, request_id: str) -> int:
+        logger = self.logger.bind(request_id=request_id)
+        try:
+            logger.info("Deleting users batch", count=len(user_ids_dto.ids))
+            deleted_count = await self.repo.delete_many(user_ids_dto.ids, request_id)
+            logger.info("Users batch deleted successfully", deleted=deleted_count)
+            return deleted_count
+        except InvalidInputError as e:
+            logger.error("Invalid input for deleting users batch", error=str(e))
+            raise
+        except Exception as e:
+            logger.error("Unexpected error in deleting users batch", error=str(e))
+            raise RuntimeError(f"Unexpected error in deleting users batch: {str(e)}")
\ No newline at end of file
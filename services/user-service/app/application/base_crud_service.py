@@ -1,4 +1,4 @@
-from typing import Generic, TypeVar, Optional
+from typing import Generic, TypeVar, Optional, List
 from domain.ports.outbound.base_repository import AbstractRepository
 
 T = TypeVar("T")
@@ -11,6 +11,9 @@ class BaseCrudService(Generic[T, ID]):
     async def get_by_id(self, id: ID, request_id: str) -> Optional[T]:
         return await self.repo.get_by_id(id, request_id)
 
+    async def get_many(self, ids: List[ID], request_id: str) -> List[T]:
+        return await self.repo.get_many(ids, request_id)
+
     async def create(self, entity: T, request_id: str) -> T:
         return await self.repo.create(entity, request_id)
 
@@ -0,0 +1,18 @@
+from domain.ports.outbound.user_repository_port import UserRepositoryPort
+from structlog import get_logger
+
+logger = get_logger(__name__)
+
+
+async def warm_user_cache(repo: UserRepositoryPort, count: int, batch_size: int, request_id: str = "warmup") -> int:
+    """Загружает в кэш count последних созданных пользователей пачками по batch_size; возвращает число загруженных.
+
+    get_many заполняет локальный LRU из Redis, а Redis - из MongoDB для отсутствующих там записей.
+    Данных об активности у user-service нет, поэтому "горячими" считаются последние созданные.
+    """
+    user_ids = await repo.recent_user_ids(count, request_id)
+    loaded = 0
+    for start in range(0, len(user_ids), batch_size):
+        loaded += len(await repo.get_many(user_ids[start:start + batch_size], request_id))
+    logger.info("User cache warmed up", requested=count, loaded=loaded, request_id=request_id)
+    return loaded
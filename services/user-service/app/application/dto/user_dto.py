@@ -1,6 +1,9 @@
 from pydantic import BaseModel, Field
 from uuid import UUID
 from datetime import datetime
+from typing import List, Optional
+
+MAX_BATCH_IDS = 1000
 
 class CreateUserDTO(BaseModel):
     id: UUID
@@ -16,6 +19,9 @@ class UpdateNameDTO(BaseModel):
 class UserIdDTO(BaseModel):
     id: UUID
 
+class UserIdsDTO(BaseModel):
+    ids: List[UUID] = Field(..., min_length=1, max_length=MAX_BATCH_IDS)
+
 class UserResponseDTO(BaseModel):
     id: UUID
     name: str
@@ -27,4 +33,24 @@ class UserResponseDTO(BaseModel):
         json_encoders = {
             UUID: str,
             datetime: lambda dt: dt.isoformat()
-        }
\ No newline at end of file
+        }
+
+class BatchUsersResponseDTO(BaseModel):
+    users: List[UserResponseDTO]
+    missing_ids: List[UUID]
+
+class ListUsersDTO(BaseModel):
+    order_by: str = Field("id", pattern="^(id|created_at)$")
+    cursor: Optional[str] = None
+    batch_size: int = Field(..., ge=1, le=5000)
+    limit: int = Field(0, ge=0)
+
+class BulkCreateFailureDTO(BaseModel):
+    index: int
+    id: str
+    error: str
+
+class BulkCreateResultDTO(BaseModel):
+    created_count: int = 0
+    failed_count: int = 0
+    failures: List[BulkCreateFailureDTO] = []
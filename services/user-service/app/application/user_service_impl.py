@@ -1,5 +1,5 @@
 from uuid import UUID
-from typing import Optional
+from typing import Optional, Union
 from domain.ports.inbound.user_service_port import UserServicePort
 from domain.ports.outbound.user_repository_port import UserRepositoryPort
 from shared.domain.models.user import User  # Изменяем импорт
@@ -42,17 +42,43 @@ class UserService(UserServicePort):
             logger.error("Unexpected error in getting profile", error=str(e), user_id=str(user_id_dto.id))
             raise RuntimeError(f"Unexpected error in getting profile: {str(e)}")
 
+    @log_execution_time
+    async def get_my_profile_encoded(self, user_id_dto: UserIdDTO, request_id: str) -> Union[bytes, UserResponseDTO]:
+        """Как get_my_profile, но попадание в кэш возвращается байтами записи кэша, без декодирования."""
+        logger = self.logger.bind(request_id=request_id)
+        try:
+            logger.info("Fetching profile", user_id=str(user_id_dto.id))
+            user = await self.repo.get_encoded_by_id(user_id_dto.id, request_id)
+            if not user:
+                logger.warning("User not found", user_id=str(user_id_dto.id))
+                raise UserNotFoundError(f"User with ID {user_id_dto.id} not found")
+            if isinstance(user, bytes):
+                logger.info("User profile fetched from cache in encoded form", user_id=str(user_id_dto.id))
+                return user
+            response = UserResponseDTO(
+                id=user.id,
+                name=user.name,
+                created_at=user.created_at,
+                role=user.role
+            )
+            logger.info("User profile fetched successfully", response=response.dict())
+            return response
+        except UserNotFoundError as e:
+            logger.error("User not found", error=str(e), user_id=str(user_id_dto.id))
+            raise
+        except Exception as e:
+            logger.error("Unexpected error in getting profile", error=str(e), user_id=str(user_id_dto.id))
+            raise RuntimeError(f"Unexpected error in getting profile: {str(e)}")
+
     @log_execution_time
     async def update_my_name(self, user_id: UUID, name_dto: UpdateNameDTO, request_id: str) -> Optional[UserResponseDTO]:
         logger = self.logger.bind(request_id=request_id)
         try:
             logger.info("Updating user name", user_id=str(user_id), new_name=name_dto.name)
-            user = await self.repo.get_by_id(user_id, request_id)
-            if not user:
+            updated_user = await self.repo.update_fields(user_id, {"name": name_dto.name}, request_id)
+            if not updated_user:
                 logger.warning("User not found", user_id=str(user_id))
                 raise UserNotFoundError(f"User with ID {user_id} not found")
-            user.set_name(name_dto.name)
-            updated_user = await self.repo.update(user, request_id)
             response = UserResponseDTO(
                 id=updated_user.id,
                 name=updated_user.name,
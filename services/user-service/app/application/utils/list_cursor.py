@@ -0,0 +1,30 @@
+"""Токены продолжения для ListUsers: ключ последнего выданного пользователя в порядке сортировки."""
+import base64
+import json
+from datetime import datetime
+from typing import Optional, Tuple
+from uuid import UUID
+
+from domain.exceptions import InvalidInputError
+from shared.domain.models.user import User
+
+def encode_list_cursor(order_by: str, user: User) -> str:
+    key = {"o": order_by, "id": user.id.hex}
+    if order_by == "created_at":
+        key["t"] = user.created_at.isoformat()
+    raw = json.dumps(key, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).rstrip(b"=").decode()
+
+def decode_list_cursor(order_by: str, token: str) -> Tuple[UUID, Optional[datetime]]:
+    """(after_id, after_created_at) из токена; токен другой сортировки или повреждённый - InvalidInputError."""
+    try:
+        raw = base64.urlsafe_b64decode(token + "=" * (-len(token) % 4))
+        key = json.loads(raw)
+        if key["o"] != order_by:
+            raise InvalidInputError(f"Cursor was issued for order_by={key['o']}, not {order_by}")
+        after_created_at = datetime.fromisoformat(key["t"]) if order_by == "created_at" else None
+        return UUID(hex=key["id"]), after_created_at
+    except InvalidInputError:
+        raise
+    except (ValueError, KeyError, TypeError) as e:
+        raise InvalidInputError(f"Invalid cursor: {str(e)}")
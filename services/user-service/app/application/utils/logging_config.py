@@ -0,0 +1,131 @@
+import logging
+import logging.handlers
+import queue
+import sys
+from typing import Dict, Optional, TextIO
+import structlog
+from application.utils.logging_utils import configure_timing_sampling
+from shared.metrics.registry import expose_stats
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - orjson ускоряет рендеринг, но не обязателен
+    orjson = None
+
+_listener: Optional[logging.handlers.QueueListener] = None
+
+
+def _json_serializer(obj, **kwargs) -> str:
+    if orjson is not None:
+        return orjson.dumps(obj, default=str).decode()
+    import json
+    return json.dumps(obj, ensure_ascii=False, default=str)
+
+
+class GatedBoundLogger(structlog.stdlib.BoundLogger):
+    """Проверяет уровень stdlib-логгера до запуска цепочки процессоров и рендеринга."""
+
+    def debug(self, event=None, *args, **kw):
+        if not self._logger.isEnabledFor(logging.DEBUG):
+            return None
+        return super().debug(event, *args, **kw)
+
+    def info(self, event=None, *args, **kw):
+        if not self._logger.isEnabledFor(logging.INFO):
+            return None
+        return super().info(event, *args, **kw)
+
+    def warning(self, event=None, *args, **kw):
+        if not self._logger.isEnabledFor(logging.WARNING):
+            return None
+        return super().warning(event, *args, **kw)
+
+    warn = warning
+
+
+class DroppingQueueHandler(logging.handlers.QueueHandler):
+    """Не блокирует event loop: при переполнении очереди запись отбрасывается и учитывается."""
+
+    dropped = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # Рендеринг выполняет поток QueueListener, здесь запись передаётся как есть
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            DroppingQueueHandler.dropped += 1
+
+
+def logging_stats() -> dict:
+    """Счётчики очереди логов для метрик: отброшенные записи и текущая длина очереди."""
+    return {
+        "dropped": DroppingQueueHandler.dropped,
+        "queue_size": _listener.queue.qsize() if _listener is not None else 0,
+    }
+
+
+def parse_log_levels(spec: str) -> Dict[str, str]:
+    """Разбирает строку вида "infrastructure.adapters.outbound.redis=WARNING,application=INFO"."""
+    levels = {}
+    for item in filter(None, (part.strip() for part in spec.split(","))):
+        name, _, level = item.partition("=")
+        levels[name.strip()] = level.strip().upper()
+    return levels
+
+
+def configure_logging(
+    level: str = "INFO",
+    logger_levels: Optional[Dict[str, str]] = None,
+    timing_sample_rate: float = 1.0,
+    queue_size: int = 10000,
+    stream: Optional[TextIO] = None,
+) -> None:
+    """Настраивает structlog: рендеринг JSON и запись в stdout выполняются в фоновом потоке."""
+    global _listener
+    stop_logging()
+
+    output = logging.StreamHandler(stream or sys.stdout)
+    output.setFormatter(structlog.stdlib.ProcessorFormatter(
+        processors=[
+            structlog.stdlib.ProcessorFormatter.remove_processors_meta,
+            structlog.processors.JSONRenderer(serializer=_json_serializer),
+        ],
+    ))
+    _listener = logging.handlers.QueueListener(queue.Queue(maxsize=queue_size), output, respect_handler_level=False)
+    _listener.start()
+
+    root = logging.getLogger()
+    root.handlers[:] = [DroppingQueueHandler(_listener.queue)]
+    root.setLevel(level.upper())
+    for name, logger_level in (logger_levels or {}).items():
+        logging.getLogger(name).setLevel(logger_level)
+
+    structlog.configure(
+        processors=[
+            structlog.processors.TimeStamper(fmt="iso"),
+            structlog.stdlib.add_log_level,
+            structlog.stdlib.add_logger_name,
+            structlog.stdlib.PositionalArgumentsFormatter(),
+            structlog.stdlib.ProcessorFormatter.wrap_for_formatter,
+        ],
+        context_class=dict,
+        logger_factory=structlog.stdlib.LoggerFactory(),
+        wrapper_class=GatedBoundLogger,
+        cache_logger_on_first_use=True,
+    )
+    configure_timing_sampling(timing_sample_rate)
+    expose_stats("logging", logging_stats)
+
+
+def stop_logging() -> None:
+    """Дописывает очередь и останавливает фоновый поток."""
+    global _listener
+    if _listener is not None:
+        if DroppingQueueHandler.dropped:
+            # Ещё через очередь: stop() допишет её до конца
+            structlog.get_logger(__name__).warning("Log records dropped, queue was full", dropped=DroppingQueueHandler.dropped)
+        _listener.stop()
+        _listener = None
@@ -1,17 +1,40 @@
+import logging
+import random
 import time
+from contextvars import ContextVar
 from functools import wraps
 from typing import Callable, TypeVar, Any
 from uuid import uuid4
 from structlog import get_logger
 
 logger = get_logger(__name__)
+_stdlib_logger = logging.getLogger(__name__)
 
 T = TypeVar('T')
 
+_timing_sample_rate = 1.0
+
+# request_id текущего RPC; выставляется серверным интерсептором
+request_id_var: ContextVar[str] = ContextVar("request_id")
+
+def configure_timing_sampling(rate: float) -> None:
+    """Задаёт долю успешных вызовов, для которых логируется время выполнения (ошибки логируются всегда)."""
+    global _timing_sample_rate
+    _timing_sample_rate = min(max(rate, 0.0), 1.0)
+
+def timing_log_sampled() -> bool:
+    """Нужно ли логировать время успешного вызова с учётом LOG_TIMING_SAMPLE_RATE."""
+    return _timing_sample_rate >= 1.0 or random.random() < _timing_sample_rate
+
 def generate_request_id() -> str:
     """Генерирует уникальный request_id."""
     return str(uuid4())
 
+def current_request_id() -> str:
+    """request_id текущего RPC или новый, если вызов пришёл не через gRPC-сервер."""
+    request_id = request_id_var.get(None)
+    return request_id if request_id is not None else generate_request_id()
+
 def filter_sensitive_data(data: dict) -> dict:
     """Фильтрует конфиденциальные данные, такие как пароли."""
     return {k: v for k, v in data.items() if k != "password"}
@@ -21,22 +44,27 @@ def log_execution_time(func: Callable[..., T]) -> Callable[..., T]:
     @wraps(func)
     async def async_wrapper(*args, **kwargs) -> T:
         start_time = time.perf_counter()
-        request_id = kwargs.get('request_id', generate_request_id())  # Используем переданный request_id
-        logger_with_request = logger.bind(request_id=request_id)
         try:
             result = await func(*args, **kwargs)
+            # Уровень и выборка проверяются до сборки полей события; request_id передаётся полем, без bind
+            if not _stdlib_logger.isEnabledFor(logging.INFO) or not timing_log_sampled():
+                return result
             duration_ms = (time.perf_counter() - start_time) * 1000
-            logger_with_request.info(
+            logger.info(
                 f"Функция {func.__name__} выполнена успешно",
+                request_id=kwargs.get('request_id') or current_request_id(),
                 duration_ms=f"{duration_ms:.2f}",
                 func_name=func.__name__,
                 module=func.__module__,
             )
             return result
         except Exception as e:
+            if not _stdlib_logger.isEnabledFor(logging.ERROR):
+                raise
             duration_ms = (time.perf_counter() - start_time) * 1000
-            logger_with_request.error(
+            logger.error(
                 f"Функция {func.__name__} завершилась с ошибкой",
+                request_id=kwargs.get('request_id') or current_request_id(),
                 duration_ms=f"{duration_ms:.2f}",
                 func_name=func.__name__,
                 module=func.__module__,
@@ -5,10 +5,44 @@ class Settings(BaseSettings):
     mongo_uri: str = Field(..., env="MONGO_URI")
     mongo_db: str = Field("user_service", env="MONGO_DB")
     mongo_uuid_representation: str = Field("standard", env="MONGO_UUID_REPRESENTATION")
+    mongo_min_pool_size: int = Field(10, env="MONGO_MIN_POOL_SIZE", ge=0)  # Соединения, открытые при прогреве и поддерживаемые драйвером
+    mongo_index_check: str = Field("warn", env="MONGO_INDEX_CHECK", pattern="^(off|warn|fail)$")  # off | warn | fail: fail - старт ждёт индексы, COLLSCAN в планах - ошибка
     jwt_secret_key: str = Field(..., env="JWT_SECRET_KEY", min_length=32)
     grpc_port: int = Field(50051, env="GRPC_PORT")
     redis_uri: str = Field("redis://redis:6379/0", env="REDIS_URI")  # Добавляем Redis URI
     redis_ttl: int = Field(3600, env="REDIS_TTL")  # Время жизни кэша в секундах (1 час)
+    cache_ttl_jitter: float = Field(0.1, env="CACHE_TTL_JITTER", ge=0, lt=1)  # Доля, на которую случайно сокращается TTL записи
+    cache_xfetch_beta: float = Field(1.0, env="CACHE_XFETCH_BETA", ge=0)  # Насколько заранее обновлять записи; 0 - не обновлять
+    cache_tombstone_ttl: int = Field(60, env="CACHE_TOMBSTONE_TTL")  # Сколько после удаления кэш отклоняет запись ключа и отвечает, что его нет
+    cache_negative_ttl: int = Field(30, env="CACHE_NEGATIVE_TTL", gt=0)  # Сколько кэш помнит, что пользователя с таким ID нет
+    log_level: str = Field("INFO", env="LOG_LEVEL")
+    log_levels: str = Field("", env="LOG_LEVELS")  # Уровни по логгерам: "infrastructure.adapters.outbound.redis=WARNING,..."
+    log_timing_sample_rate: float = Field(1.0, env="LOG_TIMING_SAMPLE_RATE", ge=0.0, le=1.0)  # Доля логов успешных вызовов
+    log_queue_size: int = Field(10000, env="LOG_QUEUE_SIZE")
+    cache_format: str = Field("protobuf", env="CACHE_FORMAT", pattern="^(json|protobuf)$")  # protobuf: в кэше готовый UserResponse
+    local_cache_enabled: bool = Field(True, env="LOCAL_CACHE_ENABLED")  # Локальный LRU поверх Redis
+    local_cache_max_size: int = Field(10000, env="LOCAL_CACHE_MAX_SIZE")
+    local_cache_ttl: int = Field(30, env="LOCAL_CACHE_TTL")  # Ограничивает устаревание при потере инвалидации
+    cache_invalidation_channel: str = Field("cache:invalidate", env="CACHE_INVALIDATION_CHANNEL")
+    singleflight_enabled: bool = Field(True, env="SINGLEFLIGHT_ENABLED")  # Объединение конкурентных промахов кэша
+    jwt_cache_max_size: int = Field(10000, env="JWT_CACHE_MAX_SIZE", ge=0)  # Кэш проверенных JWT, 0 - отключён
+    jwt_revocation_check_enabled: bool = Field(False, env="JWT_REVOCATION_CHECK_ENABLED")  # revoked_token:<sha256> в Redis
+    jwt_revocation_recheck_interval: float = Field(5.0, env="JWT_REVOCATION_RECHECK_INTERVAL", ge=0)
+    grpc_workers: int = Field(1, env="GRPC_WORKERS", ge=1)  # >1: супервизор и N процессов на одном порту (SO_REUSEPORT)
+    worker_heartbeat_timeout: float = Field(30.0, env="WORKER_HEARTBEAT_TIMEOUT", gt=0)  # Воркер с зависшим event loop перезапускается
+    shutdown_grace_period: float = Field(10.0, env="SHUTDOWN_GRACE_PERIOD", ge=0)  # Сколько ждать текущие RPC после SIGTERM
+    list_users_batch_size: int = Field(500, env="LIST_USERS_BATCH_SIZE", ge=1, le=5000)  # Пачка курсора ListUsers по умолчанию
+    bulk_create_chunk_size: int = Field(1000, env="BULK_CREATE_CHUNK_SIZE", ge=1)  # Пользователей в одном insert_many
+    bulk_create_max_in_flight_chunks: int = Field(4, env="BULK_CREATE_MAX_IN_FLIGHT_CHUNKS", ge=1)  # Одновременных insert_many на один импорт
+    bulk_create_max_reported_errors: int = Field(1000, env="BULK_CREATE_MAX_REPORTED_ERRORS", ge=0)  # Остальные ошибки учитываются только в failed_count
+    concurrency_limit_enabled: bool = Field(True, env="CONCURRENCY_LIMIT_ENABLED")  # Адаптивный лимит, сверх него RESOURCE_EXHAUSTED
+    concurrency_limits: str = Field("default=20:5:1000,batch=5:2:200,stream=8:1:8", env="CONCURRENCY_LIMITS")  # класс=начальный:минимум:максимум; у stream лимит фиксирован
+    grpc_max_concurrent_rpcs: int = Field(2000, env="GRPC_MAX_CONCURRENT_RPCS", ge=1)  # Жёсткий потолок gRPC поверх адаптивного лимита
+    warmup_timeout: float = Field(10.0, env="WARMUP_TIMEOUT", gt=0)  # Предел каждого шага прогрева; health до конца прогрева - NOT_SERVING
+    warmup_cache_users: int = Field(0, env="WARMUP_CACHE_USERS", ge=0)  # Последних созданных пользователей загрузить в кэш при старте, 0 - не загружать
+    warmup_cache_batch_size: int = Field(500, env="WARMUP_CACHE_BATCH_SIZE", ge=1)
+    metrics_enabled: bool = Field(True, env="METRICS_ENABLED")
+    metrics_port: int = Field(9101, env="METRICS_PORT")  # HTTP /metrics в формате Prometheus
 
     class Config:
         env_file = ".env"
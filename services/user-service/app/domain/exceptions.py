@@ -2,6 +2,10 @@ class AuthenticationError(Exception):
     """Raised when authentication fails."""
     pass
 
+class PermissionDeniedError(AuthenticationError):
+    """Raised when an authenticated caller lacks the required role."""
+    pass
+
 class UserNotFoundError(Exception):
     """Raised when a user is not found."""
     pass
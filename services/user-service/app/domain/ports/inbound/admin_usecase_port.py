@@ -1,7 +1,7 @@
 from abc import ABC, abstractmethod
-from typing import Optional
+from typing import AsyncIterator, Optional, Tuple, Union
 from uuid import UUID
-from application.dto.user_dto import CreateUserDTO, UpdateUserDTO, UserIdDTO, UserResponseDTO
+from application.dto.user_dto import CreateUserDTO, UpdateUserDTO, UserIdDTO, UserIdsDTO, UserResponseDTO, BatchUsersResponseDTO, ListUsersDTO, BulkCreateResultDTO
 
 class AdminUseCasePort(ABC):
     @abstractmethod
@@ -10,8 +10,30 @@ class AdminUseCasePort(ABC):
     @abstractmethod
     async def get_user(self, user_id_dto: UserIdDTO, request_id: str) -> Optional[UserResponseDTO]: ...
 
+    @abstractmethod
+    async def get_user_encoded(self, user_id_dto: UserIdDTO, request_id: str) -> Union[bytes, UserResponseDTO]: ...
+
+    @abstractmethod
+    async def batch_get_users(self, user_ids_dto: UserIdsDTO, request_id: str) -> BatchUsersResponseDTO: ...
+
+    @abstractmethod
+    async def bulk_create_users(
+        self,
+        items: AsyncIterator[dict],
+        chunk_size: int,
+        max_in_flight_chunks: int,
+        max_reported_failures: int,
+        request_id: str,
+    ) -> BulkCreateResultDTO: ...
+
+    @abstractmethod
+    def list_users(self, list_dto: ListUsersDTO, request_id: str) -> AsyncIterator[Tuple[UserResponseDTO, str]]: ...
+
     @abstractmethod
     async def update_user(self, user_id: UUID, user_dto: UpdateUserDTO, request_id: str) -> Optional[UserResponseDTO]: ...
 
     @abstractmethod
-    async def delete_user(self, user_id_dto: UserIdDTO, request_id: str) -> bool: ...
\ No newline at end of file
+    async def delete_user(self, user_id_dto: UserIdDTO, request_id: str) -> bool: ...
+
+    @abstractmethod
+    async def delete_users(self, user_ids_dto: UserIdsDTO, request_id: str) -> int: ...
\ No newline at end of file
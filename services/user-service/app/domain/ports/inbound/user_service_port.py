@@ -1,5 +1,5 @@
 from abc import ABC, abstractmethod
-from typing import Optional
+from typing import Optional, Union
 from uuid import UUID
 from application.dto.user_dto import UserIdDTO, UpdateNameDTO, UserResponseDTO
 
@@ -7,5 +7,8 @@ class UserServicePort(ABC):
     @abstractmethod
     async def get_my_profile(self, user_id_dto: UserIdDTO, request_id: str) -> Optional[UserResponseDTO]: ...
 
+    @abstractmethod
+    async def get_my_profile_encoded(self, user_id_dto: UserIdDTO, request_id: str) -> Union[bytes, UserResponseDTO]: ...
+
     @abstractmethod
     async def update_my_name(self, user_id: UUID, name_dto: UpdateNameDTO, request_id: str) -> Optional[UserResponseDTO]: ...
\ No newline at end of file
@@ -1,5 +1,5 @@
 from abc import ABC, abstractmethod
-from typing import Generic, TypeVar, Optional
+from typing import Generic, TypeVar, Optional, List
 
 T = TypeVar("T")
 ID = TypeVar("ID")
@@ -8,6 +8,9 @@ class AbstractRepository(ABC, Generic[T, ID]):
     @abstractmethod
     async def get_by_id(self, id: ID, request_id: str) -> Optional[T]: ...
 
+    @abstractmethod
+    async def get_many(self, ids: List[ID], request_id: str) -> List[T]: ...
+
     @abstractmethod
     async def create(self, entity: T, request_id: str) -> T: ...
 
@@ -15,4 +18,4 @@ class AbstractRepository(ABC, Generic[T, ID]):
     async def update(self, entity: T, request_id: str) -> T: ...
 
     @abstractmethod
-    async def delete(self, id: ID, request_id: str) -> None: ...
\ No newline at end of file
+    async def delete(self, id: ID, request_id: str) -> bool: ...
\ No newline at end of file
@@ -1,10 +1,22 @@
 from abc import ABC, abstractmethod
-from typing import Optional, Any
+from typing import Awaitable, Callable, Optional, Any, Dict, List, Tuple
+
+# Загрузчик для раннего обновления: по ключу кэша возвращает (значение, версия) или None
+CacheLoader = Callable[[str], Awaitable[Optional[Tuple[Any, int]]]]
+
+# Отрицательная запись: ключа нет в источнике. get/get_encoded возвращают её вместо None,
+# а проверки вида "if cached" по-прежнему считают её промахом
+NEGATIVE_ENTRY = b""
 
 class CachePort(ABC):
     @abstractmethod
     async def get(self, key: str) -> Optional[Any]:
-        """Получить значение из кэша по ключу."""
+        """Получить значение из кэша по ключу; NEGATIVE_ENTRY - ключа нет в источнике."""
+        pass
+
+    @abstractmethod
+    async def get_encoded(self, key: str) -> Optional[bytes]:
+        """Получить значение в сериализованном виде, без декодирования."""
         pass
 
     @abstractmethod
@@ -12,6 +24,50 @@ class CachePort(ABC):
         """Установить значение в кэш с указанным TTL."""
         pass
 
+    @abstractmethod
+    async def get_many(self, keys: List[str]) -> List[Optional[Any]]:
+        """Получить значения по списку ключей за один запрос, в порядке ключей."""
+        pass
+
+    @abstractmethod
+    async def set_many(self, items: Dict[str, Any], ttl: int) -> None:
+        """Установить несколько значений в кэш с указанным TTL за один запрос."""
+        pass
+
+    @abstractmethod
+    async def set_versioned(
+        self, key: str, value: Any, version: int, ttl: int, compute_time: float = 0.0, replace_negative: bool = False
+    ) -> bool:
+        """Установить значение, если в кэше нет более новой версии; False - запись отклонена.
+
+        compute_time - сколько секунд стоило получить значение; по нему решается, насколько
+        заранее обновлять запись до истечения TTL. replace_negative - записать поверх
+        отрицательной записи и tombstone (ключ только что появился в источнике).
+        """
+        pass
+
+    @abstractmethod
+    async def set_many_versioned(
+        self, items: Dict[str, Tuple[Any, int]], ttl: int, compute_time: float = 0.0, replace_negative: bool = False
+    ) -> Dict[str, bool]:
+        """set_versioned для нескольких ключей за один запрос: items - {ключ: (значение, версия)}."""
+        pass
+
+    @abstractmethod
+    async def set_negative_many(self, keys: List[str], ttl: int) -> None:
+        """Запомнить на ttl секунд, что ключей нет в источнике; существующие записи не трогает."""
+        pass
+
+    @abstractmethod
+    def register_refresher(self, prefix: str, loader: CacheLoader, ttl: int) -> None:
+        """Записи с ключами на prefix чтение будет заранее обновлять в фоне через loader."""
+        pass
+
+    @abstractmethod
+    async def purge_many(self, keys: List[str], ttl: int) -> None:
+        """Удалить значения и на ttl секунд запретить их запись с любой версией (tombstone)."""
+        pass
+
     @abstractmethod
     async def delete(self, key: str) -> None:
         """Удалить значение из кэша по ключу."""
@@ -0,0 +1,7 @@
+from abc import ABC, abstractmethod
+
+class TokenRevocationPort(ABC):
+    @abstractmethod
+    async def is_revoked(self, token_digest: str) -> bool:
+        """Проверить, отозван ли токен, по SHA-256 дайджесту (hex)."""
+        pass
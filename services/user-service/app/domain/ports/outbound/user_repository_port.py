@@ -1,5 +1,6 @@
 from abc import ABC, abstractmethod
-from typing import Optional
+from datetime import datetime
+from typing import Any, AsyncIterator, Dict, List, Optional, Union
 from uuid import UUID
 from shared.domain.models.user import User  # Изменяем импорт
 from domain.ports.outbound.base_repository import AbstractRepository
@@ -10,4 +11,45 @@ class UserRepositoryPort(AbstractRepository[User, UUID]):
         """
         Метод заглушка, так как email теперь обрабатывается в auth-service.
         """
-        raise NotImplementedError("Email-based queries are handled by auth-service")
\ No newline at end of file
+        raise NotImplementedError("Email-based queries are handled by auth-service")
+
+    @abstractmethod
+    async def get_encoded_by_id(self, user_id: UUID, request_id: str) -> Union[bytes, User, None]:
+        """Как get_by_id, но при попадании в кэш возвращает запись в виде байтов кодека, без декодирования.
+
+        Промах загружается из MongoDB без повторного чтения кэша и возвращается как User.
+        """
+        ...
+
+    @abstractmethod
+    async def create_many(self, users: List[User], request_id: str) -> Dict[int, str]:
+        """Вставляет пользователей без остановки на ошибках; возвращает {индекс в users: причина} для невставленных."""
+        ...
+
+    @abstractmethod
+    async def delete_many(self, user_ids: List[UUID], request_id: str) -> int:
+        """Удаляет пользователей одним запросом; возвращает число удалённых документов."""
+        ...
+
+    @abstractmethod
+    async def update_fields(self, user_id: UUID, fields: Dict[str, Any], request_id: str) -> Optional[User]:
+        """Атомарно меняет только переданные поля и возвращает пользователя после изменения; None - не найден."""
+        ...
+
+    @abstractmethod
+    async def recent_user_ids(self, limit: int, request_id: str) -> List[UUID]:
+        """ID последних созданных пользователей, от новых к старым."""
+        ...
+
+    @abstractmethod
+    def iter_users(
+        self,
+        order_by: str,
+        after_id: Optional[UUID],
+        after_created_at: Optional[datetime],
+        batch_size: int,
+        limit: int,
+        request_id: str,
+    ) -> AsyncIterator[User]:
+        """Пользователи по возрастанию ключа сортировки (keyset), начиная строго после переданного ключа."""
+        ...
@@ -0,0 +1,26 @@
+"""Обслуживание индексов коллекции users.
+
+    python app/index_cli.py check
+    python app/index_cli.py rebuild name_1
+
+rebuild - разовая миграция для индексов с изменившимися опциями: индекс удаляется
+и строится заново. Запускать одним процессом, а не каждым воркером сервиса.
+"""
+import sys
+from pymongo import AsyncMongoClient
+from config import settings
+from main import setup_logging
+from application.utils.logging_config import stop_logging
+from infrastructure.adapters.outbound.mongo.user_repository import MongoUserRepository
+from shared.mongo.indexes import run_index_cli
+
+def open_collection():
+    client = AsyncMongoClient(settings.mongo_uri, uuidRepresentation=settings.mongo_uuid_representation)
+    return client, client[settings.mongo_db]["users"]
+
+if __name__ == "__main__":
+    setup_logging()
+    try:
+        sys.exit(run_index_cli(sys.argv[1:], open_collection, MongoUserRepository.INDEXES, MongoUserRepository.QUERY_SHAPES))
+    finally:
+        stop_logging()
@@ -1,77 +1,103 @@
+import logging
 import grpc
 import asyncio
-import jwt
 from grpc.aio import server as aio_server
 from grpc_reflection.v1alpha import reflection
+from typing import Dict, List, Sequence
 from uuid import UUID
-from functools import wraps
-from dishka import AsyncContainer
+from pymongo import AsyncMongoClient
+from redis.asyncio import Redis
 from config import settings
+from shared.metrics.exporter import start_metrics_server
+from shared.serving.concurrency_limiter import AdaptiveConcurrencyLimiter, parse_concurrency_limits
+from shared.serving.health import HEALTH_SERVICE_NAME, add_health_servicer, mark_serving
+from shared.serving.supervisor import install_shutdown_handler, run_heartbeat
+from shared.serving.warmup import run_warmup, warm_mongo_pool, warm_redis
 from infrastructure.di.container import get_container
 from application.user_service_impl import UserService
 from application.admin_service_impl import AdminService
-from application.dto.user_dto import CreateUserDTO, UpdateUserDTO, UserIdDTO, UpdateNameDTO
-from application.utils.logging_utils import generate_request_id, log_execution_time
-from application.utils.grpc_utils import handle_grpc_exceptions
-from domain.exceptions import AuthenticationError, InvalidInputError
+from application.cache_warmup import warm_user_cache
+from application.dto.user_dto import CreateUserDTO, UpdateUserDTO, UserIdDTO, UserIdsDTO, UpdateNameDTO, ListUsersDTO, MAX_BATCH_IDS
+from application.utils.logging_utils import current_request_id
+from domain.exceptions import InvalidInputError
+from domain.ports.outbound.user_repository_port import UserRepositoryPort
+from infrastructure.adapters.inbound.grpc.user_response_codec import is_serialized_user_response
+from infrastructure.adapters.inbound.grpc.token_verifier import TokenVerifier
+from infrastructure.adapters.inbound.grpc.interceptors import (
+    ADMIN_POLICY,
+    USER_POLICY,
+    AuthInterceptor,
+    ConcurrencyLimitInterceptor,
+    RequestContextInterceptor,
+    current_principal,
+)
 from . import user_pb2_grpc, user_pb2
 from structlog import get_logger
 
 logger = get_logger(__name__)
+# Уровень проверяется до сборки полей события: input_data.dict() и т.п. не строятся зря
+_stdlib_logger = logging.getLogger(__name__)
 
-SERVICE_NAMES = (
+APP_SERVICE_NAMES = (
     user_pb2.DESCRIPTOR.services_by_name['AdminService'].full_name,
     user_pb2.DESCRIPTOR.services_by_name['UserService'].full_name,
-    reflection.SERVICE_NAME,
 )
+SERVICE_NAMES = APP_SERVICE_NAMES + (HEALTH_SERVICE_NAME, reflection.SERVICE_NAME)
 
-def jwt_auth_middleware(func):
-    @wraps(func)
-    async def wrapper(self, request, context, request_id: str):
-        logger = self.logger.bind(request_id=request_id)
-        metadata = dict(context.invocation_metadata())
-        token = metadata.get('authorization')
-        if not token:
-            logger.error("No authorization token provided")
-            context.set_code(grpc.StatusCode.UNAUTHENTICATED)
-            context.set_details("Authorization token required")
-            raise AuthenticationError("Authorization token required")
-        try:
-            payload = jwt.decode(token.replace("Bearer ", ""), settings.jwt_secret_key, algorithms=["HS256"])
-            user_id = UUID(payload['user_id'])
-        except (jwt.InvalidTokenError, KeyError) as e:
-            logger.error("Invalid JWT token", error=str(e))
-            context.set_code(grpc.StatusCode.UNAUTHENTICATED)
-            context.set_details(f"Invalid JWT token: {str(e)}")
-            raise AuthenticationError(f"Invalid JWT token: {str(e)}")
-        return await func(self, request, context, request_id, user_id)
-    return wrapper
-
-def admin_auth_middleware(func):
-    @wraps(func)
-    async def wrapper(self, request, context, request_id: str):
-        logger = self.logger.bind(request_id=request_id)
-        metadata = dict(context.invocation_metadata())
-        token = metadata.get('authorization')
-        if not token:
-            logger.error("No authorization token provided")
-            context.set_code(grpc.StatusCode.UNAUTHENTICATED)
-            context.set_details("Authorization token required")
-            raise AuthenticationError("Authorization token required")
-        try:
-            payload = jwt.decode(token.replace("Bearer ", ""), settings.jwt_secret_key, algorithms=["HS256"])
-            if payload.get('role') != 'admin':
-                logger.error("User is not an admin", user_id=payload.get('user_id'))
-                context.set_code(grpc.StatusCode.PERMISSION_DENIED)
-                context.set_details("Admin access required")
-                raise AuthenticationError("Admin access required")
-        except jwt.InvalidTokenError as e:
-            logger.error("Invalid JWT token", error=str(e))
-            context.set_code(grpc.StatusCode.UNAUTHENTICATED)
-            context.set_details(f"Invalid JWT token: {str(e)}")
-            raise AuthenticationError(f"Invalid JWT token: {str(e)}")
-        return await func(self, request, context, request_id)
-    return wrapper
+def serialize_response(message) -> bytes:
+    """Ответ уже может быть сериализованным UserResponse из кэша - такие байты отправляем как есть."""
+    if isinstance(message, bytes):
+        return message
+    return message.SerializeToString()
+
+def add_servicer_to_server(servicer, server, service_name: str) -> None:
+    """Аналог сгенерированного add_*Servicer_to_server с serialize_response в качестве сериализатора."""
+    service = user_pb2.DESCRIPTOR.services_by_name[service_name]
+    handlers = {}
+    for method in service.methods:
+        request_deserializer = getattr(user_pb2, method.input_type.name).FromString
+        if method.client_streaming and method.server_streaming:
+            handler_factory = grpc.stream_stream_rpc_method_handler
+        elif method.client_streaming:
+            handler_factory = grpc.stream_unary_rpc_method_handler
+        elif method.server_streaming:
+            handler_factory = grpc.unary_stream_rpc_method_handler
+        else:
+            handler_factory = grpc.unary_unary_rpc_method_handler
+        handlers[method.name] = handler_factory(
+            getattr(servicer, method.name),
+            request_deserializer=request_deserializer,
+            response_serializer=serialize_response,
+        )
+    server.add_generic_rpc_handlers((grpc.method_handlers_generic_handler(service.full_name, handlers),))
+
+AUTH_POLICIES = {
+    user_pb2.DESCRIPTOR.services_by_name['AdminService'].full_name: ADMIN_POLICY,
+    user_pb2.DESCRIPTOR.services_by_name['UserService'].full_name: USER_POLICY,
+}
+
+# Методы с заметно большей стоимостью получают отдельный лимит, остальные - класс default
+LIMIT_CLASSES = {
+    "BatchGetUsers": "batch",
+    "DeleteUsers": "batch",
+    "ListUsers": "stream",
+    "BulkCreateUsers": "stream",
+}
+
+def build_limiters(spec: str) -> Dict[str, AdaptiveConcurrencyLimiter]:
+    return {
+        name: AdaptiveConcurrencyLimiter(name, initial_limit=initial, min_limit=min_limit, max_limit=max_limit)
+        for name, (initial, min_limit, max_limit) in parse_concurrency_limits(spec).items()
+    }
+
+def build_interceptors(token_verifier: TokenVerifier) -> List[grpc.aio.ServerInterceptor]:
+    """Конвейер обработки RPC: внешний интерсептор видит ошибки (и отказы по лимиту) внутренних."""
+    interceptors = [RequestContextInterceptor()]
+    if settings.concurrency_limit_enabled:
+        # До аутентификации: при перегрузке отклоняем, не тратя время на проверку JWT
+        interceptors.append(ConcurrencyLimitInterceptor(build_limiters(settings.concurrency_limits), LIMIT_CLASSES))
+    interceptors.append(AuthInterceptor(token_verifier, AUTH_POLICIES))
+    return interceptors
 
 def response_to_dict(response):
     if isinstance(response, user_pb2.UserResponse):
@@ -83,151 +109,295 @@ def response_to_dict(response):
         }
     elif isinstance(response, user_pb2.UserDeletedResponse):
         return {"success": response.success}
+    elif isinstance(response, user_pb2.BatchGetUsersResponse):
+        return {"users_count": len(response.users), "missing_ids": list(response.missing_ids)}
+    elif isinstance(response, user_pb2.DeleteUsersResponse):
+        return {"deleted_count": response.deleted_count}
     return response.__dict__
 
+def _validate_batch(ids: Sequence[str], limit: int) -> UserIdsDTO:
+    """Список id из batch-запроса; пустой, больше limit или с неверным UUID - InvalidInputError."""
+    if not ids:
+        raise InvalidInputError("At least one id is required")
+    if len(ids) > limit:
+        raise InvalidInputError(f"Too many ids: {len(ids)}, at most {limit} per request")
+    try:
+        return UserIdsDTO(ids=[UUID(user_id) for user_id in ids])
+    except ValueError as e:
+        raise InvalidInputError(f"Invalid UUID format: {str(e)}")
+
 class AdminServiceGRPC(user_pb2_grpc.AdminServiceServicer):
-    def __init__(self, container: AsyncContainer):
-        self.container = container
+    def __init__(self, admin_service: AdminService, serve_encoded: bool):
+        self.admin_service = admin_service
+        # Отдавать профиль из кэша готовыми байтами UserResponse; только при CACHE_FORMAT=protobuf
+        self.serve_encoded = serve_encoded
         self.logger = logger.bind(service="AdminServiceGRPC")
 
-    async def _get_admin_service(self):
-        return await self.container.get(AdminService)
-
-    @log_execution_time
-    @handle_grpc_exceptions
-    @admin_auth_middleware
-    async def CreateUser(self, request, context, request_id: str):
-        logger = self.logger.bind(request_id=request_id)
+    async def CreateUser(self, request, context):
+        request_id = current_request_id()
         input_data = CreateUserDTO(id=UUID(request.id), name=request.name, role=request.role)
-        logger.info("Processing CreateUser", input_data=input_data.dict())
-        admin_service = await self._get_admin_service()
-        user = await admin_service.create_user(input_data, request_id)
+        if _stdlib_logger.isEnabledFor(logging.INFO):
+            self.logger.info("Processing CreateUser", request_id=request_id, input_data=input_data.dict())
+        user = await self.admin_service.create_user(input_data, request_id)
         response = user_pb2.UserResponse(
             id=str(user.id),
             name=user.name,
             created_at=user.created_at.isoformat(),
             role=user.role
         )
-        logger.info("CreateUser request completed", response=response_to_dict(response))
+        if _stdlib_logger.isEnabledFor(logging.INFO):
+            self.logger.info("CreateUser request completed", request_id=request_id, response=response_to_dict(response))
         return response
 
-    @log_execution_time
-    @handle_grpc_exceptions
-    @admin_auth_middleware
-    async def GetUser(self, request, context, request_id: str):
-        logger = self.logger.bind(request_id=request_id)
+    async def GetUser(self, request, context):
+        request_id = current_request_id()
         try:
             input_data = UserIdDTO(id=UUID(request.id))
         except ValueError as e:
-            logger.error("Invalid UUID format", id=request.id)
+            self.logger.error("Invalid UUID format", request_id=request_id, id=request.id)
             raise InvalidInputError(f"Invalid UUID format: {request.id}")
-        logger.info("Processing GetUser", input_data=input_data.dict())
-        admin_service = await self._get_admin_service()
-        user = await admin_service.get_user(input_data, request_id)
+        if _stdlib_logger.isEnabledFor(logging.INFO):
+            self.logger.info("Processing GetUser", request_id=request_id, input_data=input_data.dict())
+        user = await self.admin_service.get_user_encoded(input_data, request_id) if self.serve_encoded else None
+        if isinstance(user, bytes) and is_serialized_user_response(user):
+            self.logger.info("GetUser served from serialized cache", request_id=request_id, user_id=str(input_data.id))
+            return user
+        # JSON-запись, оставшаяся после смены CACHE_FORMAT, читается обычным путём
+        if user is None or isinstance(user, bytes):
+            user = await self.admin_service.get_user(input_data, request_id)
         response = user_pb2.UserResponse(
             id=str(user.id),
             name=user.name,
             created_at=user.created_at.isoformat(),
             role=user.role
         )
-        logger.info("GetUser request completed", response=response_to_dict(response))
+        if _stdlib_logger.isEnabledFor(logging.INFO):
+            self.logger.info("GetUser request completed", request_id=request_id, response=response_to_dict(response))
         return response
 
-    @log_execution_time
-    @handle_grpc_exceptions
-    @admin_auth_middleware
-    async def UpdateUser(self, request, context, request_id: str):
-        logger = self.logger.bind(request_id=request_id)
+    async def UpdateUser(self, request, context):
+        request_id = current_request_id()
         try:
             user_id = UUID(request.id)
         except ValueError as e:
-            logger.error("Invalid UUID format", id=request.id)
+            self.logger.error("Invalid UUID format", request_id=request_id, id=request.id)
             raise InvalidInputError(f"Invalid UUID format: {request.id}")
         input_data = UpdateUserDTO(name=request.name)
-        logger.info("Processing UpdateUser", input_data=input_data.dict(), user_id=str(user_id))
-        admin_service = await self._get_admin_service()
-        user = await admin_service.update_user(user_id, input_data, request_id)
+        if _stdlib_logger.isEnabledFor(logging.INFO):
+            self.logger.info("Processing UpdateUser", request_id=request_id, input_data=input_data.dict(), user_id=str(user_id))
+        user = await self.admin_service.update_user(user_id, input_data, request_id)
         response = user_pb2.UserResponse(
             id=str(user.id),
             name=user.name,
             created_at=user.created_at.isoformat(),
             role=user.role
         )
-        logger.info("UpdateUser request completed", response=response_to_dict(response))
+        if _stdlib_logger.isEnabledFor(logging.INFO):
+            self.logger.info("UpdateUser request completed", request_id=request_id, response=response_to_dict(response))
         return response
 
-    @log_execution_time
-    @handle_grpc_exceptions
-    @admin_auth_middleware
-    async def DeleteUser(self, request, context, request_id: str):
-        logger = self.logger.bind(request_id=request_id)
+    async def DeleteUser(self, request, context):
+        request_id = current_request_id()
         try:
             input_data = UserIdDTO(id=UUID(request.id))
         except ValueError as e:
-            logger.error("Invalid UUID format", id=request.id)
+            self.logger.error("Invalid UUID format", request_id=request_id, id=request.id)
             raise InvalidInputError(f"Invalid UUID format: {request.id}")
-        logger.info("Processing DeleteUser", input_data=input_data.dict())
-        admin_service = await self._get_admin_service()
-        success = await admin_service.delete_user(input_data, request_id)
+        if _stdlib_logger.isEnabledFor(logging.INFO):
+            self.logger.info("Processing DeleteUser", request_id=request_id, input_data=input_data.dict())
+        success = await self.admin_service.delete_user(input_data, request_id)
         response = user_pb2.UserDeletedResponse(success=success)
-        logger.info("DeleteUser request completed", response=response_to_dict(response))
+        if _stdlib_logger.isEnabledFor(logging.INFO):
+            self.logger.info("DeleteUser request completed", request_id=request_id, response=response_to_dict(response))
         return response
 
+    async def BatchGetUsers(self, request, context):
+        request_id = current_request_id()
+        try:
+            input_data = _validate_batch(request.ids, MAX_BATCH_IDS)
+        except InvalidInputError as e:
+            self.logger.error("Invalid batch request", request_id=request_id, error=str(e))
+            raise
+        self.logger.info("Processing BatchGetUsers", request_id=request_id, count=len(input_data.ids))
+        result = await self.admin_service.batch_get_users(input_data, request_id)
+        response = user_pb2.BatchGetUsersResponse(
+            users=[
+                user_pb2.UserResponse(
+                    id=str(user.id),
+                    name=user.name,
+                    created_at=user.created_at.isoformat(),
+                    role=user.role
+                )
+                for user in result.users
+            ],
+            missing_ids=[str(user_id) for user_id in result.missing_ids]
+        )
+        if _stdlib_logger.isEnabledFor(logging.INFO):
+            self.logger.info("BatchGetUsers request completed", request_id=request_id, response=response_to_dict(response))
+        return response
+
+    async def DeleteUsers(self, request, context):
+        request_id = current_request_id()
+        try:
+            input_data = _validate_batch(request.ids, MAX_BATCH_IDS)
+        except InvalidInputError as e:
+            self.logger.error("Invalid batch request", request_id=request_id, error=str(e))
+            raise
+        self.logger.info("Processing DeleteUsers", request_id=request_id, count=len(input_data.ids))
+        deleted_count = await self.admin_service.delete_users(input_data, request_id)
+        response = user_pb2.DeleteUsersResponse(deleted_count=deleted_count)
+        if _stdlib_logger.isEnabledFor(logging.INFO):
+            self.logger.info("DeleteUsers request completed", request_id=request_id, response=response_to_dict(response))
+        return response
+
+    async def BulkCreateUsers(self, request_iterator, context):
+        request_id = current_request_id()
+        self.logger.info("Processing BulkCreateUsers", request_id=request_id)
+        items = ({"id": request.id, "name": request.name, "role": request.role} async for request in request_iterator)
+        result = await self.admin_service.bulk_create_users(
+            items,
+            settings.bulk_create_chunk_size,
+            settings.bulk_create_max_in_flight_chunks,
+            settings.bulk_create_max_reported_errors,
+            request_id,
+        )
+        response = user_pb2.BulkCreateUsersResponse(
+            created_count=result.created_count,
+            failed_count=result.failed_count,
+            errors=[
+                user_pb2.BulkCreateUserError(index=failure.index, id=failure.id, error=failure.error)
+                for failure in result.failures
+            ]
+        )
+        self.logger.info("BulkCreateUsers request completed", request_id=request_id, created=result.created_count, failed=result.failed_count)
+        return response
+
+    async def ListUsers(self, request, context):
+        request_id = current_request_id()
+        input_data = ListUsersDTO(
+            order_by=request.order_by or "id",
+            cursor=request.cursor or None,
+            batch_size=request.batch_size or settings.list_users_batch_size,
+            limit=request.limit,
+        )
+        if _stdlib_logger.isEnabledFor(logging.INFO):
+            self.logger.info("Processing ListUsers", request_id=request_id, input_data=input_data.dict())
+        count = 0
+        # Каждый yield ждёт, пока сообщение уйдёт в транспорт: при заполненном окне HTTP/2
+        # медленного клиента генератор не читает следующую пачку из MongoDB
+        async for user, cursor in self.admin_service.list_users(input_data, request_id):
+            yield user_pb2.ListUsersResponse(
+                user=user_pb2.UserResponse(
+                    id=str(user.id),
+                    name=user.name,
+                    created_at=user.created_at.isoformat(),
+                    role=user.role
+                ),
+                cursor=cursor,
+            )
+            count += 1
+        self.logger.info("ListUsers request completed", request_id=request_id, count=count)
+
 class UserServiceGRPC(user_pb2_grpc.UserServiceServicer):
-    def __init__(self, container: AsyncContainer):
-        self.container = container
+    def __init__(self, user_service: UserService, serve_encoded: bool):
+        self.user_service = user_service
+        self.serve_encoded = serve_encoded
         self.logger = logger.bind(service="UserServiceGRPC")
 
-    async def _get_user_service(self):
-        return await self.container.get(UserService)
-
-    @log_execution_time
-    @handle_grpc_exceptions
-    @jwt_auth_middleware
-    async def GetMyProfile(self, request, context, request_id: str, user_id: UUID):
-        logger = self.logger.bind(request_id=request_id)
+    async def GetMyProfile(self, request, context):
+        request_id = current_request_id()
+        user_id = current_principal().user_id
         input_data = UserIdDTO(id=user_id)
-        logger.info("Processing GetMyProfile", input_data=input_data.dict())
-        user_service = await self._get_user_service()
-        user = await user_service.get_my_profile(input_data, request_id)
+        if _stdlib_logger.isEnabledFor(logging.INFO):
+            self.logger.info("Processing GetMyProfile", request_id=request_id, input_data=input_data.dict())
+        user = await self.user_service.get_my_profile_encoded(input_data, request_id) if self.serve_encoded else None
+        if isinstance(user, bytes) and is_serialized_user_response(user):
+            self.logger.info("GetMyProfile served from serialized cache", request_id=request_id, user_id=str(user_id))
+            return user
+        if user is None or isinstance(user, bytes):
+            user = await self.user_service.get_my_profile(input_data, request_id)
         response = user_pb2.UserResponse(
             id=str(user.id),
             name=user.name,
             created_at=user.created_at.isoformat(),
             role=user.role
         )
-        logger.info("GetMyProfile request completed", response=response_to_dict(response))
+        if _stdlib_logger.isEnabledFor(logging.INFO):
+            self.logger.info("GetMyProfile request completed", request_id=request_id, response=response_to_dict(response))
         return response
 
-    @log_execution_time
-    @handle_grpc_exceptions
-    @jwt_auth_middleware
-    async def UpdateMyName(self, request, context, request_id: str, user_id: UUID):
-        logger = self.logger.bind(request_id=request_id)
+    async def UpdateMyName(self, request, context):
+        request_id = current_request_id()
+        user_id = current_principal().user_id
         input_data = UpdateNameDTO(name=request.name)
-        logger.info("Processing UpdateMyName", input_data=input_data.dict(), user_id=str(user_id))
-        user_service = await self._get_user_service()
-        user = await user_service.update_my_name(user_id, input_data, request_id)
+        if _stdlib_logger.isEnabledFor(logging.INFO):
+            self.logger.info("Processing UpdateMyName", request_id=request_id, input_data=input_data.dict(), user_id=str(user_id))
+        user = await self.user_service.update_my_name(user_id, input_data, request_id)
         response = user_pb2.UserResponse(
             id=str(user.id),
             name=user.name,
             created_at=user.created_at.isoformat(),
             role=user.role
         )
-        logger.info("UpdateMyName request completed", response=response_to_dict(response))
+        if _stdlib_logger.isEnabledFor(logging.INFO):
+            self.logger.info("UpdateMyName request completed", request_id=request_id, response=response_to_dict(response))
         return response
 
-async def serve():
+async def warm_up(container) -> None:
+    mongo_client = await container.get(AsyncMongoClient)
+    redis_client = await container.get(Redis)
+    repo = await container.get(UserRepositoryPort)
+    steps = {
+        "mongo": lambda: warm_mongo_pool(mongo_client, settings.mongo_min_pool_size),
+        "redis": lambda: warm_redis(redis_client),
+    }
+    if settings.warmup_cache_users > 0:
+        steps["user_cache"] = lambda: warm_user_cache(repo, settings.warmup_cache_users, settings.warmup_cache_batch_size)
+    await run_warmup(steps, settings.warmup_timeout)
+
+async def serve(worker_index: int = 0, heartbeat=None):
+    # Heartbeat до создания контейнера: построение индексов (MONGO_INDEX_CHECK=fail) и прогрев
+    # не должны выглядеть для супервизора зависшим воркером
+    heartbeat_task = asyncio.create_task(run_heartbeat(heartbeat)) if heartbeat is not None else None
     try:
         container = await get_container()
         async with container():
-            server = aio_server()
-            user_pb2_grpc.add_AdminServiceServicer_to_server(AdminServiceGRPC(container), server)
-            user_pb2_grpc.add_UserServiceServicer_to_server(UserServiceGRPC(container), server)
+            # Все зависимости APP-скоупа разрешаются один раз, а не на каждый вызов
+            serve_encoded = settings.cache_format == "protobuf"
+            server = aio_server(
+                interceptors=build_interceptors(await container.get(TokenVerifier)),
+                maximum_concurrent_rpcs=settings.grpc_max_concurrent_rpcs,
+                # Воркеры супервизора слушают один порт
+                options=[("grpc.so_reuseport", 1)],
+            )
+            add_servicer_to_server(AdminServiceGRPC(await container.get(AdminService), serve_encoded), server, 'AdminService')
+            add_servicer_to_server(UserServiceGRPC(await container.get(UserService), serve_encoded), server, 'UserService')
+            # NOT_SERVING до конца прогрева: трафик на реплику пойдёт, когда соединения открыты и кэш загружен
+            health = await add_health_servicer(server, APP_SERVICE_NAMES)
             reflection.enable_server_reflection(SERVICE_NAMES, server)
             server.add_insecure_port(f"[::]:{settings.grpc_port}")
-            logger.info(f"Server started on [::]:{settings.grpc_port} with reflection")
+            logger.info(f"Server started on [::]:{settings.grpc_port} with reflection", worker=worker_index)
             await server.start()
-            await server.wait_for_termination()
+            stopped = asyncio.Event()
+            install_shutdown_handler(stopped.set)
+            metrics_server = None
+            if settings.metrics_enabled:
+                # У каждого воркера свой порт метрик: через общий порт scrape попадал бы в случайный процесс
+                metrics_port = settings.metrics_port + worker_index
+                metrics_server = await start_metrics_server(metrics_port)
+                logger.info(f"Metrics exposed on :{metrics_port}/metrics")
+            try:
+                await warm_up(container)
+                await mark_serving(health, APP_SERVICE_NAMES)
+                await stopped.wait()
+                logger.info("Shutdown requested, draining in-flight RPCs", grace_s=settings.shutdown_grace_period)
+                await health.enter_graceful_shutdown()
+                await server.stop(settings.shutdown_grace_period)
+            finally:
+                if metrics_server is not None:
+                    metrics_server.close()
     except Exception as e:
-        logger.error(f"Failed to start server: {e}")
\ No newline at end of file
+        logger.error(f"Failed to start server: {e}")
+    finally:
+        if heartbeat_task is not None:
+            heartbeat_task.cancel()
\ No newline at end of file
@@ -0,0 +1,281 @@
+import time
+from abc import abstractmethod
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import Dict, Optional, Tuple
+from uuid import UUID
+
+import grpc
+import jwt
+
+from application.utils.grpc_utils import map_exception
+from application.utils.logging_utils import generate_request_id, request_id_var, timing_log_sampled
+from domain.exceptions import AuthenticationError, PermissionDeniedError
+from infrastructure.adapters.inbound.grpc.token_verifier import TokenVerifier
+from shared.metrics.instruments import GRPC_SERVER_HANDLED, GRPC_SERVER_HANDLING_SECONDS
+from shared.serving.concurrency_limiter import AdaptiveConcurrencyLimiter
+from shared.serving.health import HEALTH_SERVICE_NAME
+from structlog import get_logger
+
+logger = get_logger(__name__)
+
+REQUEST_ID_METADATA_KEY = "x-request-id"
+
+ADMIN_POLICY = "admin"
+USER_POLICY = "user"
+
+DEFAULT_LIMIT_CLASS = "default"
+
+@dataclass(frozen=True)
+class Principal:
+    """Проверенный вызывающий: payload токена и user_id из него (для USER_POLICY)."""
+    payload: dict
+    user_id: Optional[UUID] = None
+
+# Каждый RPC обрабатывается в своей задаче asyncio, поэтому значения не протекают между вызовами
+principal_var: ContextVar[Principal] = ContextVar("principal")
+
+def current_principal() -> Principal:
+    return principal_var.get()
+
+def _split_method(full_method: str) -> Tuple[str, str]:
+    _, service, method = full_method.split("/", 2)
+    return service, method
+
+def _get_metadata(context, key: str) -> Optional[str]:
+    # Без построения dict: метаданных обычно несколько, линейный проход дешевле
+    for metadata_key, value in context.invocation_metadata() or ():
+        if metadata_key == key:
+            return value
+    return None
+
+class _WrappingInterceptor(grpc.aio.ServerInterceptor):
+    """Оборачивает обработчик метода один раз и переиспользует обёртку для всех последующих вызовов."""
+
+    def __init__(self):
+        self._handlers: Dict[str, grpc.RpcMethodHandler] = {}
+
+    async def intercept_service(self, continuation, handler_call_details):
+        method = handler_call_details.method
+        handler = self._handlers.get(method)
+        if handler is None:
+            handler = await continuation(handler_call_details)
+            if handler is None:
+                # Неизвестный метод не кэшируем: имена приходят от клиента
+                return None
+            # Health-проверки идут мимо интерсепторов: без логов и лимитов, а Watch пишет ответы через context.write
+            if _split_method(method)[0] != HEALTH_SERVICE_NAME:
+                handler = self._wrap(method, handler)
+            self._handlers[method] = handler
+        return handler
+
+    def _wrap(self, method: str, handler: grpc.RpcMethodHandler) -> grpc.RpcMethodHandler:
+        if handler.unary_unary is not None:
+            return handler._replace(unary_unary=self._wrap_unary(method, handler.unary_unary))
+        if handler.unary_stream is not None:
+            return handler._replace(unary_stream=self._wrap_unary_stream(method, handler.unary_stream))
+        if handler.stream_unary is not None:
+            return handler._replace(stream_unary=self._wrap_stream_unary(method, handler.stream_unary))
+        return handler
+
+    @abstractmethod
+    def _wrap_unary(self, method: str, behavior):
+        pass
+
+    @abstractmethod
+    def _wrap_unary_stream(self, method: str, behavior):
+        pass
+
+    def _wrap_stream_unary(self, method: str, behavior):
+        # Итератор запросов передаётся обработчику как есть, поэтому подходит обёртка unary
+        return self._wrap_unary(method, behavior)
+
+class RequestContextInterceptor(_WrappingInterceptor):
+    """request_id, время выполнения, метрики и отображение исключений в коды gRPC для каждого RPC."""
+
+    def __init__(self):
+        super().__init__()
+        self.logger = logger.bind(interceptor="RequestContextInterceptor")
+
+    def _start(self, context) -> str:
+        request_id = _get_metadata(context, REQUEST_ID_METADATA_KEY) or generate_request_id()
+        request_id_var.set(request_id)
+        return request_id
+
+    def _fail(self, context, name: str, request_id: str, error: Exception, start_time: float) -> grpc.StatusCode:
+        code, level, message = map_exception(error)
+        getattr(self.logger, level)(
+            f"{message} в {name}",
+            request_id=request_id,
+            error=str(error),
+            duration_ms=f"{(time.perf_counter() - start_time) * 1000:.2f}",
+        )
+        return code
+
+    def _finish(self, service: str, name: str, request_id: str, code: grpc.StatusCode, start_time: float, latency) -> None:
+        duration = time.perf_counter() - start_time
+        latency.observe(duration)
+        GRPC_SERVER_HANDLED.labels(service, name, code.name).inc()
+        if code is grpc.StatusCode.OK and timing_log_sampled():
+            self.logger.info(
+                f"Функция {name} выполнена успешно",
+                request_id=request_id,
+                duration_ms=f"{duration * 1000:.2f}",
+                func_name=name,
+                module=service,
+            )
+
+    def _wrap_unary(self, method: str, behavior):
+        service, name = _split_method(method)
+        latency = GRPC_SERVER_HANDLING_SECONDS.labels(service, name)
+
+        async def wrapper(request, context):
+            request_id = self._start(context)
+            start_time = time.perf_counter()
+            code = grpc.StatusCode.OK
+            try:
+                return await behavior(request, context)
+            except grpc.aio.AbortError:
+                code = context.code() or grpc.StatusCode.UNKNOWN
+                raise
+            except Exception as e:
+                code = self._fail(context, name, request_id, e, start_time)
+                await context.abort(code, str(e))
+            finally:
+                self._finish(service, name, request_id, code, start_time, latency)
+        return wrapper
+
+    def _wrap_unary_stream(self, method: str, behavior):
+        service, name = _split_method(method)
+        latency = GRPC_SERVER_HANDLING_SECONDS.labels(service, name)
+
+        async def wrapper(request, context):
+            request_id = self._start(context)
+            start_time = time.perf_counter()
+            code = grpc.StatusCode.OK
+            try:
+                async for response in behavior(request, context):
+                    yield response
+            except grpc.aio.AbortError:
+                code = context.code() or grpc.StatusCode.UNKNOWN
+                raise
+            except Exception as e:
+                code = self._fail(context, name, request_id, e, start_time)
+                await context.abort(code, str(e))
+            finally:
+                self._finish(service, name, request_id, code, start_time, latency)
+        return wrapper
+
+class ConcurrencyLimitInterceptor(_WrappingInterceptor):
+    """Допускает не больше адаптивного лимита одновременных RPC на класс методов, остальные сразу отклоняет."""
+
+    def __init__(self, limiters: Dict[str, AdaptiveConcurrencyLimiter], method_classes: Dict[str, str]):
+        super().__init__()
+        if DEFAULT_LIMIT_CLASS not in limiters:
+            raise ValueError(f"Concurrency limits must define the '{DEFAULT_LIMIT_CLASS}' class")
+        self.limiters = limiters
+        self.method_classes = method_classes
+
+    def _limiter(self, method: str) -> AdaptiveConcurrencyLimiter:
+        _, name = _split_method(method)
+        return self.limiters.get(self.method_classes.get(name, DEFAULT_LIMIT_CLASS), self.limiters[DEFAULT_LIMIT_CLASS])
+
+    def _wrap_unary(self, method: str, behavior):
+        limiter = self._limiter(method)
+
+        async def wrapper(request, context):
+            if not limiter.try_acquire():
+                await context.abort(grpc.StatusCode.RESOURCE_EXHAUSTED, f"Concurrency limit exceeded ({limiter.name})")
+            start_time = time.perf_counter()
+            rtt = None
+            try:
+                response = await behavior(request, context)
+                rtt = time.perf_counter() - start_time
+                return response
+            except grpc.aio.AbortError:
+                # Отклонено следующим интерсептором (например, AuthInterceptor) до всякой работы - не замер
+                raise
+            except Exception as e:
+                # Замер - только серверные сбои. Ошибки клиента (невалидный запрос, неверный токен)
+                # отвечают быстрее настоящей работы и занижали бы задержку без нагрузки:
+                # поток неаутентифицированных запросов поднимал бы лимит
+                if map_exception(e)[0] == grpc.StatusCode.INTERNAL:
+                    rtt = time.perf_counter() - start_time
+                raise
+            finally:
+                limiter.release(rtt)
+        return wrapper
+
+    def _wrap_unary_stream(self, method: str, behavior):
+        limiter = self._limiter(method)
+
+        async def wrapper(request, context):
+            if not limiter.try_acquire():
+                await context.abort(grpc.StatusCode.RESOURCE_EXHAUSTED, f"Concurrency limit exceeded ({limiter.name})")
+            # Длительность стрима зависит от клиента и объёма выдачи - в оценку задержки не идёт
+            try:
+                async for response in behavior(request, context):
+                    yield response
+            finally:
+                limiter.release()
+        return wrapper
+
+    def _wrap_stream_unary(self, method: str, behavior):
+        limiter = self._limiter(method)
+
+        async def wrapper(request_iterator, context):
+            if not limiter.try_acquire():
+                await context.abort(grpc.StatusCode.RESOURCE_EXHAUSTED, f"Concurrency limit exceeded ({limiter.name})")
+            try:
+                return await behavior(request_iterator, context)
+            finally:
+                limiter.release()
+        return wrapper
+
+class AuthInterceptor(_WrappingInterceptor):
+    """Проверяет JWT до вызова обработчика; политика задаётся на уровне gRPC-сервиса."""
+
+    def __init__(self, verifier: TokenVerifier, policies: Dict[str, str]):
+        super().__init__()
+        self.verifier = verifier
+        self.policies = policies
+
+    async def authenticate(self, policy: str, context) -> Principal:
+        authorization = _get_metadata(context, "authorization")
+        if not authorization:
+            raise AuthenticationError("Authorization token required")
+        try:
+            payload = await self.verifier.verify(authorization.replace("Bearer ", ""))
+        except jwt.InvalidTokenError as e:
+            raise AuthenticationError(f"Invalid JWT token: {str(e)}")
+        if policy == ADMIN_POLICY:
+            if payload.get("role") != "admin":
+                raise PermissionDeniedError("Admin access required")
+            return Principal(payload)
+        try:
+            return Principal(payload, UUID(payload["user_id"]))
+        except (KeyError, ValueError, TypeError) as e:
+            raise AuthenticationError(f"Invalid JWT token: {str(e)}")
+
+    def _wrap(self, method: str, handler: grpc.RpcMethodHandler) -> grpc.RpcMethodHandler:
+        service, _ = _split_method(method)
+        if service not in self.policies:
+            return handler
+        return super()._wrap(method, handler)
+
+    def _wrap_unary(self, method: str, behavior):
+        policy = self.policies[_split_method(method)[0]]
+
+        async def wrapper(request, context):
+            principal_var.set(await self.authenticate(policy, context))
+            return await behavior(request, context)
+        return wrapper
+
+    def _wrap_unary_stream(self, method: str, behavior):
+        policy = self.policies[_split_method(method)[0]]
+
+        async def wrapper(request, context):
+            principal_var.set(await self.authenticate(policy, context))
+            async for response in behavior(request, context):
+                yield response
+        return wrapper
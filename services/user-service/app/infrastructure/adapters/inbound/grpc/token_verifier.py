@@ -0,0 +1,82 @@
+import hashlib
+import time
+from typing import List, Optional, Tuple
+
+import jwt
+
+from application.utils.ttl_lru_cache import TtlLruCache
+from domain.ports.outbound.token_revocation_port import TokenRevocationPort
+from structlog import get_logger
+
+logger = get_logger(__name__)
+
+class TokenVerifier:
+    """Проверка JWT с кэшем уже проверенных payload.
+
+    Ключ кэша - SHA-256 от токена, запись живёт до exp токена, поэтому
+    повторные вызовы с тем же токеном не выполняют HMAC и разбор claims.
+    Токены без exp не кэшируются. Проверка отзыва (если задана) повторяется
+    не чаще revocation_recheck_interval секунд на токен.
+    """
+
+    def __init__(
+        self,
+        secret_key: str,
+        algorithms: List[str],
+        cache: Optional[TtlLruCache[bytes, Tuple[dict, float]]] = None,
+        revocation: Optional[TokenRevocationPort] = None,
+        revocation_recheck_interval: float = 5.0,
+    ):
+        self.secret_key = secret_key
+        self.algorithms = algorithms
+        self.cache = cache
+        self.revocation = revocation
+        self.revocation_recheck_interval = revocation_recheck_interval
+        self.revoked = 0
+        self.logger = logger.bind(component="TokenVerifier")
+
+    async def verify(self, token: str) -> dict:
+        """Вернуть payload токена или бросить jwt.InvalidTokenError."""
+        if self.cache is None:
+            payload = jwt.decode(token, self.secret_key, algorithms=self.algorithms)
+            if self.revocation is not None:
+                await self._check_revocation(hashlib.sha256(token.encode()).digest())
+            return payload
+
+        digest = hashlib.sha256(token.encode()).digest()
+        entry = self.cache.get(digest)
+        now = time.monotonic()
+        if entry is not None:
+            payload, checked_at = entry
+            if self.revocation is not None and now - checked_at >= self.revocation_recheck_interval:
+                await self._check_revocation(digest)
+                self.cache.set(digest, (payload, now), ttl=self._remaining_ttl(payload))
+            return payload
+
+        payload = jwt.decode(token, self.secret_key, algorithms=self.algorithms)
+        await self._check_revocation(digest)
+        ttl = self._remaining_ttl(payload)
+        if ttl is not None and ttl > 0:
+            self.cache.set(digest, (payload, now), ttl=ttl)
+        return payload
+
+    @staticmethod
+    def _remaining_ttl(payload: dict) -> Optional[float]:
+        exp = payload.get("exp")
+        if exp is None:
+            return None
+        return float(exp) - time.time()
+
+    async def _check_revocation(self, digest: bytes) -> None:
+        if self.revocation is None:
+            return
+        if await self.revocation.is_revoked(digest.hex()):
+            self.revoked += 1
+            if self.cache is not None:
+                self.cache.invalidate(digest)
+            raise jwt.InvalidTokenError("Token has been revoked")
+
+    def stats(self) -> dict:
+        stats = self.cache.stats() if self.cache is not None else {}
+        stats["revoked"] = self.revoked
+        return stats
@@ -0,0 +1,35 @@
+from typing import Any
+from infrastructure.adapters.outbound.redis.cache_codec import JsonCacheCodec
+from . import user_pb2
+
+USER_RESPONSE_FIELDS = {"id", "name", "created_at", "role"}
+
+
+def is_serialized_user_response(data: bytes) -> bool:
+    # UserResponse всегда начинается с тега поля id (0x0A), JSON-объект - с "{"
+    return data[:1] == b"\n"
+
+
+class UserResponseCacheCodec(JsonCacheCodec):
+    """Профили храним в кэше как готовый к отправке UserResponse, остальные значения - как JSON."""
+
+    def encode(self, value: Any) -> bytes:
+        if isinstance(value, dict) and value.keys() == USER_RESPONSE_FIELDS:
+            return user_pb2.UserResponse(
+                id=str(value["id"]),
+                name=value["name"],
+                created_at=str(value["created_at"]),
+                role=value["role"]
+            ).SerializeToString()
+        return super().encode(value)
+
+    def decode(self, data: bytes) -> Any:
+        if not is_serialized_user_response(data):
+            return super().decode(data)
+        message = user_pb2.UserResponse.FromString(data)
+        return {
+            "id": message.id,
+            "name": message.name,
+            "created_at": message.created_at,
+            "role": message.role
+        }
@@ -0,0 +1,68 @@
+from datetime import datetime
+from typing import Any, AsyncIterator, Dict, Generic, List, Optional, TypeVar, Union
+from uuid import UUID
+from shared.domain.models.user import User
+from domain.ports.outbound.base_repository import AbstractRepository
+from domain.ports.outbound.user_repository_port import UserRepositoryPort
+from application.utils.singleflight import SingleFlight
+
+T = TypeVar("T")
+ID = TypeVar("ID")
+
+
+class CoalescingRepository(AbstractRepository[T, ID], Generic[T, ID]):
+    """Декоратор репозитория: конкурентные get_by_id одного ID выполняют один запрос к хранилищу."""
+
+    def __init__(self, repo: AbstractRepository[T, ID], singleflight: SingleFlight):
+        self.repo = repo
+        self.singleflight = singleflight
+
+    async def get_by_id(self, id: ID, request_id: str) -> Optional[T]:
+        return await self.singleflight.do(id, lambda: self.repo.get_by_id(id, request_id))
+
+    async def get_many(self, ids: List[ID], request_id: str) -> List[T]:
+        return await self.repo.get_many(ids, request_id)
+
+    async def create(self, entity: T, request_id: str) -> T:
+        return await self.repo.create(entity, request_id)
+
+    async def update(self, entity: T, request_id: str) -> T:
+        return await self.repo.update(entity, request_id)
+
+    async def delete(self, id: ID, request_id: str) -> bool:
+        return await self.repo.delete(id, request_id)
+
+
+class CoalescingUserRepository(CoalescingRepository[User, UUID], UserRepositoryPort):
+    def __init__(self, repo: UserRepositoryPort, singleflight: SingleFlight):
+        super().__init__(repo, singleflight)
+
+    async def get_by_email(self, email: str, request_id: str) -> Optional[User]:
+        return await self.repo.get_by_email(email, request_id)
+
+    async def get_encoded_by_id(self, user_id: UUID, request_id: str) -> Union[bytes, User, None]:
+        # Свой ключ: результат другого типа, чем у get_by_id того же ID
+        return await self.singleflight.do(("encoded", user_id), lambda: self.repo.get_encoded_by_id(user_id, request_id))
+
+    async def create_many(self, users: List[User], request_id: str) -> Dict[int, str]:
+        return await self.repo.create_many(users, request_id)
+
+    async def delete_many(self, user_ids: List[UUID], request_id: str) -> int:
+        return await self.repo.delete_many(user_ids, request_id)
+
+    async def update_fields(self, user_id: UUID, fields: Dict[str, Any], request_id: str) -> Optional[User]:
+        return await self.repo.update_fields(user_id, fields, request_id)
+
+    async def recent_user_ids(self, limit: int, request_id: str) -> List[UUID]:
+        return await self.repo.recent_user_ids(limit, request_id)
+
+    def iter_users(
+        self,
+        order_by: str,
+        after_id: Optional[UUID],
+        after_created_at: Optional[datetime],
+        batch_size: int,
+        limit: int,
+        request_id: str,
+    ) -> AsyncIterator[User]:
+        return self.repo.iter_users(order_by, after_id, after_created_at, batch_size, limit, request_id)
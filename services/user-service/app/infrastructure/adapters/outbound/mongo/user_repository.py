@@ -1,25 +1,72 @@
+import asyncio
+import time
+from pymongo import ReturnDocument
 from pymongo.collection import Collection
-from pymongo.errors import DuplicateKeyError
-from typing import Optional
+from pymongo.errors import BulkWriteError, DuplicateKeyError
+from typing import Any, AsyncIterator, Dict, Optional, List, Tuple, Union
 from uuid import UUID
 from datetime import datetime
 from bson.binary import Binary, UUID_SUBTYPE
 from shared.domain.models.user import User  # Изменяем импорт
 from domain.ports.outbound.user_repository_port import UserRepositoryPort
-from domain.ports.outbound.cache_port import CachePort
-from domain.exceptions import InvalidInputError
+from domain.ports.outbound.cache_port import CachePort, NEGATIVE_ENTRY
+from domain.exceptions import InvalidInputError, UserNotFoundError
 from application.utils.logging_utils import log_execution_time
 from application.dto.user_dto import UserResponseDTO
+from shared.mongo.indexes import IndexSpec, QueryShape
 from structlog import get_logger
 from config import settings
 
 logger = get_logger(__name__)
 
+DUPLICATE_KEY_ERROR = 11000
+# Номер версии документа: растёт на каждом обновлении, по нему кэш отклоняет устаревшие записи.
+# Документы без поля (созданные до его появления) считаются версией 0.
+VERSION_FIELD = "version"
+
+USER_CACHE_KEY_PREFIX = "user:id:"
+
+def user_cache_key(user_id: UUID) -> str:
+    return f"{USER_CACHE_KEY_PREFIX}{user_id}"
+
+def _to_uuid(_id: Any) -> UUID:
+    if isinstance(_id, UUID):
+        return _id
+    if isinstance(_id, Binary):
+        return UUID(bytes=_id)
+    return UUID(_id)
+
+_SAMPLE_ID = Binary(bytes(16), UUID_SUBTYPE)
+_SAMPLE_CREATED_AT = datetime(2024, 1, 1)
+
 class MongoUserRepository(UserRepositoryPort):
+    INDEXES = (
+        IndexSpec((("name", 1),), "name_1"),
+        # Keyset-пагинация ListUsers по created_at; _id - тай-брейкер
+        IndexSpec((("created_at", 1), ("_id", 1)), "created_at_1__id_1"),
+    )
+    # Все запросы репозитория с примерами значений для explain()
+    QUERY_SHAPES = (
+        QueryShape("get_by_id", {"_id": _SAMPLE_ID}),
+        QueryShape("get_many", {"_id": {"$in": [_SAMPLE_ID]}}),
+        QueryShape("iter_users_by_id", {"_id": {"$gt": _SAMPLE_ID}}, sort=[("_id", 1)]),
+        QueryShape("iter_users_by_created_at_first_page", {}, sort=[("created_at", 1), ("_id", 1)]),
+        QueryShape(
+            "iter_users_by_created_at",
+            {"$or": [{"created_at": {"$gt": _SAMPLE_CREATED_AT}}, {"created_at": _SAMPLE_CREATED_AT, "_id": {"$gt": _SAMPLE_ID}}]},
+            sort=[("created_at", 1), ("_id", 1)],
+        ),
+        # Покрывающий запрос: обратный обход created_at_1__id_1 без чтения документов
+        QueryShape("recent_user_ids", {}, sort=[("created_at", -1), ("_id", -1)], projection={"_id": 1}),
+    )
+
     def __init__(self, collection: Collection, cache: CachePort):
         self.collection = collection
         self.cache = cache
         self.logger = logger.bind(repository="MongoUserRepository")
+        # Без кэша репозиторий используется только ради преобразований документов (transfer_cli, бенчмарки)
+        if cache is not None:
+            self.cache.register_refresher(USER_CACHE_KEY_PREFIX, self._load_cache_entry, settings.redis_ttl)
 
     def _user_to_dict(self, user: User) -> dict:
         return {
@@ -37,21 +84,33 @@ class MongoUserRepository(UserRepositoryPort):
             role=user.role
         )
 
+    def _versioned_cache_item(self, user: User, version: int) -> Tuple[dict, int]:
+        return self._user_to_cache_dto(user).model_dump(mode="json"), version
+
+    async def _load_cache_entry(self, key: str) -> Optional[Tuple[dict, int]]:
+        """Загрузчик для раннего обновления профиля в кэше."""
+        user_id = UUID(key[len(USER_CACHE_KEY_PREFIX):])
+        data = await self.collection.find_one({"_id": Binary(user_id.bytes, UUID_SUBTYPE)})
+        if data is None:
+            return None
+        return self._versioned_cache_item(self._dict_to_user(data), data.get(VERSION_FIELD, 0))
+
+    def _cache_to_user(self, cached: dict) -> User:
+        cache_dto = UserResponseDTO.parse_obj(cached)
+        return self._dict_to_user({
+            "_id": cache_dto.id,
+            "name": cache_dto.name,
+            "created_at": cache_dto.created_at,
+            "role": cache_dto.role
+        })
+
     def _dict_to_user(self, data: dict) -> User:
         created_at = data["created_at"]
         if isinstance(created_at, str):
             created_at = datetime.fromisoformat(created_at.replace("Z", "+00:00"))
 
-        _id = data["_id"]
-        if isinstance(_id, UUID):
-            user_id = _id
-        elif isinstance(_id, Binary):
-            user_id = UUID(bytes=_id)
-        else:
-            user_id = UUID(_id)
-
         return User(
-            id=user_id,
+            id=_to_uuid(data["_id"]),
             name=data["name"],
             created_at=created_at,
             role=data.get("role", "user")
@@ -63,11 +122,11 @@ class MongoUserRepository(UserRepositoryPort):
         try:
             user_dict = self._user_to_dict(user)
             logger.info("Creating user in MongoDB", user_id=str(user.id))
-            await self.collection.insert_one(user_dict)
+            await self.collection.insert_one({**user_dict, VERSION_FIELD: 1})
             logger.info("User created in MongoDB", user_id=str(user.id))
-            cache_dto = self._user_to_cache_dto(user)
-            cache_data = cache_dto.model_dump(mode="json")
-            await self.cache.set(f"user:id:{user.id}", cache_data, settings.redis_ttl)
+            cache_data, version = self._versioned_cache_item(user, 1)
+            # Пользователь мог быть закэширован как отсутствующий - запись её заменяет
+            await self.cache.set_versioned(user_cache_key(user.id), cache_data, version, settings.redis_ttl, replace_negative=True)
             logger.info("User cached", user_id=str(user.id))
             return user
         except DuplicateKeyError as e:
@@ -77,67 +136,245 @@ class MongoUserRepository(UserRepositoryPort):
             logger.error("Failed to create user in MongoDB", error=str(e), user_id=str(user.id))
             raise
 
+    @log_execution_time
+    async def create_many(self, users: List[User], request_id: str) -> Dict[int, str]:
+        logger = self.logger.bind(request_id=request_id)
+        failures = {}
+        try:
+            # ordered=False: MongoDB продолжает вставку после ошибки и возвращает все ошибки разом
+            await self.collection.insert_many([{**self._user_to_dict(user), VERSION_FIELD: 1} for user in users], ordered=False)
+        except BulkWriteError as e:
+            for error in e.details.get("writeErrors", []):
+                failures[error["index"]] = "User already exists" if error.get("code") == DUPLICATE_KEY_ERROR else error.get("errmsg", "Write failed")
+        except Exception as e:
+            logger.error("Failed to insert users into MongoDB", error=str(e), count=len(users))
+            raise
+        logger.info("Users inserted into MongoDB", inserted=len(users) - len(failures), failed=len(failures))
+        backfill = {
+            user_cache_key(user.id): self._versioned_cache_item(user, 1)
+            for index, user in enumerate(users)
+            if index not in failures
+        }
+        try:
+            await self.cache.set_many_versioned(backfill, settings.redis_ttl, replace_negative=True)
+        except Exception as e:
+            # Пользователи уже записаны; без кэша они подтянутся из MongoDB при первом чтении
+            logger.warning("Failed to cache inserted users", error=str(e), count=len(backfill))
+        return failures
+
+    async def _load_by_id(self, user_id: UUID, logger) -> Optional[User]:
+        """Промах кэша: читает пользователя из MongoDB и записывает результат в кэш."""
+        cache_key = user_cache_key(user_id)
+        logger.info("Fetching user by ID from MongoDB", user_id=str(user_id))
+        started = time.perf_counter()
+        data = await self.collection.find_one({"_id": Binary(user_id.bytes, UUID_SUBTYPE)})
+        if data:
+            user = self._dict_to_user(data)
+            # Пока документ читался, его могли обновить: версия не даст перезаписать более новое значение
+            cache_data, version = self._versioned_cache_item(user, data.get(VERSION_FIELD, 0))
+            await self.cache.set_versioned(cache_key, cache_data, version, settings.redis_ttl, time.perf_counter() - started)
+            logger.info("User retrieved and cached", user_id=str(user_id))
+            return user
+        # Повторные запросы несуществующего ID (устаревший JWT, удалённый пользователь) не дойдут до MongoDB
+        await self.cache.set_negative_many([cache_key], settings.cache_negative_ttl)
+        logger.warning("User not found in MongoDB", user_id=str(user_id))
+        return None
+
     @log_execution_time
     async def get_by_id(self, user_id: UUID, request_id: str) -> Optional[User]:
         logger = self.logger.bind(request_id=request_id)
         try:
-            cache_key = f"user:id:{user_id}"
-            cached = await self.cache.get(cache_key)
+            cached = await self.cache.get(user_cache_key(user_id))
+            if cached == NEGATIVE_ENTRY:
+                logger.info("User known to be missing from cache", user_id=str(user_id))
+                return None
             if cached:
                 logger.info("User retrieved from cache", user_id=str(user_id))
-                cache_dto = UserResponseDTO.parse_obj(cached)
-                return self._dict_to_user({
-                    "_id": cache_dto.id,
-                    "name": cache_dto.name,
-                    "created_at": cache_dto.created_at,
-                    "role": cache_dto.role
-                })
-
-            logger.info("Fetching user by ID from MongoDB", user_id=str(user_id))
-            data = await self.collection.find_one({"_id": Binary(user_id.bytes, UUID_SUBTYPE)})
-            if data:
-                user = self._dict_to_user(data)
-                cache_dto = self._user_to_cache_dto(user)
-                cache_data = cache_dto.model_dump(mode="json")
-                await self.cache.set(cache_key, cache_data, settings.redis_ttl)
-                logger.info("User retrieved and cached", user_id=str(user_id))
-                return user
-            logger.warning("User not found in MongoDB", user_id=str(user_id))
-            return None
+                return self._cache_to_user(cached)
+            return await self._load_by_id(user_id, logger)
         except Exception as e:
             logger.error("Failed to fetch user by ID", error=str(e), user_id=str(user_id))
             raise
 
     @log_execution_time
-    async def update(self, user: User, request_id: str) -> User:
+    async def get_encoded_by_id(self, user_id: UUID, request_id: str) -> Union[bytes, User, None]:
         logger = self.logger.bind(request_id=request_id)
         try:
-            user_dict = self._user_to_dict(user)
-            logger.info("Updating user in MongoDB", user_id=str(user.id))
-            await self.collection.replace_one({"_id": Binary(user.id.bytes, UUID_SUBTYPE)}, user_dict)
-            logger.info("User updated in MongoDB", user_id=str(user.id))
-            await self.cache.delete(f"user:id:{user.id}")
-            cache_dto = self._user_to_cache_dto(user)
-            cache_data = cache_dto.model_dump(mode="json")
-            await self.cache.set(f"user:id:{user.id}", cache_data, settings.redis_ttl)
-            logger.info("User cached", user_id=str(user.id))
+            cached = await self.cache.get_encoded(user_cache_key(user_id))
+            if cached == NEGATIVE_ENTRY:
+                logger.info("User known to be missing from cache", user_id=str(user_id))
+                return None
+            if cached:
+                logger.info("Encoded user retrieved from cache", user_id=str(user_id))
+                return cached
+            return await self._load_by_id(user_id, logger)
+        except Exception as e:
+            logger.error("Failed to fetch encoded user by ID", error=str(e), user_id=str(user_id))
+            raise
+
+    @log_execution_time
+    async def get_many(self, user_ids: List[UUID], request_id: str) -> List[User]:
+        logger = self.logger.bind(request_id=request_id)
+        try:
+            user_ids = list(dict.fromkeys(user_ids))
+            if not user_ids:
+                return []
+            cached = await self.cache.get_many([user_cache_key(user_id) for user_id in user_ids])
+            found = {}
+            missing = []
+            for user_id, value in zip(user_ids, cached):
+                if value:
+                    found[user_id] = self._cache_to_user(value)
+                elif value is None:
+                    missing.append(user_id)
+            logger.info(
+                "Users retrieved from cache",
+                hits=len(found),
+                negative_hits=len(user_ids) - len(found) - len(missing),
+                misses=len(missing),
+            )
+
+            if missing:
+                started = time.perf_counter()
+                cursor = self.collection.find({"_id": {"$in": [Binary(user_id.bytes, UUID_SUBTYPE) for user_id in missing]}})
+                backfill = {}
+                for data in await cursor.to_list(length=None):
+                    user = self._dict_to_user(data)
+                    found[user.id] = user
+                    backfill[user_cache_key(user.id)] = self._versioned_cache_item(user, data.get(VERSION_FIELD, 0))
+                compute_time = time.perf_counter() - started
+                absent = [user_cache_key(user_id) for user_id in missing if user_id not in found]
+                await asyncio.gather(
+                    self.cache.set_many_versioned(backfill, settings.redis_ttl, compute_time),
+                    self.cache.set_negative_many(absent, settings.cache_negative_ttl),
+                )
+                logger.info("Users fetched from MongoDB and cached", requested=len(missing), fetched=len(backfill), absent=len(absent))
+
+            return [found[user_id] for user_id in user_ids if user_id in found]
+        except Exception as e:
+            logger.error("Failed to fetch users by IDs", error=str(e), count=len(user_ids))
+            raise
+
+    def _keyset_query(self, order_by: str, after_id: Optional[UUID], after_created_at: Optional[datetime]) -> dict:
+        if after_id is None:
+            return {}
+        after = Binary(after_id.bytes, UUID_SUBTYPE)
+        if order_by == "created_at":
+            # created_at не уникален - _id добавлен в ключ как тай-брейкер
+            return {"$or": [
+                {"created_at": {"$gt": after_created_at}},
+                {"created_at": after_created_at, "_id": {"$gt": after}},
+            ]}
+        return {"_id": {"$gt": after}}
+
+    async def iter_users(
+        self,
+        order_by: str,
+        after_id: Optional[UUID],
+        after_created_at: Optional[datetime],
+        batch_size: int,
+        limit: int,
+        request_id: str,
+    ) -> AsyncIterator[User]:
+        """Читает курсор пачками по batch_size: следующая пачка запрашивается (getMore), только когда
+        потребитель дочитал текущую, поэтому в памяти не больше одной пачки."""
+        logger = self.logger.bind(request_id=request_id)
+        sort = [("created_at", 1), ("_id", 1)] if order_by == "created_at" else [("_id", 1)]
+        cursor = self.collection.find(
+            self._keyset_query(order_by, after_id, after_created_at),
+            sort=sort,
+            batch_size=batch_size,
+            limit=limit,
+        )
+        count = 0
+        try:
+            async for data in cursor:
+                count += 1
+                yield self._dict_to_user(data)
+        except Exception as e:
+            logger.error("Failed to iterate users", error=str(e), order_by=order_by, streamed=count)
+            raise
+        finally:
+            # Закрываем серверный курсор сразу, если клиент прервал стрим, а не ждём таймаута MongoDB
+            await cursor.close()
+            logger.info("Users iteration finished", order_by=order_by, streamed=count)
+
+    @log_execution_time
+    async def recent_user_ids(self, limit: int, request_id: str) -> List[UUID]:
+        logger = self.logger.bind(request_id=request_id)
+        try:
+            cursor = self.collection.find({}, {"_id": 1}, sort=[("created_at", -1), ("_id", -1)], limit=limit)
+            user_ids = [_to_uuid(data["_id"]) for data in await cursor.to_list(length=None)]
+            logger.info("Recent user IDs fetched", requested=limit, fetched=len(user_ids))
+            return user_ids
+        except Exception as e:
+            logger.error("Failed to fetch recent user IDs", error=str(e), limit=limit)
+            raise
+
+    @log_execution_time
+    async def update_fields(self, user_id: UUID, fields: Dict[str, Any], request_id: str) -> Optional[User]:
+        logger = self.logger.bind(request_id=request_id)
+        try:
+            logger.info("Updating user fields in MongoDB", user_id=str(user_id), fields=list(fields))
+            # Изменение и чтение результата - одна атомарная операция, без предварительного get_by_id
+            data = await self.collection.find_one_and_update(
+                {"_id": Binary(user_id.bytes, UUID_SUBTYPE)},
+                {"$set": fields, "$inc": {VERSION_FIELD: 1}},
+                return_document=ReturnDocument.AFTER,
+            )
+            if data is None:
+                logger.warning("User not found in MongoDB", user_id=str(user_id))
+                return None
+            user = self._dict_to_user(data)
+            cache_data, version = self._versioned_cache_item(user, data[VERSION_FIELD])
+            cached = await self.cache.set_versioned(user_cache_key(user_id), cache_data, version, settings.redis_ttl)
+            logger.info("User updated in MongoDB", user_id=str(user_id), version=version, cached=cached)
             return user
         except Exception as e:
-            logger.error("Failed to update user in MongoDB", error=str(e), user_id=str(user.id))
+            logger.error("Failed to update user in MongoDB", error=str(e), user_id=str(user_id))
             raise
 
+    async def update(self, user: User, request_id: str) -> User:
+        updated = await self.update_fields(user.id, {"name": user.name, "role": user.role}, request_id)
+        if updated is None:
+            raise UserNotFoundError(f"User with ID {user.id} not found")
+        return updated
+
     @log_execution_time
-    async def delete(self, user_id: UUID, request_id: str) -> None:
+    async def delete(self, user_id: UUID, request_id: str) -> bool:
         logger = self.logger.bind(request_id=request_id)
         try:
             logger.info("Deleting user from MongoDB", user_id=str(user_id))
-            await self.collection.delete_one({"_id": Binary(user_id.bytes, UUID_SUBTYPE)})
-            logger.info("User deleted from MongoDB", user_id=str(user_id))
-            await self.cache.delete(f"user:id:{user_id}")
+            # Удаление и очистка кэша идут параллельно: tombstone в кэше не даст
+            # конкурентному get_by_id вернуть туда удаляемого пользователя
+            result, _ = await asyncio.gather(
+                self.collection.delete_one({"_id": Binary(user_id.bytes, UUID_SUBTYPE)}),
+                self.cache.purge_many([user_cache_key(user_id)], settings.cache_tombstone_ttl),
+            )
+            deleted = result.deleted_count > 0
+            logger.info("User deleted from MongoDB" if deleted else "User not found in MongoDB", user_id=str(user_id))
+            return deleted
         except Exception as e:
             logger.error("Failed to delete user from MongoDB", error=str(e), user_id=str(user_id))
             raise
 
+    @log_execution_time
+    async def delete_many(self, user_ids: List[UUID], request_id: str) -> int:
+        logger = self.logger.bind(request_id=request_id)
+        try:
+            user_ids = list(dict.fromkeys(user_ids))
+            if not user_ids:
+                return 0
+            result, _ = await asyncio.gather(
+                self.collection.delete_many({"_id": {"$in": [Binary(user_id.bytes, UUID_SUBTYPE) for user_id in user_ids]}}),
+                self.cache.purge_many([user_cache_key(user_id) for user_id in user_ids], settings.cache_tombstone_ttl),
+            )
+            logger.info("Users deleted from MongoDB", requested=len(user_ids), deleted=result.deleted_count)
+            return result.deleted_count
+        except Exception as e:
+            logger.error("Failed to delete users from MongoDB", error=str(e), count=len(user_ids))
+            raise
+
     @log_execution_time
     async def get_by_email(self, email: str, request_id: str) -> Optional[User]:
         logger = self.logger.bind(request_id=request_id)
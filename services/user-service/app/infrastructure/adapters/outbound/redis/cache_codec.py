@@ -0,0 +1,21 @@
+import json
+from abc import ABC, abstractmethod
+from typing import Any
+
+
+class CacheCodec(ABC):
+    """Преобразование значений кэша в байты Redis и обратно."""
+
+    @abstractmethod
+    def encode(self, value: Any) -> bytes: ...
+
+    @abstractmethod
+    def decode(self, data: bytes) -> Any: ...
+
+
+class JsonCacheCodec(CacheCodec):
+    def encode(self, value: Any) -> bytes:
+        return json.dumps(value).encode()
+
+    def decode(self, data: bytes) -> Any:
+        return json.loads(data)
@@ -1,42 +1,292 @@
-import json
-from typing import Optional, Any
+import asyncio
+import time
+from typing import Optional, Any, Dict, List, Tuple
 from redis.asyncio import Redis
-from domain.ports.outbound.cache_port import CachePort
+from domain.ports.outbound.cache_port import CachePort, CacheLoader, NEGATIVE_ENTRY
+from infrastructure.adapters.outbound.redis.cache_codec import CacheCodec, JsonCacheCodec
+from infrastructure.adapters.outbound.redis.xfetch import decode_meta, encode_meta, is_negative_meta, jittered_ttl, should_refresh_early
 from structlog import get_logger
 from application.utils.logging_utils import log_execution_time
+from shared.metrics.instruments import track_datastore_operation
 
 logger = get_logger(__name__)
 
+# Запись с версией за один вызов. KEYS - пары (ключ значения, ключ метаданных); ARGV[1] - канал
+# инвалидации ('' - без рассылки), ARGV[2] - сообщение, ARGV[3] - '1', если отрицательные записи
+# и tombstone перезаписываются, дальше четвёрки (версия, значение, TTL в мс, метаданные).
+# Значение не пишется, если в кэше уже лежит более новая версия: параллельные обновления
+# и дочитывания из MongoDB не могут вернуть в кэш устаревшие данные.
+VERSIONED_SET_SCRIPT = """
+local accepted = {}
+local published = false
+local replace_negative = ARGV[3] == '1'
+for i = 1, #KEYS, 2 do
+    local arg = 2 * i + 1
+    local version = tonumber(ARGV[arg + 1])
+    local meta = redis.call('GET', KEYS[i + 1])
+    local current = nil
+    -- Метаданные без ':' - отрицательная запись или tombstone
+    if meta and not (replace_negative and not string.find(meta, ':', 1, true)) then
+        current = tonumber(string.match(meta, '^%d+'))
+    end
+    if current == nil or current <= version then
+        redis.call('SET', KEYS[i], ARGV[arg + 2], 'PX', ARGV[arg + 3])
+        redis.call('SET', KEYS[i + 1], ARGV[arg + 4], 'PX', ARGV[arg + 3])
+        accepted[#accepted + 1] = 1
+        published = true
+    else
+        accepted[#accepted + 1] = 0
+    end
+end
+if published and ARGV[1] ~= '' then
+    redis.call('PUBLISH', ARGV[1], ARGV[2])
+end
+return accepted
+"""
+
+
+# Версия-tombstone удалённого ключа: больше любой реальной, поэтому скрипт отклоняет все записи до истечения TTL
+TOMBSTONE_VERSION = 2 ** 53
+# Версия отрицательной записи: меньше любой реальной, поэтому появившийся ключ её перезаписывает
+NEGATIVE_VERSION = 0
+
+
+def cache_meta_key(key: str) -> str:
+    """Ключ метаданных записи: версия, время вычисления и срок истечения (см. xfetch)."""
+    return f"{key}:meta"
+
 class RedisCacheRepository(CachePort):
-    def __init__(self, redis_client: Redis):
+    def __init__(self, redis_client: Redis, codec: Optional[CacheCodec] = None, ttl_jitter: float = 0.0, xfetch_beta: float = 1.0):
         self.redis = redis_client
+        self.codec = codec or JsonCacheCodec()
+        self.ttl_jitter = ttl_jitter
+        self.xfetch_beta = xfetch_beta
+        # EVALSHA с автоматической загрузкой скрипта при NOSCRIPT
+        self._versioned_set = redis_client.register_script(VERSIONED_SET_SCRIPT)
+        self._refreshers: Dict[str, Tuple[CacheLoader, int]] = {}
+        self._refreshing: Dict[str, asyncio.Task] = {}
+        self.early_refreshes = 0
+        self.hits = 0
+        self.negative_hits = 0
+        self.misses = 0
         self.logger = logger.bind(repository="RedisCacheRepository")
 
+    def register_refresher(self, prefix: str, loader: CacheLoader, ttl: int) -> None:
+        self._refreshers[prefix] = (loader, ttl)
+
+    def _refresher_for(self, key: str) -> Optional[Tuple[CacheLoader, int]]:
+        for prefix, refresher in self._refreshers.items():
+            if key.startswith(prefix):
+                return refresher
+        return None
+
+    def _check_early_refresh(self, key: str, meta: Optional[bytes]) -> None:
+        if key in self._refreshing:
+            return
+        decoded = decode_meta(meta)
+        if decoded is None or not should_refresh_early(*decoded, self.xfetch_beta):
+            return
+        loader, ttl = self._refresher_for(key)
+        task = asyncio.create_task(self._refresh(key, loader, ttl))
+        self._refreshing[key] = task
+        task.add_done_callback(lambda _: self._refreshing.pop(key, None))
+
+    async def _refresh(self, key: str, loader: CacheLoader, ttl: int) -> None:
+        started = time.perf_counter()
+        try:
+            loaded = await loader(key)
+            if loaded is not None:
+                value, version = loaded
+                await self.set_many_versioned({key: (value, version)}, ttl, compute_time=time.perf_counter() - started)
+            self.early_refreshes += 1
+            self.logger.info("Запись кэша обновлена заранее", key=key)
+        except Exception as e:
+            # Запись ещё не истекла: при неудаче её просто пересчитает следующий промах
+            self.logger.warning("Не удалось заранее обновить запись кэша", key=key, error=str(e))
+
+    async def _cancel_refreshes(self) -> None:
+        for task in list(self._refreshing.values()):
+            task.cancel()
+        await asyncio.gather(*self._refreshing.values(), return_exceptions=True)
+
+    async def close(self) -> None:
+        """Останавливает фоновые обновления XFetch; вызывается при остановке сервиса."""
+        await self._cancel_refreshes()
+
     @log_execution_time
-    async def get(self, key: str) -> Optional[Any]:
+    @track_datastore_operation("redis", "get")
+    async def get_encoded(self, key: str) -> Optional[bytes]:
         logger = self.logger.bind(key=key)
         try:
-            value = await self.redis.get(key)
+            # Метаданные читаются тем же запросом: по ним видно tombstone и решается, обновлять ли запись заранее
+            value, meta = await self.redis.mget([key, cache_meta_key(key)])
+            # Значение рядом с tombstone - остаток записи, успевшей проскочить удаление: ключа больше нет
+            if is_negative_meta(meta):
+                self.negative_hits += 1
+                logger.info("Найдена отрицательная запись кэша", key=key)
+                return NEGATIVE_ENTRY
             if value:
+                if self._refresher_for(key) is not None:
+                    self._check_early_refresh(key, meta)
+                self.hits += 1
                 logger.info("Кэш найден", key=key)
-                return json.loads(value)
+                return value
+            self.misses += 1
             logger.info("Кэш не найден", key=key)
             return None
         except Exception as e:
             logger.error("Ошибка при получении из кэша", error=str(e), key=key)
             raise
 
+    async def get(self, key: str) -> Optional[Any]:
+        value = await self.get_encoded(key)
+        return self.codec.decode(value) if value else value
+
     @log_execution_time
+    @track_datastore_operation("redis", "setex")
     async def set(self, key: str, value: Any, ttl: int) -> None:
         logger = self.logger.bind(key=key)
         try:
-            await self.redis.setex(key, ttl, json.dumps(value))
+            await self.redis.setex(key, ttl, self.codec.encode(value))
             logger.info("Значение установлено в кэш", key=key, ttl=ttl)
         except Exception as e:
             logger.error("Ошибка при установке в кэш", error=str(e), key=key)
             raise
 
     @log_execution_time
+    @track_datastore_operation("redis", "mget")
+    async def get_many_encoded(self, keys: List[str]) -> List[Optional[bytes]]:
+        logger = self.logger.bind(keys_count=len(keys))
+        try:
+            if not keys:
+                return []
+            values = await self.redis.mget(keys + [cache_meta_key(key) for key in keys])
+            result = []
+            for key, value, meta in zip(keys, values[:len(keys)], values[len(keys):]):
+                if is_negative_meta(meta):
+                    self.negative_hits += 1
+                    result.append(NEGATIVE_ENTRY)
+                elif value:
+                    self.hits += 1
+                    if self._refresher_for(key) is not None:
+                        self._check_early_refresh(key, meta)
+                    result.append(value)
+                else:
+                    self.misses += 1
+                    result.append(None)
+            logger.info(
+                "Пакетное чтение из кэша",
+                hits=sum(1 for value in result if value),
+                negative_hits=sum(1 for value in result if value == NEGATIVE_ENTRY),
+            )
+            return result
+        except Exception as e:
+            logger.error("Ошибка при пакетном получении из кэша", error=str(e))
+            raise
+
+    async def get_many(self, keys: List[str]) -> List[Optional[Any]]:
+        values = await self.get_many_encoded(keys)
+        return [self.codec.decode(value) if value else value for value in values]
+
+    @log_execution_time
+    @track_datastore_operation("redis", "pipeline_setex")
+    async def set_many(self, items: Dict[str, Any], ttl: int) -> None:
+        logger = self.logger.bind(keys_count=len(items))
+        try:
+            if not items:
+                return
+            async with self.redis.pipeline(transaction=False) as pipe:
+                for key, value in items.items():
+                    pipe.setex(key, ttl, self.codec.encode(value))
+                await pipe.execute()
+            logger.info("Значения установлены в кэш пакетом", ttl=ttl)
+        except Exception as e:
+            logger.error("Ошибка при пакетной установке в кэш", error=str(e))
+            raise
+
+    async def _run_versioned_set(
+        self,
+        encoded: Dict[str, Tuple[bytes, int]],
+        ttl: int,
+        compute_time: float,
+        replace_negative: bool,
+        channel: str = "",
+        message: str = "",
+    ) -> Dict[str, bool]:
+        keys = []
+        args = [channel, message, "1" if replace_negative else ""]
+        for key, (value, version) in encoded.items():
+            # Свой TTL на каждую запись: пачка, прогретая разом, не истечёт одновременно
+            item_ttl = jittered_ttl(ttl, self.ttl_jitter)
+            keys += [key, cache_meta_key(key)]
+            args += [version, value, int(item_ttl * 1000), encode_meta(version, compute_time, item_ttl)]
+        accepted = await self._versioned_set(keys=keys, args=args)
+        return {key: bool(flag) for key, flag in zip(encoded, accepted)}
+
+    async def set_versioned(
+        self, key: str, value: Any, version: int, ttl: int, compute_time: float = 0.0, replace_negative: bool = False
+    ) -> bool:
+        accepted = await self.set_many_versioned({key: (value, version)}, ttl, compute_time, replace_negative)
+        return accepted[key]
+
+    @log_execution_time
+    @track_datastore_operation("redis", "evalsha_versioned_set")
+    async def set_many_versioned(
+        self, items: Dict[str, Tuple[Any, int]], ttl: int, compute_time: float = 0.0, replace_negative: bool = False
+    ) -> Dict[str, bool]:
+        logger = self.logger.bind(keys_count=len(items))
+        try:
+            if not items:
+                return {}
+            accepted = await self._run_versioned_set(
+                {key: (self.codec.encode(value), version) for key, (value, version) in items.items()},
+                ttl,
+                compute_time,
+                replace_negative,
+            )
+            logger.info("Значения с версией установлены в кэш", ttl=ttl, rejected=sum(1 for ok in accepted.values() if not ok))
+            return accepted
+        except Exception as e:
+            logger.error("Ошибка при установке в кэш с версией", error=str(e))
+            raise
+
+    @log_execution_time
+    @track_datastore_operation("redis", "pipeline_set_negative")
+    async def set_negative_many(self, keys: List[str], ttl: int) -> None:
+        logger = self.logger.bind(keys_count=len(keys))
+        try:
+            if not keys:
+                return
+            # NX: если ключ успели записать (создание, tombstone удаления), отрицательная запись не нужна
+            async with self.redis.pipeline(transaction=False) as pipe:
+                for key in keys:
+                    pipe.set(cache_meta_key(key), NEGATIVE_VERSION, ex=ttl, nx=True)
+                await pipe.execute()
+            logger.info("Отрицательные записи установлены в кэш", ttl=ttl)
+        except Exception as e:
+            logger.error("Ошибка при установке отрицательных записей в кэш", error=str(e))
+            raise
+
+    @log_execution_time
+    @track_datastore_operation("redis", "pipeline_purge")
+    async def purge_many(self, keys: List[str], ttl: int) -> None:
+        logger = self.logger.bind(keys_count=len(keys))
+        try:
+            if not keys:
+                return
+            # MULTI: скрипт записи с версией не может выполниться между tombstone и DEL и вернуть значение
+            async with self.redis.pipeline(transaction=True) as pipe:
+                for key in keys:
+                    pipe.setex(cache_meta_key(key), ttl, TOMBSTONE_VERSION)
+                pipe.delete(*keys)
+                await pipe.execute()
+            logger.info("Значения удалены из кэша", ttl=ttl)
+        except Exception as e:
+            logger.error("Ошибка при удалении из кэша", error=str(e))
+            raise
+
+    @log_execution_time
+    @track_datastore_operation("redis", "del")
     async def delete(self, key: str) -> None:
         logger = self.logger.bind(key=key)
         try:
@@ -44,4 +294,12 @@ class RedisCacheRepository(CachePort):
             logger.info("Значение удалено из кэша", key=key)
         except Exception as e:
             logger.error("Ошибка при удалении из кэша", error=str(e), key=key)
-            raise
\ No newline at end of file
+            raise
+
+    def stats(self) -> dict:
+        return {
+            "hits": self.hits,
+            "negative_hits": self.negative_hits,
+            "misses": self.misses,
+            "early_refreshes": self.early_refreshes,
+        }
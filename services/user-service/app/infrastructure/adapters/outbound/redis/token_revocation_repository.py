@@ -0,0 +1,20 @@
+from redis.asyncio import Redis
+from domain.ports.outbound.token_revocation_port import TokenRevocationPort
+from shared.metrics.instruments import track_datastore_operation
+from structlog import get_logger
+
+logger = get_logger(__name__)
+
+def revoked_token_key(token_digest: str) -> str:
+    return f"revoked_token:{token_digest}"
+
+class RedisTokenRevocationRepository(TokenRevocationPort):
+    """Список отозванных токенов: ключ revoked_token:<sha256 hex> с TTL до истечения токена."""
+
+    def __init__(self, redis_client: Redis):
+        self.redis = redis_client
+        self.logger = logger.bind(repository="RedisTokenRevocationRepository")
+
+    @track_datastore_operation("redis", "exists")
+    async def is_revoked(self, token_digest: str) -> bool:
+        return bool(await self.redis.exists(revoked_token_key(token_digest)))
@@ -0,0 +1,207 @@
+import asyncio
+import json
+from typing import Optional, Any, Dict, List, Tuple
+from uuid import uuid4
+from redis.asyncio import Redis
+from application.utils.ttl_lru_cache import TtlLruCache
+from infrastructure.adapters.outbound.redis.cache_repository import RedisCacheRepository, TOMBSTONE_VERSION, cache_meta_key
+from infrastructure.adapters.outbound.redis.cache_codec import CacheCodec
+from shared.metrics.instruments import track_datastore_operation
+from structlog import get_logger
+
+logger = get_logger(__name__)
+
+class TwoTierCacheRepository(RedisCacheRepository):
+    """Локальный LRU поверх Redis; записи и удаления рассылают инвалидацию всем репликам через pub/sub."""
+
+    def __init__(
+        self,
+        redis_client: Redis,
+        local: TtlLruCache[str, bytes],
+        channel: str,
+        codec: Optional[CacheCodec] = None,
+        ttl_jitter: float = 0.0,
+        xfetch_beta: float = 1.0,
+    ):
+        super().__init__(redis_client, codec, ttl_jitter, xfetch_beta)
+        self.local = local
+        self.channel = channel
+        self.instance_id = str(uuid4())
+        self.invalidations_received = 0
+        self._invalidation_seq = 0
+        self._listener: Optional[asyncio.Task] = None
+        self.logger = logger.bind(repository="TwoTierCacheRepository", instance_id=self.instance_id)
+
+    def _invalidate_local(self, keys: List[str]) -> None:
+        self._invalidation_seq += 1
+        for key in keys:
+            self.local.invalidate(key)
+
+    def _clear_local(self) -> None:
+        self._invalidation_seq += 1
+        self.local.clear()
+
+    def _invalidation_message(self, keys: List[str]) -> str:
+        return json.dumps({"origin": self.instance_id, "keys": keys})
+
+    # L1 хранит те же закодированные байты, что и Redis: get() декодирует их,
+    # а get_encoded() отдаёт как есть для быстрого пути gRPC. Отрицательные записи
+    # в L1 не кладутся, чтобы не держать их дольше собственного TTL в Redis.
+    async def get_encoded(self, key: str) -> Optional[bytes]:
+        value = self.local.get(key)
+        if value is not None:
+            return value
+        seq = self._invalidation_seq
+        value = await super().get_encoded(key)
+        if not value:
+            return value
+        # Если во время чтения пришла инвалидация, значение могло устареть - не кладём его в L1
+        if seq == self._invalidation_seq:
+            self.local.set(key, value)
+        return value
+
+    async def get_many_encoded(self, keys: List[str]) -> List[Optional[bytes]]:
+        result = [self.local.get(key) for key in keys]
+        missing = [i for i, value in enumerate(result) if value is None]
+        if not missing:
+            return result
+        seq = self._invalidation_seq
+        remote = await super().get_many_encoded([keys[i] for i in missing])
+        for i, value in zip(missing, remote):
+            result[i] = value
+            if value and seq == self._invalidation_seq:
+                self.local.set(keys[i], value)
+        return result
+
+    async def set(self, key: str, value: Any, ttl: int) -> None:
+        await self.set_many({key: value}, ttl)
+
+    @track_datastore_operation("redis", "pipeline_setex_publish")
+    async def set_many(self, items: Dict[str, Any], ttl: int) -> None:
+        if not items:
+            return
+        logger = self.logger.bind(keys_count=len(items))
+        try:
+            encoded = {key: self.codec.encode(value) for key, value in items.items()}
+            self._invalidate_local(list(encoded))
+            seq = self._invalidation_seq
+            async with self.redis.pipeline(transaction=False) as pipe:
+                for key, value in encoded.items():
+                    pipe.setex(key, ttl, value)
+                pipe.publish(self.channel, self._invalidation_message(list(encoded)))
+                await pipe.execute()
+            # Как в get_encoded: инвалидация во время записи могла прийти от более новой записи другой реплики
+            if seq == self._invalidation_seq:
+                for key, value in encoded.items():
+                    self.local.set(key, value)
+            logger.info("Значения установлены в кэш с рассылкой инвалидации", ttl=ttl)
+        except Exception as e:
+            logger.error("Ошибка при установке в двухуровневый кэш", error=str(e))
+            raise
+
+    @track_datastore_operation("redis", "evalsha_versioned_set_publish")
+    async def set_many_versioned(
+        self, items: Dict[str, Tuple[Any, int]], ttl: int, compute_time: float = 0.0, replace_negative: bool = False
+    ) -> Dict[str, bool]:
+        if not items:
+            return {}
+        logger = self.logger.bind(keys_count=len(items))
+        try:
+            encoded = {key: (self.codec.encode(value), version) for key, (value, version) in items.items()}
+            self._invalidate_local(list(encoded))
+            seq = self._invalidation_seq
+            # Рассылку инвалидации делает сам скрипт, если хотя бы одна запись принята
+            accepted = await self._run_versioned_set(
+                encoded, ttl, compute_time, replace_negative, self.channel, self._invalidation_message(list(encoded))
+            )
+            if seq == self._invalidation_seq:
+                for key, (value, _) in encoded.items():
+                    if accepted[key]:
+                        self.local.set(key, value)
+            logger.info("Значения с версией установлены в кэш с рассылкой инвалидации", ttl=ttl, rejected=sum(1 for ok in accepted.values() if not ok))
+            return accepted
+        except Exception as e:
+            logger.error("Ошибка при установке с версией в двухуровневый кэш", error=str(e))
+            raise
+
+    @track_datastore_operation("redis", "pipeline_purge_publish")
+    async def purge_many(self, keys: List[str], ttl: int) -> None:
+        if not keys:
+            return
+        logger = self.logger.bind(keys_count=len(keys))
+        try:
+            self._invalidate_local(keys)
+            # Как в RedisCacheRepository.purge_many: tombstone и DEL одной транзакцией
+            async with self.redis.pipeline(transaction=True) as pipe:
+                for key in keys:
+                    pipe.setex(cache_meta_key(key), ttl, TOMBSTONE_VERSION)
+                pipe.delete(*keys)
+                pipe.publish(self.channel, self._invalidation_message(keys))
+                await pipe.execute()
+            logger.info("Значения удалены из кэша с рассылкой инвалидации", ttl=ttl)
+        except Exception as e:
+            logger.error("Ошибка при удалении из двухуровневого кэша", error=str(e))
+            raise
+
+    @track_datastore_operation("redis", "pipeline_del_publish")
+    async def delete(self, key: str) -> None:
+        logger = self.logger.bind(key=key)
+        try:
+            self._invalidate_local([key])
+            async with self.redis.pipeline(transaction=False) as pipe:
+                pipe.delete(key)
+                pipe.publish(self.channel, self._invalidation_message([key]))
+                await pipe.execute()
+            logger.info("Значение удалено из кэша с рассылкой инвалидации", key=key)
+        except Exception as e:
+            logger.error("Ошибка при удалении из двухуровневого кэша", error=str(e), key=key)
+            raise
+
+    def _on_message(self, data: bytes) -> None:
+        message = json.loads(data)
+        if message.get("origin") == self.instance_id:
+            return
+        self.invalidations_received += 1
+        self._invalidate_local(message.get("keys", []))
+
+    async def _listen(self) -> None:
+        while True:
+            pubsub = self.redis.pubsub()
+            try:
+                await pubsub.subscribe(self.channel)
+                # Пока подписки не было, инвалидации могли потеряться
+                self._clear_local()
+                self.logger.info("Подписка на инвалидации кэша активна", channel=self.channel)
+                async for message in pubsub.listen():
+                    if message["type"] == "message":
+                        self._on_message(message["data"])
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self.logger.error("Подписка на инвалидации прервана, локальный кэш очищен", error=str(e))
+                self._clear_local()
+                await asyncio.sleep(1)
+            finally:
+                await pubsub.aclose()
+
+    def start(self) -> None:
+        if self._listener is None or self._listener.done():
+            self._listener = asyncio.create_task(self._listen())
+
+    async def close(self) -> None:
+        if self._listener is not None:
+            self._listener.cancel()
+            try:
+                await self._listener
+            except asyncio.CancelledError:
+                pass
+        await super().close()
+        self.logger.info("Двухуровневый кэш остановлен", **self.stats())
+
+    def stats(self) -> dict:
+        return {
+            "local": self.local.stats(),
+            "remote": {"hits": self.hits, "negative_hits": self.negative_hits, "misses": self.misses},
+            "invalidations_received": self.invalidations_received,
+            "early_refreshes": self.early_refreshes,
+        }
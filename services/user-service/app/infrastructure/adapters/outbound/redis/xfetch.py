@@ -0,0 +1,42 @@
+"""Метаданные записей кэша и вероятностное раннее обновление (XFetch, Vattani et al., 2015).
+
+Рядом со значением хранится строка "версия:время вычисления в мс:срок истечения в мс".
+Метаданные из одной версии без значения - отрицательная запись или tombstone удалённого ключа.
+Читатель обновляет запись заранее с вероятностью, растущей к сроку истечения и
+пропорциональной стоимости вычисления: дорогие записи обновляются раньше, а горячая
+запись почти наверняка обновится до того, как истечёт у всех одновременно.
+"""
+import math
+import random
+import time
+from typing import Optional, Tuple
+
+
+def encode_meta(version: int, compute_time: float, ttl: float) -> str:
+    return f"{version}:{compute_time * 1000:.3f}:{int((time.time() + ttl) * 1000)}"
+
+
+def decode_meta(meta: Optional[bytes]) -> Optional[Tuple[float, float]]:
+    """(время вычисления, срок истечения) в секундах; None для tombstone и записей без метаданных."""
+    if not meta:
+        return None
+    parts = meta.split(b":")
+    if len(parts) != 3:
+        return None
+    return float(parts[1]) / 1000, int(parts[2]) / 1000
+
+
+def is_negative_meta(meta: Optional[bytes]) -> bool:
+    return bool(meta) and b":" not in meta
+
+
+def should_refresh_early(compute_time: float, expires_at: float, beta: float) -> bool:
+    if compute_time <= 0 or beta <= 0:
+        return False
+    # 1 - random() лежит в (0, 1], логарифм не уходит в -inf
+    return time.time() - compute_time * beta * math.log(1.0 - random.random()) >= expires_at
+
+
+def jittered_ttl(ttl: int, jitter: float) -> float:
+    """TTL, уменьшенный на случайную долю до jitter: записи, созданные вместе, истекают в разное время."""
+    return max(0.001, ttl * (1.0 - jitter * random.random()))
@@ -1,13 +1,25 @@
+from typing import AsyncIterable
 from dishka import Provider, Scope, provide, make_async_container, AsyncContainer
 from pymongo import AsyncMongoClient
 from pymongo.collection import Collection
 from redis.asyncio import Redis
 from infrastructure.adapters.outbound.mongo.user_repository import MongoUserRepository
 from infrastructure.adapters.outbound.redis.cache_repository import RedisCacheRepository
+from infrastructure.adapters.outbound.redis.two_tier_cache_repository import TwoTierCacheRepository
+from infrastructure.adapters.outbound.redis.cache_codec import CacheCodec, JsonCacheCodec
+from infrastructure.adapters.inbound.grpc.user_response_codec import UserResponseCacheCodec
+from infrastructure.adapters.inbound.grpc.token_verifier import TokenVerifier
+from infrastructure.adapters.outbound.redis.token_revocation_repository import RedisTokenRevocationRepository
+from application.utils.ttl_lru_cache import TtlLruCache
+from infrastructure.adapters.outbound.coalescing.coalescing_repository import CoalescingUserRepository
+from application.utils.singleflight import SingleFlight
 from application.user_service_impl import UserService
 from application.admin_service_impl import AdminService
 from domain.ports.outbound.user_repository_port import UserRepositoryPort
 from domain.ports.outbound.cache_port import CachePort
+from shared.metrics.mongo import MongoCommandMetricsListener
+from shared.mongo.indexes import start_index_maintenance
+from shared.metrics.registry import expose_stats
 from config import settings
 from structlog import get_logger
 
@@ -16,7 +28,12 @@ logger = get_logger(__name__)
 class AppProvider(Provider):
     @provide(scope=Scope.APP)
     async def get_mongo_client(self) -> AsyncMongoClient:
-        client = AsyncMongoClient(settings.mongo_uri, uuidRepresentation=settings.mongo_uuid_representation)
+        client = AsyncMongoClient(
+            settings.mongo_uri,
+            uuidRepresentation=settings.mongo_uuid_representation,
+            minPoolSize=settings.mongo_min_pool_size,
+            event_listeners=[MongoCommandMetricsListener()],
+        )
         logger.info("MongoDB client initialized")
         return client
 
@@ -24,25 +41,73 @@ class AppProvider(Provider):
     async def get_mongo_collection(self, client: AsyncMongoClient) -> Collection:
         db = client[settings.mongo_db]
         collection = db["users"]
-        await collection.create_index("name")  # Добавляем индекс для поля name
+        await start_index_maintenance(collection, MongoUserRepository.INDEXES, MongoUserRepository.QUERY_SHAPES, settings.mongo_index_check)
         logger.info("MongoDB collection initialized")
         return collection
 
     @provide(scope=Scope.APP)
     async def get_redis_client(self) -> Redis:
-        client = Redis.from_url(settings.redis_uri, decode_responses=True)
+        # Байты без декодирования: в кэше может лежать сериализованный protobuf
+        client = Redis.from_url(settings.redis_uri, decode_responses=False)
         logger.info("Redis client initialized")
         return client
 
     @provide(scope=Scope.APP)
-    async def get_cache_repository(self, redis_client: Redis) -> CachePort:
-        logger.info("Redis cache repository initialized")
-        return RedisCacheRepository(redis_client)
+    async def get_cache_codec(self) -> CacheCodec:
+        logger.info("Cache codec initialized", cache_format=settings.cache_format)
+        return UserResponseCacheCodec() if settings.cache_format == "protobuf" else JsonCacheCodec()
 
     @provide(scope=Scope.APP)
-    async def get_user_repository(self, collection: Collection, cache: CachePort) -> UserRepositoryPort:
+    async def get_cache_repository(self, redis_client: Redis, codec: CacheCodec) -> AsyncIterable[CachePort]:
+        if settings.local_cache_enabled:
+            cache = TwoTierCacheRepository(
+                redis_client,
+                TtlLruCache(max_size=settings.local_cache_max_size, ttl=settings.local_cache_ttl),
+                settings.cache_invalidation_channel,
+                codec,
+                settings.cache_ttl_jitter,
+                settings.cache_xfetch_beta,
+            )
+            cache.start()
+            logger.info("Two-tier cache repository initialized", local_max_size=settings.local_cache_max_size, local_ttl=settings.local_cache_ttl)
+        else:
+            cache = RedisCacheRepository(redis_client, codec, settings.cache_ttl_jitter, settings.cache_xfetch_beta)
+            logger.info("Redis cache repository initialized")
+        expose_stats("user_cache", cache.stats)
+        yield cache
+        await cache.close()
+
+    @provide(scope=Scope.APP)
+    async def get_singleflight(self) -> SingleFlight:
+        singleflight = SingleFlight()
+        expose_stats("singleflight", singleflight.stats)
+        logger.info("Singleflight initialized")
+        return singleflight
+
+    @provide(scope=Scope.APP)
+    async def get_user_repository(self, collection: Collection, cache: CachePort, singleflight: SingleFlight) -> UserRepositoryPort:
+        repo = MongoUserRepository(collection, cache)
+        if settings.singleflight_enabled:
+            logger.info("User repository initialized with request coalescing")
+            return CoalescingUserRepository(repo, singleflight)
         logger.info("User repository initialized")
-        return MongoUserRepository(collection, cache)
+        return repo
+
+    @provide(scope=Scope.APP)
+    async def get_token_verifier(self, redis_client: Redis) -> TokenVerifier:
+        # TTL задаётся для каждой записи по exp токена
+        cache = TtlLruCache(max_size=settings.jwt_cache_max_size, ttl=0) if settings.jwt_cache_max_size > 0 else None
+        revocation = RedisTokenRevocationRepository(redis_client) if settings.jwt_revocation_check_enabled else None
+        verifier = TokenVerifier(
+            settings.jwt_secret_key,
+            ["HS256"],
+            cache=cache,
+            revocation=revocation,
+            revocation_recheck_interval=settings.jwt_revocation_recheck_interval,
+        )
+        expose_stats("jwt_cache", verifier.stats)
+        logger.info("Token verifier initialized", cache_max_size=settings.jwt_cache_max_size, revocation_check=revocation is not None)
+        return verifier
 
     @provide(scope=Scope.APP)
     async def get_user_service(self, repo: UserRepositoryPort) -> UserService:
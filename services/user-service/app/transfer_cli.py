@@ -0,0 +1,36 @@
+"""NDJSON-экспорт и импорт коллекции users.
+
+    python app/transfer_cli.py export /data/users --partitions 16 --workers 4
+    python app/transfer_cli.py import /data/users --workers 4
+
+Повторный запуск той же команды продолжает с последнего чекпоинта.
+"""
+import sys
+from pymongo import AsyncMongoClient
+from config import settings
+from main import setup_logging
+from application.utils.logging_config import stop_logging
+from infrastructure.adapters.outbound.mongo.user_repository import MongoUserRepository
+from shared.datatransfer.ndjson_transfer import run_cli
+
+# Нужны только преобразования документа, коллекция и кэш не используются
+_repository = MongoUserRepository(None, None)
+
+def normalize(document: dict) -> dict:
+    """Документ MongoDB или запись из файла -> документ в формате репозитория."""
+    return _repository._user_to_dict(_repository._dict_to_user(document))
+
+def open_collection():
+    client = AsyncMongoClient(settings.mongo_uri, uuidRepresentation=settings.mongo_uuid_representation)
+    return client, client[settings.mongo_db]["users"]
+
+def init_process():
+    setup_logging()
+    return stop_logging
+
+if __name__ == "__main__":
+    teardown = init_process()
+    try:
+        sys.exit(run_cli(sys.argv[1:], "users", open_collection, normalize, init=init_process))
+    finally:
+        teardown()
@@ -0,0 +1,92 @@
+"""Накладные расходы аутентификации на один RPC: jwt.decode на каждый вызов против кэша проверенных токенов.
+
+Запуск из каталога services/user-service:
+    PYTHONPATH=app:../.. python benchmarks/bench_auth_middleware.py
+"""
+import asyncio
+import time
+
+import jwt
+
+from fakes import silence_logging
+from protos import ensure_generated
+
+ensure_generated()
+
+from config import settings  # noqa: E402
+from application.utils.ttl_lru_cache import TtlLruCache  # noqa: E402
+from infrastructure.adapters.inbound.grpc.interceptors import ADMIN_POLICY, AuthInterceptor  # noqa: E402
+from infrastructure.adapters.inbound.grpc.token_verifier import TokenVerifier  # noqa: E402
+from structlog import get_logger  # noqa: E402
+
+ITERATIONS = 20000
+# Типичные метаданные вызова через grpc-gateway/nginx
+METADATA_EXTRA = (("user-agent", "grpc-python/1.66"), ("x-request-id", "bench"), ("grpc-accept-encoding", "identity,deflate,gzip"))
+
+
+class FakeContext:
+    def __init__(self, token: str):
+        self.metadata = METADATA_EXTRA + (("authorization", f"Bearer {token}"),)
+
+    def invocation_metadata(self):
+        return self.metadata
+
+    def set_code(self, code):
+        pass
+
+    def set_details(self, details):
+        pass
+
+
+class FakeServicer:
+    def __init__(self, verifier: TokenVerifier):
+        self.interceptor = AuthInterceptor(verifier, {})
+
+    async def call(self, request, context, request_id: str):
+        await self.interceptor.authenticate(ADMIN_POLICY, context)
+
+
+class BaselineServicer:
+    """Исходная реализация admin_auth_middleware: dict из метаданных и полный jwt.decode на каждый вызов."""
+
+    def __init__(self):
+        self.logger = get_logger("bench")
+
+    async def call(self, request, context, request_id: str):
+        self.logger.bind(request_id=request_id)
+        metadata = dict(context.invocation_metadata())
+        token = metadata.get("authorization")
+        payload = jwt.decode(token.replace("Bearer ", ""), settings.jwt_secret_key, algorithms=["HS256"])
+        assert payload.get("role") == "admin"
+
+
+async def measure(fn, context: FakeContext) -> float:
+    for _ in range(1000):
+        await fn(context)
+    started = time.perf_counter()
+    for _ in range(ITERATIONS):
+        await fn(context)
+    return (time.perf_counter() - started) / ITERATIONS * 1e6
+
+
+async def main() -> None:
+    silence_logging()
+    token = jwt.encode({"role": "admin", "exp": int(time.time()) + 3600}, settings.jwt_secret_key, algorithm="HS256")
+    context = FakeContext(token)
+    baseline = BaselineServicer()
+    uncached = FakeServicer(TokenVerifier(settings.jwt_secret_key, ["HS256"]))
+    cached_verifier = TokenVerifier(settings.jwt_secret_key, ["HS256"], cache=TtlLruCache(max_size=10000, ttl=0))
+    cached = FakeServicer(cached_verifier)
+
+    results = {
+        "before (dict + jwt.decode)": await measure(lambda ctx: baseline.call(None, ctx, request_id="bench"), context),
+        "after, cache disabled": await measure(lambda ctx: uncached.call(None, ctx, request_id="bench"), context),
+        "after, cache enabled": await measure(lambda ctx: cached.call(None, ctx, request_id="bench"), context),
+    }
+    for name, us in results.items():
+        print(f"{name:>28}: {us:7.2f} us/RPC")
+    print(f"cache stats: {cached_verifier.stats()}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,58 @@
+"""1000 последовательных GetUser против одного BatchGetUsers на уровне AdminService.
+
+Redis и MongoDB заменены in-memory фейками с задержкой на каждый сетевой запрос.
+Запуск из каталога services/user-service:
+    PYTHONPATH=app:../.. python benchmarks/bench_batch_get_users.py
+"""
+import asyncio
+import time
+from datetime import datetime
+from uuid import uuid4
+
+from fakes import FakeCollection, InMemoryCache, silence_logging
+from application.admin_service_impl import AdminService
+from application.dto.user_dto import UserIdDTO, UserIdsDTO
+from infrastructure.adapters.outbound.mongo.user_repository import MongoUserRepository
+from shared.domain.models.user import User
+
+USERS = 1000
+
+
+async def seed(repo: MongoUserRepository, cache: InMemoryCache):
+    ids = []
+    for i in range(USERS):
+        user = User(id=uuid4(), name=f"user-{i}", created_at=datetime.utcnow())
+        await repo.create(user, request_id="seed")
+        ids.append(user.id)
+    cache.data.clear()
+    return ids
+
+
+async def run(mode: str, warm: bool) -> None:
+    cache, collection = InMemoryCache(), FakeCollection()
+    repo = MongoUserRepository(collection, cache)
+    service = AdminService(repo)
+    ids = await seed(repo, cache)
+    if warm:
+        await service.batch_get_users(UserIdsDTO(ids=ids), request_id="warm")
+    cache.round_trips = collection.round_trips = 0
+    started = time.perf_counter()
+    if mode == "sequential":
+        for user_id in ids:
+            await service.get_user(UserIdDTO(id=user_id), request_id="bench")
+    else:
+        await service.batch_get_users(UserIdsDTO(ids=ids), request_id="bench")
+    elapsed_ms = (time.perf_counter() - started) * 1000
+    print(f"{mode:>10} {'warm' if warm else 'cold':>4}: {elapsed_ms:9.1f} ms, "
+          f"redis round trips={cache.round_trips}, mongo round trips={collection.round_trips}")
+
+
+async def main() -> None:
+    silence_logging()
+    for warm in (False, True):
+        for mode in ("sequential", "batch"):
+            await run(mode, warm)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,71 @@
+"""Импорт пользователей: CreateUser по одному против клиентского стрима BulkCreateUsers.
+
+Redis и MongoDB - фейки с задержкой на каждый запрос, так что разница показывает
+экономию сетевых обращений: CreateUser делает insert_one и setex на каждого
+пользователя, BulkCreateUsers - один insert_many и один конвейер setex на пачку.
+
+Запуск из каталога services/user-service:
+    PYTHONPATH=app:../.. python benchmarks/bench_bulk_create.py
+"""
+import asyncio
+import time
+from uuid import uuid4
+
+from fakes import silence_logging
+from grpc_harness import Harness
+from infrastructure.adapters.inbound.grpc import user_pb2  # noqa: E402
+
+USERS = 20000
+CREATE_USER_CONCURRENCY = 16
+
+
+def requests():
+    return [user_pb2.CreateUserRequest(id=str(uuid4()), name=f"user-{i}", role="user") for i in range(USERS)]
+
+
+async def one_by_one(harness: Harness) -> dict:
+    queue = iter(requests())
+    metadata = harness.token()
+
+    async def worker() -> None:
+        for request in queue:
+            await harness.admin.CreateUser(request, metadata=metadata)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(CREATE_USER_CONCURRENCY)))
+    return {"users_per_min": round(USERS / (time.perf_counter() - started) * 60)}
+
+
+async def bulk(harness: Harness) -> dict:
+    async def stream():
+        for request in requests():
+            yield request
+
+    started = time.perf_counter()
+    response = await harness.admin.BulkCreateUsers(stream(), metadata=harness.token())
+    assert response.created_count == USERS, response.failed_count
+    return {"users_per_min": round(USERS / (time.perf_counter() - started) * 60)}
+
+
+async def run(scenario) -> dict:
+    harness = Harness()
+    harness.cache.latency_s = 0.0005
+    harness.collection.latency_s = 0.001
+    await harness.start()
+    try:
+        result = await scenario(harness)
+    finally:
+        await harness.stop()
+    result["mongo_round_trips"] = harness.collection.round_trips
+    result["redis_round_trips"] = harness.cache.round_trips
+    return result
+
+
+async def main() -> None:
+    silence_logging()
+    print("CreateUser x16:", await run(one_by_one))
+    print("BulkCreateUsers:", await run(bulk))
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,109 @@
+"""Истечение профилей в кэше: фиксированный TTL против джиттера TTL и раннего обновления (XFetch).
+
+burst: 2000 профилей прогреты одним BatchGetUsers и читаются вразнобой; считаем запросы
+в MongoDB по окнам 250 мс - с фиксированным TTL все записи истекают в одну секунду.
+hot key: один профиль читают 50 конкурентных клиентов, запрос в MongoDB медленный (50 мс);
+без раннего обновления в момент истечения все 50 одновременно идут в MongoDB.
+
+Redis - fakeredis с настоящим Lua-скриптом; TTL сокращён до 5 с, чтобы прогон занял секунды.
+
+Запуск из каталога services/user-service:
+    PYTHONPATH=app:../.. python benchmarks/bench_cache_expiry.py
+"""
+import asyncio
+import os
+import random
+import time
+from collections import Counter
+from datetime import datetime
+from uuid import uuid4
+
+os.environ["REDIS_TTL"] = "5"
+
+from fakeredis import FakeAsyncRedis  # noqa: E402
+
+from fakes import FakeCollection, silence_logging  # noqa: E402
+from infrastructure.adapters.outbound.mongo.user_repository import MongoUserRepository  # noqa: E402
+from infrastructure.adapters.outbound.redis.cache_repository import RedisCacheRepository  # noqa: E402
+from shared.domain.models.user import User  # noqa: E402
+
+DURATION_S = 6.5
+BUCKET_S = 0.25
+
+
+class TimedCollection(FakeCollection):
+    """Запоминает время каждого обращения к MongoDB."""
+
+    def __init__(self, latency_s: float):
+        super().__init__(latency_s)
+        self.calls = []
+
+    async def round_trip(self) -> None:
+        self.calls.append(time.perf_counter())
+        await super().round_trip()
+
+
+async def setup(latency_s: float, jitter: float, beta: float, users: int):
+    redis = FakeAsyncRedis()
+    collection = TimedCollection(latency_s)
+    repo = MongoUserRepository(collection, RedisCacheRepository(redis, ttl_jitter=jitter, xfetch_beta=beta))
+    ids = [uuid4() for _ in range(users)]
+    for user_id in ids:
+        doc = repo._user_to_dict(User(id=user_id, name="bench", created_at=datetime.utcnow()))
+        collection.docs[doc["_id"]] = doc
+    return redis, collection, repo, ids
+
+
+async def read_for(repo, ids, workers: int, on_read=None) -> None:
+    deadline = time.perf_counter() + DURATION_S
+
+    async def worker() -> None:
+        while time.perf_counter() < deadline:
+            started = time.perf_counter()
+            await repo.get_by_id(random.choice(ids), "bench")
+            if on_read:
+                on_read(time.perf_counter() - started)
+            await asyncio.sleep(0.005)
+
+    await asyncio.gather(*(worker() for _ in range(workers)))
+
+
+async def burst(label: str, jitter: float, beta: float) -> None:
+    redis, collection, repo, ids = await setup(0.002, jitter, beta, 2000)
+    await repo.get_many(ids, "warm-up")
+    started = time.perf_counter()
+    collection.calls.clear()
+    await read_for(repo, ids, workers=50)
+    buckets = Counter(int((t - started) / BUCKET_S) for t in collection.calls)
+    peak_bucket, peak = max(buckets.items(), key=lambda item: item[1])
+    print(
+        f"burst    {label}: {len(collection.calls)} mongo reads, peak {peak} in one {int(BUCKET_S * 1000)} ms window "
+        f"(at {peak_bucket * BUCKET_S:.2f} s)"
+    )
+    await redis.aclose()
+
+
+async def hot_key(label: str, jitter: float, beta: float) -> None:
+    redis, collection, repo, ids = await setup(0.05, jitter, beta, 1)
+    await repo.get_by_id(ids[0], "warm-up")  # вычисление записано в метаданные: ~50 мс
+    collection.calls.clear()
+    slow_reads = []
+    await read_for(repo, ids, workers=50, on_read=lambda elapsed: slow_reads.append(elapsed) if elapsed > 0.04 else None)
+    await asyncio.sleep(0.1)  # даём завершиться фоновому обновлению
+    print(
+        f"hot key  {label}: {len(collection.calls)} mongo reads, {len(slow_reads)} client reads waited for MongoDB, "
+        f"early refreshes {repo.cache.early_refreshes}"
+    )
+    await redis.aclose()
+
+
+async def main() -> None:
+    silence_logging()
+    await burst("before (fixed TTL)          ", jitter=0.0, beta=0.0)
+    await burst(" after (jitter 0.3 + XFetch)", jitter=0.3, beta=1.0)
+    await hot_key("before (fixed TTL)          ", jitter=0.0, beta=0.0)
+    await hot_key(" after (jitter 0.3 + XFetch)", jitter=0.3, beta=1.0)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,58 @@
+"""CPU-стоимость одного попадания в кэш для GetUser: JSON + pydantic против готовых байт UserResponse.
+
+Запуск из каталога services/user-service:
+    PYTHONPATH=app:../.. python benchmarks/bench_cache_hit_cpu.py
+"""
+import timeit
+from datetime import datetime
+from uuid import uuid4
+
+from fakes import silence_logging
+from protos import ensure_generated
+
+ensure_generated()
+
+from application.dto.user_dto import UserResponseDTO  # noqa: E402
+from infrastructure.adapters.inbound.grpc import user_pb2  # noqa: E402
+from infrastructure.adapters.inbound.grpc.grpc_server import serialize_response  # noqa: E402
+from infrastructure.adapters.inbound.grpc.user_response_codec import UserResponseCacheCodec, is_serialized_user_response  # noqa: E402
+from infrastructure.adapters.outbound.mongo.user_repository import MongoUserRepository  # noqa: E402
+from infrastructure.adapters.outbound.redis.cache_codec import JsonCacheCodec  # noqa: E402
+from shared.domain.models.user import User  # noqa: E402
+
+ITERATIONS = 20000
+
+
+def main() -> None:
+    silence_logging()
+    repo = MongoUserRepository(collection=None, cache=None)
+    user = User(id=uuid4(), name="Benchmark User", created_at=datetime.utcnow(), role="user")
+    cache_value = repo._user_to_cache_dto(user).model_dump(mode="json")
+    json_codec, pb_codec = JsonCacheCodec(), UserResponseCacheCodec()
+    json_bytes, pb_bytes = json_codec.encode(cache_value), pb_codec.encode(cache_value)
+
+    def before() -> bytes:
+        # MongoUserRepository.get_by_id -> AdminService.get_user -> AdminServiceGRPC.GetUser
+        cached_user = repo._cache_to_user(json_codec.decode(json_bytes))
+        dto = UserResponseDTO(id=cached_user.id, name=cached_user.name, created_at=cached_user.created_at, role=cached_user.role)
+        message = user_pb2.UserResponse(id=str(dto.id), name=dto.name, created_at=dto.created_at.isoformat(), role=dto.role)
+        return serialize_response(message)
+
+    def after_fast_path() -> bytes:
+        # AdminServiceGRPC.GetUser: байты из кэша уходят клиенту без декодирования
+        assert is_serialized_user_response(pb_bytes)
+        return serialize_response(pb_bytes)
+
+    def after_repository_path() -> User:
+        # Остальные читатели кэша (update, batch) декодируют protobuf вместо JSON
+        return repo._cache_to_user(pb_codec.decode(pb_bytes))
+
+    assert user_pb2.UserResponse.FromString(before()) == user_pb2.UserResponse.FromString(after_fast_path())
+    print(f"cache entry size: json={len(json_bytes)}B protobuf={len(pb_bytes)}B")
+    for name, fn in (("before (json+pydantic)", before), ("after: grpc fast path", after_fast_path), ("after: repository decode", after_repository_path)):
+        seconds = min(timeit.repeat(fn, number=ITERATIONS, repeat=5))
+        print(f"{name:>26}: {seconds / ITERATIONS * 1e6:8.2f} us/hit")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+"""Удаление пользователей: исходный DeleteUser, новый DeleteUser и пакетный DeleteUsers.
+
+before: AdminService.delete_user в исходном виде - get_by_id (для холодного пользователя
+это Redis GET, find_one и запись в кэш), затем delete_one и cache.delete.
+after: delete_one и очистка кэша параллельно, наличие пользователя - по deleted_count.
+
+Запуск из каталога services/user-service:
+    PYTHONPATH=app:../.. python benchmarks/bench_delete_users.py
+"""
+import asyncio
+import time
+from datetime import datetime
+from uuid import uuid4
+
+from bson.binary import Binary, UUID_SUBTYPE
+
+from fakes import FakeCollection, InMemoryCache, silence_logging
+from application.admin_service_impl import AdminService
+from application.dto.user_dto import UserIdDTO, UserIdsDTO
+from infrastructure.adapters.outbound.mongo.user_repository import MongoUserRepository, user_cache_key
+from shared.domain.models.user import User
+
+USERS = 1000
+
+
+async def legacy_delete(repo: MongoUserRepository, user_id) -> None:
+    # Копия исходных AdminService.delete_user + MongoUserRepository.delete
+    if await repo.get_by_id(user_id, "bench"):
+        await repo.collection.delete_one({"_id": Binary(user_id.bytes, UUID_SUBTYPE)})
+        await repo.cache.delete(user_cache_key(user_id))
+
+
+async def run(label: str, delete) -> None:
+    cache, collection = InMemoryCache(latency_s=0.0005), FakeCollection(latency_s=0.001)
+    repo = MongoUserRepository(collection, cache)
+    ids = [uuid4() for _ in range(USERS)]
+    await repo.create_many([User(id=user_id, name="bench", created_at=datetime.utcnow()) for user_id in ids], "seed")
+    cache.data.clear()  # холодные пользователи: в кэше их нет
+    cache.round_trips = collection.round_trips = 0
+    started = time.perf_counter()
+    await delete(repo, ids)
+    elapsed = time.perf_counter() - started
+    assert not collection.docs and not cache.data
+    print(
+        f"{label}: {elapsed * 1000:7.1f} ms for {USERS} users, "
+        f"redis {cache.round_trips} + mongo {collection.round_trips} round trips"
+    )
+
+
+async def legacy_one_by_one(repo, ids) -> None:
+    for user_id in ids:
+        await legacy_delete(repo, user_id)
+
+
+async def new_one_by_one(repo, ids) -> None:
+    admin = AdminService(repo)
+    for user_id in ids:
+        await admin.delete_user(UserIdDTO(id=user_id), "bench")
+
+
+async def batch(repo, ids) -> None:
+    await AdminService(repo).delete_users(UserIdsDTO(ids=ids), "bench")
+
+
+async def main() -> None:
+    silence_logging()
+    await run("before DeleteUser x N", legacy_one_by_one)
+    await run(" after DeleteUser x N", new_one_by_one)
+    await run("       DeleteUsers    ", batch)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,111 @@
+"""Память и опережающее чтение ListUsers при выдаче большого числа пользователей.
+
+Коллекция синтетическая: документы генерируются по запросу пачками batch_size,
+как их отдавал бы курсор MongoDB через getMore. Пиковая память (tracemalloc)
+не должна зависеть от числа пользователей, а число прочитанных из коллекции, но
+ещё не полученных клиентом документов ограничено пачкой курсора и окном HTTP/2
+клиента. Окно по умолчанию растёт по BDP-оценке до предела gRPC, поэтому у
+медленного клиента опережение больше; с фиксированным окном (bdp_probe=0) оно
+постоянно.
+
+Запуск из каталога services/user-service:
+    PYTHONPATH=app:../.. python benchmarks/bench_list_users.py
+"""
+import asyncio
+import time
+import tracemalloc
+from datetime import datetime
+from uuid import UUID
+
+from bson.binary import Binary, UUID_SUBTYPE
+
+from fakes import silence_logging
+from grpc_harness import Harness
+from infrastructure.adapters.inbound.grpc import user_pb2  # noqa: E402
+from infrastructure.adapters.outbound.mongo.user_repository import MongoUserRepository  # noqa: E402
+
+BATCH_SIZE = 500
+GET_MORE_LATENCY_S = 0.002
+CREATED_AT = datetime(2024, 1, 1)
+
+
+class SyntheticCursor:
+    def __init__(self, collection: "SyntheticUsersCollection", start: int, batch_size: int, limit: int):
+        self.collection = collection
+        self.next_id = start
+        self.end = min(collection.total, start + limit) if limit else collection.total
+        self.batch_size = batch_size
+        self.buffer = []
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self) -> dict:
+        if not self.buffer:
+            if self.next_id >= self.end:
+                raise StopAsyncIteration
+            await asyncio.sleep(GET_MORE_LATENCY_S)
+            stop = min(self.end, self.next_id + self.batch_size)
+            self.buffer = [
+                {"_id": Binary(UUID(int=i).bytes, UUID_SUBTYPE), "name": f"user-{i}", "created_at": CREATED_AT, "role": "user"}
+                for i in range(stop - 1, self.next_id - 1, -1)
+            ]
+            self.collection.fetched += stop - self.next_id
+            self.next_id = stop
+        return self.buffer.pop()
+
+    async def close(self) -> None:
+        self.buffer = []
+
+
+class SyntheticUsersCollection:
+    """Пользователи с _id = UUID(int=0..total-1); поддерживается только keyset по _id."""
+
+    def __init__(self, total: int):
+        self.total = total
+        self.fetched = 0
+
+    def find(self, query: dict, sort=None, batch_size: int = 0, limit: int = 0) -> SyntheticCursor:
+        after = query.get("_id", {}).get("$gt")
+        start = UUID(bytes=bytes(after)).int + 1 if after is not None else 0
+        return SyntheticCursor(self, start, batch_size or 101, limit)
+
+
+async def stream(total: int, consumer_delay_s: float = 0.0, channel_options: list = None) -> dict:
+    harness = Harness()
+    collection = SyntheticUsersCollection(total)
+    harness.repo = MongoUserRepository(collection, harness.cache)
+    await harness.start(channel_options=channel_options)
+    received = 0
+    read_ahead = 0
+    tracemalloc.start()
+    started = time.perf_counter()
+    call = harness.admin.ListUsers(user_pb2.ListUsersRequest(batch_size=BATCH_SIZE), metadata=harness.token())
+    async for _ in call:
+        received += 1
+        read_ahead = max(read_ahead, collection.fetched - received)
+        if consumer_delay_s and received % 100 == 0:
+            await asyncio.sleep(consumer_delay_s)
+    elapsed = time.perf_counter() - started
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    await harness.stop()
+    assert received == total
+    return {
+        "users": total,
+        "users_per_s": round(total / elapsed),
+        "peak_traced_mb": round(peak / 2**20, 1),
+        "max_read_ahead": read_ahead,
+    }
+
+
+async def main() -> None:
+    silence_logging()
+    for total in (20000, 100000):
+        print("fast client:", await stream(total))
+    print("slow client:", await stream(20000, consumer_delay_s=0.1))
+    print("slow client, fixed window:", await stream(20000, consumer_delay_s=0.1, channel_options=[("grpc.http2.bdp_probe", 0)]))
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,81 @@
+"""Задержка GetUser при перегрузке: без лимита конкурентности и с адаптивным лимитом.
+
+Redis имитируется с ограниченной пропускной способностью (CAPACITY одновременных
+операций по LATENCY_S), клиенты в замкнутом цикле создают нагрузку выше неё. Без
+лимита очередь копится внутри сервиса и растёт задержка каждого запроса; с лимитом
+лишние запросы сразу получают RESOURCE_EXHAUSTED, а принятые обслуживаются быстро.
+
+Запуск из каталога services/user-service:
+    PYTHONPATH=app:../.. python benchmarks/bench_load_shedding.py
+"""
+import asyncio
+import time
+
+import grpc
+
+from fakes import InMemoryCache, percentile, silence_logging
+from grpc_harness import Harness
+from infrastructure.adapters.inbound.grpc import user_pb2  # noqa: E402
+from config import settings  # noqa: E402
+from shared.serving.concurrency_limiter import CONCURRENCY_LIMIT  # noqa: E402
+
+CAPACITY = 8
+LATENCY_S = 0.01
+CLIENTS = 200
+DURATION_S = 10.0
+SHED_BACKOFF_S = 0.05
+
+
+class SaturatedCache(InMemoryCache):
+    def __init__(self):
+        super().__init__(latency_s=LATENCY_S)
+        self.slots = asyncio.Semaphore(CAPACITY)
+
+    async def round_trip(self) -> None:
+        async with self.slots:
+            await super().round_trip()
+
+
+async def run_scenario(limit_enabled: bool) -> dict:
+    settings.concurrency_limit_enabled = limit_enabled
+    harness = Harness(cache=SaturatedCache())
+    await harness.start()
+    user = await harness.create_user()
+    metadata = harness.token()
+    request = user_pb2.GetUserRequest(id=str(user.id))
+    latencies = []
+    shed = 0
+    deadline = time.perf_counter() + DURATION_S
+
+    async def client() -> None:
+        nonlocal shed
+        while time.perf_counter() < deadline:
+            started = time.perf_counter()
+            try:
+                await harness.admin.GetUser(request, metadata=metadata)
+                latencies.append((time.perf_counter() - started) * 1000)
+            except grpc.aio.AioRpcError as e:
+                if e.code() != grpc.StatusCode.RESOURCE_EXHAUSTED:
+                    raise
+                shed += 1
+                await asyncio.sleep(SHED_BACKOFF_S)
+
+    await asyncio.gather(*(client() for _ in range(CLIENTS)))
+    await harness.stop()
+    return {
+        "ok_per_s": round(len(latencies) / DURATION_S),
+        "shed": shed,
+        "p50_ms": round(percentile(latencies, 0.50), 1),
+        "p99_ms": round(percentile(latencies, 0.99), 1),
+        "limit": CONCURRENCY_LIMIT.labels("default").get() if limit_enabled else None,
+    }
+
+
+async def main() -> None:
+    silence_logging()
+    print("without limit:", await run_scenario(False))
+    print("adaptive limit:", await run_scenario(True))
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,95 @@
+"""Пропускная способность GetUser при разных режимах логирования.
+
+Каждый режим запускается в отдельном процессе: structlog фиксирует конфигурацию
+в логгерах, привязанных через bind() при создании сервисов.
+Запуск из каталога services/user-service:
+    PYTHONPATH=app:../.. python benchmarks/bench_logging.py
+"""
+import asyncio
+import logging
+import os
+import subprocess
+import sys
+import time
+
+import structlog
+
+# Задержка записи в stdout: имитирует заблокированный pipe к драйверу логов Docker
+STDOUT_WRITE_LATENCY_S = 0.0001
+
+MODES = {
+    "legacy": "legacy: sync JSONRenderer, all INFO",
+    "queue": "queue + orjson, all INFO",
+    "sampled": "queue + orjson, timing sampled 1%",
+    "off": "logging off (WARNING, gated)",
+}
+
+
+class SlowStream:
+    def __init__(self):
+        self.target = open(os.devnull, "w")
+
+    def write(self, data: str) -> int:
+        time.sleep(STDOUT_WRITE_LATENCY_S)
+        return self.target.write(data)
+
+    def flush(self) -> None:
+        self.target.flush()
+
+
+def configure_legacy(stream) -> None:
+    """Прежняя конфигурация из main.py: синхронный JSONRenderer в event loop."""
+    logging.basicConfig(level=logging.INFO, format="%(message)s", stream=stream)
+    structlog.configure(
+        processors=[
+            structlog.processors.TimeStamper(fmt="iso"),
+            structlog.stdlib.add_log_level,
+            structlog.stdlib.add_logger_name,
+            structlog.stdlib.PositionalArgumentsFormatter(),
+            structlog.processors.JSONRenderer(ensure_ascii=False),
+        ],
+        context_class=dict,
+        logger_factory=structlog.stdlib.LoggerFactory(),
+        wrapper_class=structlog.stdlib.BoundLogger,
+        cache_logger_on_first_use=True,
+    )
+
+
+async def run_mode(mode: str) -> None:
+    from application.utils.logging_config import configure_logging, stop_logging
+
+    stream = SlowStream()
+    if mode == "legacy":
+        configure_legacy(stream)
+    elif mode == "queue":
+        configure_logging(level="INFO", stream=stream)
+    elif mode == "sampled":
+        configure_logging(level="INFO", timing_sample_rate=0.01, stream=stream)
+    else:
+        configure_logging(level="WARNING", stream=stream)
+
+    from grpc_harness import Harness, measure_throughput, user_pb2
+
+    harness = Harness()
+    await harness.start()
+    user = await harness.create_user()
+    metadata = harness.token()
+    try:
+        request = user_pb2.GetUserRequest(id=str(user.id))
+        rps = await measure_throughput(lambda: harness.admin.GetUser(request, metadata=metadata))
+        print(f"{MODES[mode]:>40}: {rps:8.0f} rps", flush=True)
+    finally:
+        await harness.stop()
+        stop_logging()
+
+
+def main() -> None:
+    if len(sys.argv) > 1:
+        asyncio.run(run_mode(sys.argv[1]))
+        return
+    for mode in MODES:
+        subprocess.run([sys.executable, __file__, mode], check=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+"""Повторные запросы несуществующих и удалённых пользователей: без кэша промахов и с ним.
+
+before: get_by_id в исходном виде - кэшируются только найденные пользователи, каждый
+запрос неизвестного ID идёт в MongoDB.
+after: промах запоминается отрицательной записью на CACHE_NEGATIVE_TTL, удаление оставляет
+tombstone; create заменяет отрицательную запись сразу, не дожидаясь её истечения.
+
+Клиенты в цикле запрашивают 10 несуществующих ID и 10 удалённых пользователей (устаревшие JWT).
+Redis - fakeredis с настоящими скриптами.
+
+Запуск из каталога services/user-service:
+    PYTHONPATH=app:../.. python benchmarks/bench_negative_cache.py
+"""
+import asyncio
+import time
+from datetime import datetime
+from uuid import uuid4
+
+from bson.binary import Binary, UUID_SUBTYPE
+from fakeredis import FakeAsyncRedis
+
+from fakes import FakeCollection, percentile, silence_logging
+from config import settings
+from infrastructure.adapters.outbound.mongo.user_repository import MongoUserRepository, VERSION_FIELD, user_cache_key
+from infrastructure.adapters.outbound.redis.cache_repository import RedisCacheRepository
+from shared.domain.models.user import User
+
+LOOKUPS = 2000
+
+
+async def legacy_get_by_id(repo: MongoUserRepository, user_id):
+    # Копия исходного MongoUserRepository.get_by_id: промахи не кэшируются
+    cache_key = user_cache_key(user_id)
+    cached = await repo.cache.get(cache_key)
+    if cached:
+        return repo._cache_to_user(cached)
+    data = await repo.collection.find_one({"_id": Binary(user_id.bytes, UUID_SUBTYPE)})
+    if data:
+        user = repo._dict_to_user(data)
+        cache_data, version = repo._versioned_cache_item(user, data.get(VERSION_FIELD, 0))
+        await repo.cache.set_versioned(cache_key, cache_data, version, settings.redis_ttl)
+        return user
+    return None
+
+
+async def new_get_by_id(repo: MongoUserRepository, user_id):
+    return await repo.get_by_id(user_id, "bench")
+
+
+async def run(label: str, get_by_id) -> None:
+    redis = FakeAsyncRedis()
+    cache, collection = RedisCacheRepository(redis), FakeCollection(latency_s=0.001)
+    repo = MongoUserRepository(collection, cache)
+    deleted = [User(id=uuid4(), name="bench", created_at=datetime.utcnow()) for _ in range(10)]
+    await repo.create_many(deleted, "seed")
+    await repo.delete_many([user.id for user in deleted], "seed")
+    ids = [uuid4() for _ in range(10)] + [user.id for user in deleted]
+    collection.round_trips = 0
+    samples = []
+    for i in range(LOOKUPS):
+        started = time.perf_counter()
+        assert await get_by_id(repo, ids[i % len(ids)]) is None
+        samples.append(time.perf_counter() - started)
+    print(
+        f"{label}: p50 {percentile(samples, 0.5) * 1000:5.2f} ms, {collection.round_trips} mongo reads for {LOOKUPS} lookups, "
+        f"cache {cache.stats()}"
+    )
+    # Пользователь, закэшированный как отсутствующий, виден сразу после создания
+    user = User(id=ids[0], name="created", created_at=datetime.utcnow())
+    await repo.create(user, "bench")
+    assert (await get_by_id(repo, user.id)).name == "created"
+    await redis.aclose()
+
+
+async def main() -> None:
+    silence_logging()
+    await run("before", legacy_get_by_id)
+    await run(" after", new_get_by_id)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
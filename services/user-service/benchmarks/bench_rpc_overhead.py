@@ -0,0 +1,196 @@
+"""Накладные расходы конвейера обработки одного RPC без сетевого стека gRPC.
+
+before: исходная цепочка декораторов (log_execution_time, handle_grpc_exceptions,
+admin_auth_middleware) и поиск AdminService в dishka-контейнере на каждый вызов.
+after: интерсепторы RequestContextInterceptor + AuthInterceptor и сервис,
+разрешённый при создании сервисера. В обоих вариантах используется один и тот же
+TokenVerifier с кэшем, так что разница - только в самом конвейере.
+
+Запуск из каталога services/user-service:
+    PYTHONPATH=app:../.. python benchmarks/bench_rpc_overhead.py
+"""
+import asyncio
+import time
+from collections import namedtuple
+from functools import wraps
+
+import grpc
+import jwt
+from dishka import Provider, Scope, make_async_container, provide
+
+from fakes import silence_logging
+from protos import ensure_generated
+
+ensure_generated()
+
+from config import settings  # noqa: E402
+from application.utils.grpc_utils import map_exception  # noqa: E402
+from application.utils.logging_utils import current_request_id, generate_request_id, log_execution_time  # noqa: E402
+from application.utils.ttl_lru_cache import TtlLruCache  # noqa: E402
+from domain.exceptions import AuthenticationError  # noqa: E402
+from infrastructure.adapters.inbound.grpc import user_pb2  # noqa: E402
+from infrastructure.adapters.inbound.grpc.grpc_server import build_interceptors  # noqa: E402
+from infrastructure.adapters.inbound.grpc.token_verifier import TokenVerifier  # noqa: E402
+from shared.metrics.instruments import record_server_rpc  # noqa: E402
+from structlog import get_logger  # noqa: E402
+
+ITERATIONS = 20000
+METHOD = "/user.AdminService/GetUser"
+HandlerCallDetails = namedtuple("HandlerCallDetails", ("method", "invocation_metadata"))
+RESPONSE = user_pb2.UserResponse(id="00000000-0000-0000-0000-000000000001", name="bench", created_at="2024-01-01T00:00:00", role="user")
+
+
+class AdminServiceStub:
+    async def get_user(self, request_id: str):
+        return RESPONSE
+
+
+class FakeContext:
+    def __init__(self, metadata):
+        self.metadata = metadata
+
+    def invocation_metadata(self):
+        return self.metadata
+
+    def set_code(self, code):
+        pass
+
+    def set_details(self, details):
+        pass
+
+    def code(self):
+        return None
+
+
+def legacy_handle_grpc_exceptions(func):
+    # Копия исходного handle_grpc_exceptions, включая запись метрик
+    @wraps(func)
+    async def wrapper(self, request, context, *args, **kwargs):
+        request_id = kwargs.get('request_id', generate_request_id())
+        logger_with_request = self.logger.bind(request_id=request_id)
+        start_time = time.perf_counter()
+        code = grpc.StatusCode.OK
+        try:
+            return await func(self, request, context, request_id=request_id)
+        except Exception as e:
+            code, _, message = map_exception(e)
+            logger_with_request.error(f"{message} в {func.__name__}", error=str(e))
+            context.set_code(code)
+            context.set_details(str(e))
+            raise
+        finally:
+            record_server_rpc("user.AdminService", func.__name__, code, time.perf_counter() - start_time)
+    return wrapper
+
+
+def legacy_admin_auth_middleware(func):
+    # Копия admin_auth_middleware после перехода на TokenVerifier
+    @wraps(func)
+    async def wrapper(self, request, context, request_id: str):
+        logger = self.logger.bind(request_id=request_id)
+        token = None
+        for key, value in context.invocation_metadata():
+            if key == 'authorization':
+                token = value
+        if not token:
+            logger.error("No authorization token provided")
+            raise AuthenticationError("Authorization token required")
+        verifier = await self.container.get(TokenVerifier)
+        payload = await verifier.verify(token.replace("Bearer ", ""))
+        if payload.get('role') != 'admin':
+            raise AuthenticationError("Admin access required")
+        return await func(self, request, context, request_id)
+    return wrapper
+
+
+class LegacyServicer:
+    def __init__(self, container):
+        self.container = container
+        self.logger = get_logger("bench").bind(service="AdminServiceGRPC")
+
+    @log_execution_time
+    @legacy_handle_grpc_exceptions
+    @legacy_admin_auth_middleware
+    async def GetUser(self, request, context, request_id: str):
+        logger = self.logger.bind(request_id=request_id)
+        admin_service = await self.container.get(AdminServiceStub)
+        return await admin_service.get_user(request_id)
+
+
+class Servicer:
+    def __init__(self, admin_service: AdminServiceStub):
+        self.admin_service = admin_service
+        self.logger = get_logger("bench").bind(service="AdminServiceGRPC")
+
+    async def GetUser(self, request, context):
+        request_id = current_request_id()
+        logger = self.logger.bind(request_id=request_id)
+        return await self.admin_service.get_user(request_id)
+
+
+def make_container(verifier: TokenVerifier):
+    class BenchProvider(Provider):
+        @provide(scope=Scope.APP)
+        async def get_admin_service(self) -> AdminServiceStub:
+            return AdminServiceStub()
+
+        @provide(scope=Scope.APP)
+        async def get_token_verifier(self) -> TokenVerifier:
+            return verifier
+
+    return make_async_container(BenchProvider())
+
+
+def build_chain(interceptors, handler):
+    """Повторяет то, как grpc.aio вызывает интерсепторы на каждый RPC."""
+    async def final(details):
+        return handler
+
+    def step(index):
+        if index == len(interceptors):
+            return final
+
+        async def continuation(details):
+            return await interceptors[index].intercept_service(step(index + 1), details)
+        return continuation
+    return step(0)
+
+
+async def measure(fn) -> float:
+    for _ in range(1000):
+        await fn()
+    started = time.perf_counter()
+    for _ in range(ITERATIONS):
+        await fn()
+    return (time.perf_counter() - started) / ITERATIONS * 1e6
+
+
+async def main() -> None:
+    silence_logging()
+    token = jwt.encode({"role": "admin", "exp": int(time.time()) + 3600}, settings.jwt_secret_key, algorithm="HS256")
+    metadata = (("user-agent", "grpc-python/1.66"), ("authorization", f"Bearer {token}"))
+    context = FakeContext(metadata)
+    request = user_pb2.GetUserRequest(id=str(RESPONSE.id))
+    verifier = TokenVerifier(settings.jwt_secret_key, ["HS256"], cache=TtlLruCache(max_size=10000, ttl=0))
+
+    container = make_container(verifier)
+    legacy = LegacyServicer(container)
+
+    servicer = Servicer(AdminServiceStub())
+    handler = grpc.unary_unary_rpc_method_handler(servicer.GetUser)
+    chain = build_chain(build_interceptors(verifier), handler)
+    details = HandlerCallDetails(METHOD, metadata)
+
+    async def after():
+        wrapped = await chain(details)
+        return await wrapped.unary_unary(request, context)
+
+    before_us = await measure(lambda: legacy.GetUser(request, context))
+    after_us = await measure(after)
+    print(f"before (decorators + container.get): {before_us:7.2f} us/RPC")
+    print(f" after (interceptors, pre-resolved): {after_us:7.2f} us/RPC")
+    await container.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
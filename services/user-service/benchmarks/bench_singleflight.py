@@ -0,0 +1,44 @@
+"""Stampede на один горячий профиль после истечения ключа в кэше: с singleflight и без.
+
+Запуск из каталога services/user-service:
+    PYTHONPATH=app:../.. python benchmarks/bench_singleflight.py
+"""
+import asyncio
+import time
+from datetime import datetime
+from uuid import uuid4
+
+from fakes import FakeCollection, InMemoryCache, silence_logging
+from application.utils.singleflight import SingleFlight
+from infrastructure.adapters.outbound.coalescing.coalescing_repository import CoalescingUserRepository
+from infrastructure.adapters.outbound.mongo.user_repository import MongoUserRepository
+from shared.domain.models.user import User
+
+CONCURRENCY = 500
+
+
+async def run(coalesce: bool) -> None:
+    cache, collection = InMemoryCache(), FakeCollection(latency_s=0.005)
+    repo = MongoUserRepository(collection, cache)
+    singleflight = SingleFlight()
+    if coalesce:
+        repo = CoalescingUserRepository(repo, singleflight)
+    user = User(id=uuid4(), name="hot", created_at=datetime.utcnow())
+    await repo.create(user, request_id="seed")
+    cache.data.clear()
+    collection.round_trips = 0
+    started = time.perf_counter()
+    results = await asyncio.gather(*(repo.get_by_id(user.id, request_id="bench") for _ in range(CONCURRENCY)))
+    elapsed_ms = (time.perf_counter() - started) * 1000
+    assert all(result.id == user.id for result in results)
+    print(f"singleflight={coalesce!s:>5}: {elapsed_ms:7.1f} ms, mongo find_one={collection.round_trips}, stats={singleflight.stats()}")
+
+
+async def main() -> None:
+    silence_logging()
+    await run(False)
+    await run(True)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,52 @@
+"""Пропускная способность NDJSON-экспорта и импорта users в одном процессе.
+
+MongoDB заменена синтетическим курсором (экспорт) и коллекцией, отбрасывающей
+вставки (импорт), поэтому результат - потолок CPU на преобразование документов,
+сериализацию и gzip; с --workers N он умножается примерно на N.
+
+Запуск из каталога services/user-service:
+    PYTHONPATH=app:../.. python benchmarks/bench_transfer.py
+"""
+import asyncio
+import tempfile
+import time
+from pathlib import Path
+from typing import List
+
+from bench_list_users import SyntheticUsersCollection
+from fakes import silence_logging
+from shared.datatransfer.ndjson_transfer import export_partition, import_file
+from transfer_cli import normalize
+
+USERS = 200000
+
+
+class DiscardingCollection:
+    def __init__(self):
+        self.inserted = 0
+
+    async def insert_many(self, documents: List[dict], ordered: bool = True) -> None:
+        self.inserted += len(documents)
+
+
+async def main() -> None:
+    silence_logging()
+    with tempfile.TemporaryDirectory() as directory:
+        for compress in (False, True):
+            path = Path(directory) / ("part-00000.ndjson.gz" if compress else "part-00000.ndjson")
+            started = time.perf_counter()
+            state = await export_partition(SyntheticUsersCollection(USERS), normalize, path, (None, None), 1000, 10000, compress, 6)
+            exported = time.perf_counter() - started
+            collection = DiscardingCollection()
+            started = time.perf_counter()
+            await import_file(collection, normalize, path, Path(directory) / f"{path.name}.import", 1000)
+            imported = time.perf_counter() - started
+            assert state.count == collection.inserted == USERS
+            print(
+                f"{'gzip' if compress else 'plain'}: export {USERS / exported:,.0f} docs/s, "
+                f"import {USERS / imported:,.0f} docs/s, file {path.stat().st_size / 2**20:.1f} MiB"
+            )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
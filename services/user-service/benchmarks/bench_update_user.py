@@ -0,0 +1,89 @@
+"""Обновление имени пользователя: число обращений к хранилищам и устаревшие значения в кэше.
+
+before: исходный путь - get_by_id, replace_one всего документа, cache.delete, cache.set.
+after: update_fields - find_one_and_update с $set и $inc версии, затем одна запись
+в кэш скриптом, который отклоняет версии старше сохранённой.
+
+Вторая часть прогоняет гонку двух обновлений на fakeredis с настоящим Lua-скриптом:
+запись кэша от первого обновления приходит последней.
+
+Запуск из каталога services/user-service:
+    PYTHONPATH=app:../.. python benchmarks/bench_update_user.py
+"""
+import asyncio
+import time
+from datetime import datetime
+from uuid import uuid4
+
+from bson.binary import Binary, UUID_SUBTYPE
+from fakeredis import FakeAsyncRedis
+
+from fakes import FakeCollection, InMemoryCache, percentile, silence_logging
+from config import settings
+from infrastructure.adapters.outbound.mongo.user_repository import MongoUserRepository, user_cache_key
+from infrastructure.adapters.outbound.redis.cache_repository import RedisCacheRepository
+from shared.domain.models.user import User
+
+UPDATES = 500
+
+
+async def legacy_update(repo: MongoUserRepository, user_id, name: str) -> None:
+    # Копия исходных UserService.update_my_name + MongoUserRepository.update
+    user = await repo.get_by_id(user_id, "bench")
+    user.set_name(name)
+    await repo.collection.replace_one({"_id": Binary(user.id.bytes, UUID_SUBTYPE)}, repo._user_to_dict(user))
+    await repo.cache.delete(user_cache_key(user.id))
+    await repo.cache.set(user_cache_key(user.id), repo._user_to_cache_dto(user).model_dump(mode="json"), settings.redis_ttl)
+
+
+async def new_update(repo: MongoUserRepository, user_id, name: str) -> None:
+    await repo.update_fields(user_id, {"name": name}, "bench")
+
+
+async def measure(label: str, update, cold: bool) -> None:
+    cache, collection = InMemoryCache(latency_s=0.0005), FakeCollection(latency_s=0.001)
+    repo = MongoUserRepository(collection, cache)
+    user = User(id=uuid4(), name="bench", created_at=datetime.utcnow())
+    await repo.create(user, "seed")
+    cache.round_trips = collection.round_trips = 0
+    samples = []
+    for i in range(UPDATES):
+        if cold:
+            cache.data.clear()
+        started = time.perf_counter()
+        await update(repo, user.id, f"name-{i}")
+        samples.append(time.perf_counter() - started)
+    print(
+        f"{label} ({'cache miss' if cold else 'cache hit '}): p50 {percentile(samples, 0.5) * 1000:5.2f} ms, "
+        f"redis {cache.round_trips / UPDATES:.1f} + mongo {collection.round_trips / UPDATES:.1f} round trips/update"
+    )
+
+
+async def race(versioned: bool) -> str:
+    redis = FakeAsyncRedis()
+    cache = RedisCacheRepository(redis)
+    key = user_cache_key(uuid4())
+    first = {"id": key, "name": "first", "created_at": "2024-01-01T00:00:00", "role": "user"}
+    second = dict(first, name="second")
+    # MongoDB применил first (версия 2), затем second (версия 3); в Redis записи пришли в обратном порядке
+    if versioned:
+        await cache.set_versioned(key, second, 3, 60)
+        await cache.set_versioned(key, first, 2, 60)
+    else:
+        await cache.set(key, second, 60)
+        await cache.set(key, first, 60)
+    cached = await cache.get(key)
+    await redis.aclose()
+    return cached["name"]
+
+
+async def main() -> None:
+    silence_logging()
+    for cold in (False, True):
+        await measure("before", legacy_update, cold)
+        await measure(" after", new_update, cold)
+    print(f"reordered cache writes: before -> cached {await race(False)!r}, after -> cached {await race(True)!r} (MongoDB has 'second')")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,186 @@
+"""In-memory замены Redis и MongoDB для бенчмарков user-service с имитацией сетевой задержки."""
+import asyncio
+import json
+import logging
+import os
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+import structlog
+from pymongo.errors import BulkWriteError
+from pymongo.results import DeleteResult
+
+os.environ.setdefault("MONGO_URI", "mongodb://localhost:27017")
+os.environ.setdefault("JWT_SECRET_KEY", "benchmark-secret-key-with-at-least-32-characters")
+
+from domain.ports.outbound.cache_port import CachePort, NEGATIVE_ENTRY  # noqa: E402
+
+
+def silence_logging() -> None:
+    structlog.configure(wrapper_class=structlog.make_filtering_bound_logger(logging.CRITICAL))
+
+
+def percentile(samples, q: float) -> float:
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * q))]
+
+
+class RoundTripCounter:
+    def __init__(self, latency_s: float):
+        self.latency_s = latency_s
+        self.round_trips = 0
+
+    async def round_trip(self) -> None:
+        self.round_trips += 1
+        await asyncio.sleep(self.latency_s)
+
+
+class InMemoryCache(CachePort, RoundTripCounter):
+    def __init__(self, latency_s: float = 0.0005):
+        RoundTripCounter.__init__(self, latency_s)
+        self.data: Dict[str, Any] = {}
+        self.versions: Dict[str, int] = {}
+        # Ключи с отрицательной записью или tombstone
+        self.negative: Set[str] = set()
+
+    def _lookup(self, key: str) -> Optional[Any]:
+        value = self.data.get(key)
+        if value is None and key in self.negative:
+            return NEGATIVE_ENTRY
+        return value
+
+    async def get(self, key: str) -> Optional[Any]:
+        await self.round_trip()
+        return self._lookup(key)
+
+    async def get_encoded(self, key: str) -> Optional[bytes]:
+        await self.round_trip()
+        value = self._lookup(key)
+        return json.dumps(value).encode() if value else value
+
+    async def get_many(self, keys: List[str]) -> List[Optional[Any]]:
+        await self.round_trip()
+        return [self._lookup(key) for key in keys]
+
+    async def set(self, key: str, value: Any, ttl: int) -> None:
+        await self.round_trip()
+        self.data[key] = value
+
+    async def set_many(self, items: Dict[str, Any], ttl: int) -> None:
+        if items:
+            await self.round_trip()
+            self.data.update(items)
+
+    async def set_versioned(
+        self, key: str, value: Any, version: int, ttl: int, compute_time: float = 0.0, replace_negative: bool = False
+    ) -> bool:
+        accepted = await self.set_many_versioned({key: (value, version)}, ttl, compute_time, replace_negative)
+        return accepted[key]
+
+    async def set_many_versioned(
+        self, items: Dict[str, Tuple[Any, int]], ttl: int, compute_time: float = 0.0, replace_negative: bool = False
+    ) -> Dict[str, bool]:
+        if not items:
+            return {}
+        await self.round_trip()
+        accepted = {}
+        for key, (value, version) in items.items():
+            if replace_negative and key in self.negative:
+                self.versions.pop(key, None)
+            accepted[key] = self.versions.get(key, version) <= version
+            if accepted[key]:
+                self.data[key] = value
+                self.versions[key] = version
+                self.negative.discard(key)
+        return accepted
+
+    async def set_negative_many(self, keys: List[str], ttl: int) -> None:
+        if keys:
+            await self.round_trip()
+            for key in keys:
+                if key not in self.versions:
+                    self.versions[key] = 0
+                    self.negative.add(key)
+
+    def register_refresher(self, prefix: str, loader, ttl: int) -> None:
+        pass
+
+    async def purge_many(self, keys: List[str], ttl: int) -> None:
+        if keys:
+            await self.round_trip()
+            for key in keys:
+                self.data.pop(key, None)
+                self.versions[key] = 2 ** 53
+                self.negative.add(key)
+
+    async def delete(self, key: str) -> None:
+        await self.round_trip()
+        self.data.pop(key, None)
+
+
+class FakeCursor:
+    def __init__(self, docs: List[dict]):
+        self.docs = docs
+
+    async def to_list(self, length: Optional[int] = None) -> List[dict]:
+        return list(self.docs)
+
+
+class FakeCollection(RoundTripCounter):
+    """Минимальное подмножество AsyncCollection: запросы по _id и $in."""
+
+    def __init__(self, latency_s: float = 0.001):
+        super().__init__(latency_s)
+        self.docs: Dict[Any, dict] = {}
+
+    def _match(self, query: dict) -> List[dict]:
+        _id = query.get("_id")
+        if isinstance(_id, dict) and "$in" in _id:
+            return [self.docs[i] for i in _id["$in"] if i in self.docs]
+        return [self.docs[_id]] if _id in self.docs else []
+
+    async def insert_one(self, doc: dict) -> None:
+        await self.round_trip()
+        self.docs[doc["_id"]] = dict(doc)
+
+    async def insert_many(self, docs: List[dict], ordered: bool = True) -> None:
+        await self.round_trip()
+        errors = []
+        for index, doc in enumerate(docs):
+            if doc["_id"] in self.docs:
+                errors.append({"index": index, "code": 11000, "errmsg": "E11000 duplicate key error"})
+            else:
+                self.docs[doc["_id"]] = dict(doc)
+        if errors:
+            raise BulkWriteError({"writeErrors": errors})
+
+    async def find_one(self, query: dict) -> Optional[dict]:
+        await self.round_trip()
+        matched = self._match(query)
+        return dict(matched[0]) if matched else None
+
+    def find(self, query: dict) -> FakeCursor:
+        self.round_trips += 1
+        return FakeCursor([dict(doc) for doc in self._match(query)])
+
+    async def replace_one(self, query: dict, doc: dict) -> None:
+        await self.round_trip()
+        self.docs[query["_id"]] = dict(doc)
+
+    async def find_one_and_update(self, query: dict, update: dict, return_document: bool = False) -> Optional[dict]:
+        await self.round_trip()
+        doc = self.docs.get(query["_id"])
+        if doc is None:
+            return None
+        before = dict(doc)
+        doc.update(update.get("$set", {}))
+        for field, delta in update.get("$inc", {}).items():
+            doc[field] = doc.get(field, 0) + delta
+        return dict(doc) if return_document else before
+
+    async def delete_one(self, query: dict) -> DeleteResult:
+        await self.round_trip()
+        return DeleteResult({"n": int(self.docs.pop(query["_id"], None) is not None)}, acknowledged=True)
+
+    async def delete_many(self, query: dict) -> DeleteResult:
+        await self.round_trip()
+        return DeleteResult({"n": sum(self.docs.pop(_id, None) is not None for _id in query["_id"]["$in"])}, acknowledged=True)
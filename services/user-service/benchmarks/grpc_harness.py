@@ -0,0 +1,77 @@
+"""In-process gRPC-сервер user-service поверх фейков Redis/MongoDB для бенчмарков уровня RPC."""
+import asyncio
+import time
+from datetime import datetime
+from typing import Awaitable, Callable
+from uuid import uuid4
+
+import grpc
+import jwt
+
+from fakes import FakeCollection, InMemoryCache
+from protos import ensure_generated
+
+ensure_generated()
+
+from config import settings  # noqa: E402
+from application.admin_service_impl import AdminService  # noqa: E402
+from application.user_service_impl import UserService  # noqa: E402
+from domain.ports.outbound.cache_port import CachePort  # noqa: E402
+from infrastructure.adapters.inbound.grpc import user_pb2, user_pb2_grpc  # noqa: E402
+from application.utils.ttl_lru_cache import TtlLruCache  # noqa: E402
+from infrastructure.adapters.inbound.grpc.grpc_server import AdminServiceGRPC, UserServiceGRPC, add_servicer_to_server, build_interceptors  # noqa: E402
+from infrastructure.adapters.inbound.grpc.token_verifier import TokenVerifier  # noqa: E402
+from infrastructure.adapters.outbound.mongo.user_repository import MongoUserRepository  # noqa: E402
+from shared.domain.models.user import User  # noqa: E402
+
+
+class Harness:
+    def __init__(self, cache: CachePort = None):
+        self.cache = cache or InMemoryCache(latency_s=0)
+        self.collection = FakeCollection(latency_s=0)
+        self.repo = MongoUserRepository(self.collection, self.cache)
+        self.token_verifier = TokenVerifier(settings.jwt_secret_key, ["HS256"], cache=TtlLruCache(max_size=10000, ttl=0))
+        self.server = None
+        self.channel = None
+
+    def token(self, user: User = None, role: str = "admin") -> list:
+        payload = {"role": role, "exp": int(time.time()) + 3600}
+        if user is not None:
+            payload["user_id"] = str(user.id)
+        return [("authorization", "Bearer " + jwt.encode(payload, settings.jwt_secret_key, algorithm="HS256"))]
+
+    async def start(self, server: grpc.aio.Server = None, channel_options: list = None) -> None:
+        self.server = server or grpc.aio.server(interceptors=build_interceptors(self.token_verifier))
+        # InMemoryCache отдаёт записи в JSON, готовых байтов UserResponse в нём нет
+        add_servicer_to_server(AdminServiceGRPC(AdminService(self.repo), serve_encoded=False), self.server, "AdminService")
+        add_servicer_to_server(UserServiceGRPC(UserService(self.repo), serve_encoded=False), self.server, "UserService")
+        port = self.server.add_insecure_port("127.0.0.1:0")
+        await self.server.start()
+        self.channel = grpc.aio.insecure_channel(f"127.0.0.1:{port}", options=channel_options)
+        self.admin = user_pb2_grpc.AdminServiceStub(self.channel)
+        self.users = user_pb2_grpc.UserServiceStub(self.channel)
+
+    async def stop(self) -> None:
+        await self.channel.close()
+        await self.server.stop(0)
+
+    async def create_user(self, name: str = "bench") -> User:
+        user = User(id=uuid4(), name=name, created_at=datetime.utcnow())
+        await self.repo.create(user, request_id="seed")
+        return user
+
+
+async def measure_throughput(call: Callable[[], Awaitable], duration_s: float = 3.0, concurrency: int = 16) -> float:
+    """Запросов в секунду при заданной конкурентности."""
+    done = 0
+    deadline = time.perf_counter() + duration_s
+
+    async def worker() -> None:
+        nonlocal done
+        while time.perf_counter() < deadline:
+            await call()
+            done += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return done / (time.perf_counter() - started)
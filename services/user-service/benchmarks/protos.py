@@ -0,0 +1,30 @@
+"""Генерация user_pb2 для запуска бенчмарков вне Docker-образа.
+
+Сгенерированные модули кладутся во временный каталог с той же структурой пакетов;
+так как пакеты app/ - namespace-пакеты, Python объединяет обе части.
+"""
+import os
+import sys
+import tempfile
+
+from grpc_tools import protoc
+
+PROTO_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..", "..", "proto"))
+
+
+def ensure_generated() -> None:
+    try:
+        from infrastructure.adapters.inbound.grpc import user_pb2  # noqa: F401
+        return
+    except ImportError:
+        pass
+    root = tempfile.mkdtemp(prefix="user-service-protos-")
+    out = os.path.join(root, "infrastructure", "adapters", "inbound", "grpc")
+    os.makedirs(out)
+    protoc.main(["protoc", f"-I{PROTO_DIR}", f"--python_out={out}", f"--grpc_python_out={out}", os.path.join(PROTO_DIR, "user.proto")])
+    grpc_module = os.path.join(out, "user_pb2_grpc.py")
+    with open(grpc_module) as f:
+        source = f.read().replace("import user_pb2 as user__pb2", "from . import user_pb2 as user__pb2")
+    with open(grpc_module, "w") as f:
+        f.write(source)
+    sys.path.insert(0, root)
@@ -0,0 +1,389 @@
+"""Потоковый экспорт и импорт коллекции MongoDB в NDJSON (опционально gzip).
+
+Экспорт делит пространство _id (UUID) на равные диапазоны: для uuid4 они
+заполнены равномерно. Каждый диапазон пишется в свой файл part-NNNNN.ndjson[.gz]
+курсором по индексу _id, сегментами по segment_size документов; после каждого
+сегмента фиксируется чекпоинт (последний _id и длина файла). Сегмент в gzip -
+отдельный member, поэтому файл, обрезанный по чекпоинту, остаётся корректным, а
+повторный запуск той же команды продолжает с места остановки.
+
+Импорт читает файлы пачками в потоке, пишет insert_many(ordered=False) и хранит
+в чекпоинте число обработанных строк. Повторная вставка уже записанных документов
+даёт только ошибки дубликата, так что возобновление идемпотентно.
+
+Документы в обе стороны проходят через normalize сервиса (доменная модель и
+обратно), так что формат в файле совпадает с тем, что пишет репозиторий.
+Память постоянна: в каждой задаче не больше одной пачки курсора и одного сегмента.
+"""
+import argparse
+import asyncio
+import gzip
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import asdict, dataclass
+from datetime import datetime
+from multiprocessing import get_context
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+from uuid import UUID
+
+from bson.binary import Binary, UUID_SUBTYPE
+from pymongo.errors import BulkWriteError
+from structlog import get_logger
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - orjson ускоряет сериализацию и разбор, но не обязателен
+    orjson = None
+
+logger = get_logger(__name__)
+
+DUPLICATE_KEY_ERROR = 11000
+MANIFEST = "manifest.json"
+
+# Возвращает (клиент, коллекция); вызывается в каждом процессе-воркере
+OpenCollection = Callable[[], Tuple[object, object]]
+Normalize = Callable[[dict], dict]
+
+
+def _json_default(value):
+    if isinstance(value, Binary) and value.subtype == UUID_SUBTYPE:
+        return str(UUID(bytes=bytes(value)))
+    if isinstance(value, UUID):
+        return str(value)
+    if isinstance(value, datetime):
+        return value.isoformat()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def _dumps(record: dict) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(record, default=_json_default)
+    return json.dumps(record, default=_json_default, ensure_ascii=False, separators=(",", ":")).encode()
+
+
+_loads = orjson.loads if orjson is not None else json.loads
+
+
+def uuid_partitions(count: int) -> List[Tuple[Optional[Binary], Optional[Binary]]]:
+    """Границы [lo, hi) равных диапазонов 128-битного пространства _id; None - без границы."""
+    step = (1 << 128) // count
+    bounds = [Binary(UUID(int=step * index).bytes, UUID_SUBTYPE) for index in range(1, count)]
+    return list(zip([None] + bounds, bounds + [None]))
+
+
+def _read_json(path: Path) -> Optional[dict]:
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return None
+
+
+def _write_json(path: Path, data: dict) -> None:
+    # Атомарная замена: прерванная запись не оставляет битый чекпоинт
+    tmp = path.with_name(path.name + ".tmp")
+    with open(tmp, "w") as f:
+        json.dump(data, f)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
+
+
+@dataclass
+class ExportCheckpoint:
+    last_id: Optional[str] = None
+    offset: int = 0
+    count: int = 0
+    done: bool = False
+
+
+@dataclass
+class ImportCheckpoint:
+    lines: int = 0
+    inserted: int = 0
+    duplicates: int = 0
+    errors: int = 0
+    done: bool = False
+
+
+def _append_segment(raw, data: bytes, compress: bool, level: int) -> int:
+    if compress:
+        data = gzip.compress(data, compresslevel=level)
+    raw.write(data)
+    raw.flush()
+    os.fsync(raw.fileno())
+    return raw.tell()
+
+
+async def export_partition(
+    collection,
+    normalize: Normalize,
+    path: Path,
+    bounds: Tuple[Optional[Binary], Optional[Binary]],
+    batch_size: int,
+    segment_size: int,
+    compress: bool,
+    level: int,
+) -> ExportCheckpoint:
+    checkpoint_path = path.with_name(path.name + ".checkpoint")
+    state = ExportCheckpoint(**(_read_json(checkpoint_path) or {}))
+    if state.done:
+        return state
+    lo, hi = bounds
+    id_range = {}
+    if state.last_id is not None:
+        id_range["$gt"] = Binary(UUID(state.last_id).bytes, UUID_SUBTYPE)
+    elif lo is not None:
+        id_range["$gte"] = lo
+    if hi is not None:
+        id_range["$lt"] = hi
+    query = {"_id": id_range} if id_range else {}
+
+    raw = open(path, "r+b" if path.exists() else "wb")
+    try:
+        # Всё, что записано после последнего чекпоинта, будет выгружено заново
+        raw.truncate(state.offset)
+        raw.seek(state.offset)
+        cursor = collection.find(query, sort=[("_id", 1)], batch_size=batch_size)
+        lines = []
+        last_id = None
+
+        async def flush() -> None:
+            data = b"\n".join(lines) + b"\n"
+            # Сжатие и fsync - вне event loop: zlib отпускает GIL, остальные разделы продолжают читать
+            state.offset = await asyncio.to_thread(_append_segment, raw, data, compress, level)
+            state.count += len(lines)
+            state.last_id = str(last_id)
+            _write_json(checkpoint_path, asdict(state))
+            lines.clear()
+
+        try:
+            async for document in cursor:
+                record = normalize(document)
+                last_id = document["_id"] if isinstance(document["_id"], UUID) else UUID(bytes=bytes(document["_id"]))
+                lines.append(_dumps(record))
+                if len(lines) >= segment_size:
+                    await flush()
+            if lines:
+                await flush()
+        finally:
+            await cursor.close()
+        state.done = True
+        _write_json(checkpoint_path, asdict(state))
+        return state
+    finally:
+        raw.close()
+
+
+def _open_text(path: Path):
+    return gzip.open(path, "rt", encoding="utf-8") if path.suffix == ".gz" else open(path, encoding="utf-8")
+
+
+def _read_lines(f, count: int) -> List[str]:
+    lines = []
+    for line in f:
+        if line.strip():
+            lines.append(line)
+            if len(lines) >= count:
+                break
+    return lines
+
+
+def _skip_lines(f, count: int) -> None:
+    # Пустые строки не учитываются, как и в _read_lines
+    skipped = 0
+    while skipped < count:
+        line = f.readline()
+        if not line:
+            return
+        if line.strip():
+            skipped += 1
+
+
+async def import_file(
+    collection,
+    normalize: Normalize,
+    path: Path,
+    checkpoint_path: Path,
+    batch_size: int,
+) -> ImportCheckpoint:
+    state = ImportCheckpoint(**(_read_json(checkpoint_path) or {}))
+    if state.done:
+        return state
+    log = logger.bind(file=str(path))
+    f = _open_text(path)
+    pending = None
+    try:
+        await asyncio.to_thread(_skip_lines, f, state.lines)
+        # Следующая пачка читается из файла, пока текущая пишется в MongoDB
+        pending = asyncio.ensure_future(asyncio.to_thread(_read_lines, f, batch_size))
+        while True:
+            lines = await pending
+            if not lines:
+                break
+            pending = asyncio.ensure_future(asyncio.to_thread(_read_lines, f, batch_size))
+            documents = []
+            for offset, line in enumerate(lines, start=1):
+                try:
+                    documents.append(normalize(_loads(line)))
+                except (ValueError, KeyError, TypeError, AttributeError) as e:
+                    state.errors += 1
+                    log.warning("Skipping invalid record", record=state.lines + offset, error=str(e))
+            inserted = len(documents)
+            if documents:
+                try:
+                    await collection.insert_many(documents, ordered=False)
+                except BulkWriteError as e:
+                    for error in e.details.get("writeErrors", []):
+                        inserted -= 1
+                        if error.get("code") == DUPLICATE_KEY_ERROR:
+                            state.duplicates += 1
+                        else:
+                            state.errors += 1
+            state.inserted += inserted
+            state.lines += len(lines)
+            _write_json(checkpoint_path, asdict(state))
+        state.done = True
+        _write_json(checkpoint_path, asdict(state))
+        return state
+    finally:
+        # Поток чтения нельзя отменить - дожидаемся его, прежде чем закрыть файл
+        if pending is not None:
+            await asyncio.wait([pending])
+        f.close()
+
+
+@dataclass(frozen=True)
+class _Unit:
+    kind: str
+    path: str
+    checkpoint: str = ""
+    bounds: Tuple[Optional[bytes], Optional[bytes]] = (None, None)
+
+
+async def _run_units(units: List[_Unit], open_collection: OpenCollection, normalize: Normalize, options: dict) -> Dict[str, dict]:
+    client, collection = open_collection()
+    slots = asyncio.Semaphore(options["concurrency"])
+
+    async def run(unit: _Unit) -> Tuple[str, dict]:
+        async with slots:
+            log = logger.bind(file=unit.path)
+            log.info(f"Starting {unit.kind}")
+            if unit.kind == "export":
+                lo, hi = (Binary(bound, UUID_SUBTYPE) if bound is not None else None for bound in unit.bounds)
+                state = await export_partition(
+                    collection, normalize, Path(unit.path), (lo, hi),
+                    options["batch_size"], options["segment_size"], options["compress"], options["compress_level"],
+                )
+            else:
+                state = await import_file(collection, normalize, Path(unit.path), Path(unit.checkpoint), options["batch_size"])
+            log.info(f"Finished {unit.kind}", **asdict(state))
+            return unit.path, asdict(state)
+
+    try:
+        return dict(await asyncio.gather(*(run(unit) for unit in units)))
+    finally:
+        await client.close()
+
+
+def _worker_main(units, open_collection, normalize, options, init) -> Dict[str, dict]:
+    teardown = init() if init is not None else None
+    try:
+        return asyncio.run(_run_units(units, open_collection, normalize, options))
+    finally:
+        if teardown is not None:
+            teardown()
+
+
+def _run(units: List[_Unit], open_collection: OpenCollection, normalize: Normalize, options: dict, workers: int, init) -> Dict[str, dict]:
+    if workers <= 1 or len(units) <= 1:
+        return asyncio.run(_run_units(units, open_collection, normalize, options))
+    # Отдельные процессы: разбор и сериализация JSON упираются в GIL одного интерпретатора
+    shards = [units[index::workers] for index in range(workers) if units[index::workers]]
+    results = {}
+    with ProcessPoolExecutor(max_workers=len(shards), mp_context=get_context("spawn")) as pool:
+        futures = [pool.submit(_worker_main, shard, open_collection, normalize, options, init) for shard in shards]
+        for future in futures:
+            results.update(future.result())
+    return results
+
+
+def _export_units(out_dir: Path, collection_name: str, partitions: int, compress: bool, restart: bool) -> List[_Unit]:
+    out_dir.mkdir(parents=True, exist_ok=True)
+    manifest = {"collection": collection_name, "partitions": partitions, "compress": compress}
+    existing = _read_json(out_dir / MANIFEST)
+    if restart or existing is None:
+        for stale in out_dir.glob("part-*"):
+            stale.unlink()
+        _write_json(out_dir / MANIFEST, manifest)
+    elif existing != manifest:
+        raise ValueError(f"{out_dir} holds an export with {existing}; use --restart to overwrite it")
+    suffix = ".ndjson.gz" if compress else ".ndjson"
+    return [
+        _Unit("export", str(out_dir / f"part-{index:05d}{suffix}"), bounds=tuple(bytes(bound) if bound is not None else None for bound in bounds))
+        for index, bounds in enumerate(uuid_partitions(partitions))
+    ]
+
+
+def _import_units(inputs: List[str], checkpoint_dir: Optional[str], restart: bool) -> List[_Unit]:
+    files = []
+    for item in map(Path, inputs):
+        if item.is_dir():
+            files.extend(sorted(p for p in item.glob("part-*.ndjson*") if p.name.endswith((".ndjson", ".ndjson.gz"))))
+        else:
+            files.append(item)
+    units = []
+    for path in files:
+        checkpoint = Path(checkpoint_dir or path.parent) / f"{path.name}.import-checkpoint"
+        if restart and checkpoint.exists():
+            checkpoint.unlink()
+        units.append(_Unit("import", str(path), checkpoint=str(checkpoint)))
+    return units
+
+
+def run_cli(argv: List[str], collection_name: str, open_collection: OpenCollection, normalize: Normalize, init=None) -> int:
+    """Точка входа CLI сервиса. open_collection, normalize и init должны быть функциями уровня модуля:
+    при --workers > 1 они передаются в процессы-воркеры."""
+    parser = argparse.ArgumentParser(description=f"NDJSON export/import of the {collection_name} collection")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    export = commands.add_parser("export", help="stream the collection into part files of a directory")
+    export.add_argument("output", help="directory for part-NNNNN.ndjson[.gz] files")
+    export.add_argument("--partitions", type=int, default=8, help="_id ranges, one file each")
+    export.add_argument("--no-gzip", dest="compress", action="store_false")
+    export.add_argument("--compress-level", type=int, default=6)
+    export.add_argument("--segment-size", type=int, default=10000, help="documents between checkpoints")
+
+    load = commands.add_parser("import", help="stream NDJSON files (or export directories) into the collection")
+    load.add_argument("inputs", nargs="+")
+    load.add_argument("--checkpoint-dir", help="defaults to the directory of each input file")
+
+    for command in (export, load):
+        command.add_argument("--batch-size", type=int, default=1000, help="cursor batch / insert_many size")
+        command.add_argument("--concurrency", type=int, default=4, help="files processed at once per worker")
+        command.add_argument("--workers", type=int, default=1, help="worker processes")
+        command.add_argument("--restart", action="store_true", help="ignore checkpoints and start over")
+
+    args = parser.parse_args(argv)
+    options = {
+        "batch_size": args.batch_size,
+        "concurrency": args.concurrency,
+        "segment_size": getattr(args, "segment_size", 0),
+        "compress": getattr(args, "compress", False),
+        "compress_level": getattr(args, "compress_level", 6),
+    }
+    if args.command == "export":
+        units = _export_units(Path(args.output), collection_name, args.partitions, args.compress, args.restart)
+    else:
+        units = _import_units(args.inputs, args.checkpoint_dir, args.restart)
+
+    results = _run(units, open_collection, normalize, options, args.workers, init)
+    totals: Dict[str, int] = {}
+    for state in results.values():
+        for key, value in state.items():
+            if not isinstance(value, bool) and isinstance(value, int) and key != "offset":
+                totals[key] = totals.get(key, 0) + value
+    logger.info(f"{args.command.capitalize()} of {collection_name} completed", files=len(results), **totals)
+    return 0
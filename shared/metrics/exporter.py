@@ -0,0 +1,34 @@
+"""HTTP-эндпоинт /metrics в текстовом формате Prometheus поверх asyncio.start_server."""
+import asyncio
+from typing import Optional
+
+from shared.metrics.registry import REGISTRY, MetricsRegistry
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+async def _handle(reader: asyncio.StreamReader, writer: asyncio.StreamWriter, registry: MetricsRegistry) -> None:
+    try:
+        request_line = await asyncio.wait_for(reader.readline(), timeout=5)
+        # Заголовки запроса не нужны, но их нужно вычитать до ответа
+        while (await asyncio.wait_for(reader.readline(), timeout=5)) not in (b"\r\n", b"\n", b""):
+            pass
+        parts = request_line.decode("latin-1").split()
+        if len(parts) >= 2 and parts[0] == "GET" and parts[1].split("?")[0] in ("/metrics", "/"):
+            status, body, content_type = "200 OK", registry.render().encode(), CONTENT_TYPE
+        else:
+            status, body, content_type = "404 Not Found", b"not found\n", "text/plain"
+        writer.write(
+            f"HTTP/1.1 {status}\r\nContent-Type: {content_type}\r\nContent-Length: {len(body)}\r\nConnection: close\r\n\r\n".encode()
+            + body
+        )
+        await writer.drain()
+    except (asyncio.TimeoutError, ConnectionError):
+        pass
+    finally:
+        writer.close()
+
+
+async def start_metrics_server(port: int, host: str = "0.0.0.0", registry: Optional[MetricsRegistry] = None) -> asyncio.AbstractServer:
+    registry = registry or REGISTRY
+    return await asyncio.start_server(lambda r, w: _handle(r, w, registry), host, port)
@@ -0,0 +1,88 @@
+"""Общие для сервисов семейства метрик и декораторы для их записи."""
+import time
+from functools import wraps
+from typing import Callable
+
+import grpc
+
+from shared.metrics.registry import Counter, Histogram
+
+GRPC_SERVER_HANDLED = Counter(
+    "grpc_server_handled_total", "RPCs completed on the server, by method and status code",
+    ["grpc_service", "grpc_method", "grpc_code"],
+)
+GRPC_SERVER_HANDLING_SECONDS = Histogram(
+    "grpc_server_handling_seconds", "RPC handling latency on the server",
+    ["grpc_service", "grpc_method"],
+)
+GRPC_CLIENT_HANDLED = Counter(
+    "grpc_client_handled_total", "Outbound RPCs completed, by method and status code",
+    ["grpc_service", "grpc_method", "grpc_code"],
+)
+GRPC_CLIENT_HANDLING_SECONDS = Histogram(
+    "grpc_client_handling_seconds", "Outbound RPC latency",
+    ["grpc_service", "grpc_method"],
+)
+DATASTORE_OPERATION_SECONDS = Histogram(
+    "datastore_operation_seconds", "Latency of MongoDB commands and Redis operations",
+    ["system", "operation"],
+)
+DATASTORE_OPERATION_ERRORS = Counter(
+    "datastore_operation_errors_total", "Failed MongoDB commands and Redis operations",
+    ["system", "operation"],
+)
+
+
+def record_server_rpc(service: str, method: str, code: grpc.StatusCode, duration_s: float) -> None:
+    GRPC_SERVER_HANDLED.labels(service, method, code.name).inc()
+    GRPC_SERVER_HANDLING_SECONDS.labels(service, method).observe(duration_s)
+
+
+def track_datastore_operation(system: str, operation: str) -> Callable:
+    """Декоратор для методов адаптеров, выполняющих ровно одну операцию хранилища."""
+    def decorator(func: Callable) -> Callable:
+        latency = DATASTORE_OPERATION_SECONDS.labels(system, operation)
+        errors = DATASTORE_OPERATION_ERRORS.labels(system, operation)
+
+        @wraps(func)
+        async def wrapper(*args, **kwargs):
+            start_time = time.perf_counter()
+            try:
+                return await func(*args, **kwargs)
+            except Exception:
+                errors.inc()
+                raise
+            finally:
+                latency.observe(time.perf_counter() - start_time)
+        return wrapper
+    return decorator
+
+
+def _split_method(full_method) -> tuple:
+    if isinstance(full_method, bytes):
+        full_method = full_method.decode()
+    _, service, method = full_method.split("/", 2)
+    return service, method
+
+
+class ClientMetricsInterceptor(grpc.aio.UnaryUnaryClientInterceptor):
+    """Латентность и код ответа каждого исходящего unary-вызова канала."""
+
+    async def intercept_unary_unary(self, continuation, client_call_details, request):
+        service, method = _split_method(client_call_details.method)
+        start_time = time.perf_counter()
+        # Остаётся только если вызов отменён до получения статуса
+        code = grpc.StatusCode.CANCELLED
+        try:
+            call = await continuation(client_call_details, request)
+            code = await call.code()
+        except grpc.RpcError as e:
+            code = e.code()
+            raise
+        except Exception:
+            code = grpc.StatusCode.UNKNOWN
+            raise
+        finally:
+            GRPC_CLIENT_HANDLING_SECONDS.labels(service, method).observe(time.perf_counter() - start_time)
+            GRPC_CLIENT_HANDLED.labels(service, method, code.name).inc()
+        return call
@@ -0,0 +1,21 @@
+"""Метрики MongoDB через command monitoring pymongo: длительность каждой команды драйвера."""
+from pymongo import monitoring
+
+from shared.metrics.instruments import DATASTORE_OPERATION_ERRORS, DATASTORE_OPERATION_SECONDS
+
+# Служебные команды handshake/heartbeat не интересны
+_IGNORED_COMMANDS = {"hello", "ismaster", "isMaster", "ping", "saslStart", "saslContinue", "endSessions"}
+
+
+class MongoCommandMetricsListener(monitoring.CommandListener):
+    def started(self, event: monitoring.CommandStartedEvent) -> None:
+        pass
+
+    def succeeded(self, event: monitoring.CommandSucceededEvent) -> None:
+        if event.command_name not in _IGNORED_COMMANDS:
+            DATASTORE_OPERATION_SECONDS.labels("mongo", event.command_name).observe(event.duration_micros / 1e6)
+
+    def failed(self, event: monitoring.CommandFailedEvent) -> None:
+        if event.command_name not in _IGNORED_COMMANDS:
+            DATASTORE_OPERATION_SECONDS.labels("mongo", event.command_name).observe(event.duration_micros / 1e6)
+            DATASTORE_OPERATION_ERRORS.labels("mongo", event.command_name).inc()
@@ -0,0 +1,185 @@
+"""Декларативные индексы репозиториев MongoDB и проверка планов запросов.
+
+Репозиторий объявляет INDEXES (что должно существовать) и QUERY_SHAPES (какими
+запросами он обращается к коллекции). При старте сервиса ensure_indexes
+достраивает недостающие индексы; find_collection_scans прогоняет explain() для каждой
+формы запроса и находит планы с полным сканированием коллекции (COLLSCAN).
+
+Индекс с изменившимися опциями при старте только считается проблемным: MongoDB не держит
+два индекса с одним ключом и разными unique/sparse, поэтому замена возможна лишь через
+удаление, а пока новый строится, уникальность не проверяется. Это разовая миграция -
+команда rebuild из run_index_cli, запускаемая одним процессом, а не каждым воркером при старте.
+"""
+import argparse
+import asyncio
+from dataclasses import dataclass, field
+from typing import Callable, List, Optional, Sequence, Set, Tuple
+
+from pymongo.errors import OperationFailure
+from structlog import get_logger
+
+logger = get_logger(__name__)
+
+INDEX_NOT_FOUND = 27
+
+# Фоновые задачи обслуживания индексов; ссылки держим, чтобы задачи не собрал GC
+_background_tasks: Set[asyncio.Task] = set()
+
+
+class IndexCheckError(RuntimeError):
+    pass
+
+
+@dataclass(frozen=True)
+class IndexSpec:
+    keys: Tuple[Tuple[str, int], ...]
+    name: str
+    unique: bool = False
+    sparse: bool = False
+    partial_filter: Optional[dict] = None
+
+    def options(self) -> dict:
+        options = {"name": self.name}
+        if self.unique:
+            options["unique"] = True
+        if self.sparse:
+            options["sparse"] = True
+        if self.partial_filter is not None:
+            options["partialFilterExpression"] = self.partial_filter
+        return options
+
+    def matches(self, existing: dict) -> bool:
+        return (
+            list(existing["key"].items()) == list(self.keys)
+            and bool(existing.get("unique")) == self.unique
+            and bool(existing.get("sparse")) == self.sparse
+            and (existing.get("partialFilterExpression") or None) == self.partial_filter
+        )
+
+
+@dataclass(frozen=True)
+class QueryShape:
+    """Форма запроса репозитория с примером значений: по ней строится explain()."""
+    name: str
+    filter: dict
+    sort: Optional[List[Tuple[str, int]]] = field(default=None)
+    projection: Optional[dict] = field(default=None)
+
+
+async def ensure_indexes(collection, specs: Sequence[IndexSpec]) -> List[str]:
+    """Идемпотентно строит недостающие индексы из specs; возвращает имена индексов, которые не соответствуют specs."""
+    log = logger.bind(collection=collection.name)
+    existing = {index["name"]: index async for index in await collection.list_indexes()}
+    failed = []
+    for spec in specs:
+        current = existing.get(spec.name)
+        if current is not None:
+            if not spec.matches(current):
+                log.error("Index options differ from the spec, run the index rebuild migration", index=spec.name, current=dict(current), expected=spec.options())
+                failed.append(spec.name)
+            continue
+        try:
+            # Начиная с MongoDB 4.2 сборка не блокирует коллекцию на всё время построения
+            await collection.create_index(list(spec.keys), **spec.options())
+            log.info("Index ensured", index=spec.name)
+        except OperationFailure as e:
+            log.error("Failed to build index", index=spec.name, error=str(e))
+            failed.append(spec.name)
+    return failed
+
+
+async def rebuild_indexes(collection, specs: Sequence[IndexSpec], names: Sequence[str]) -> None:
+    """Разовая миграция: удаляет и заново строит индексы names по specs.
+
+    Пока индекс строится заново, его ограничения (unique) не действуют - запускать одним
+    процессом, в окно обслуживания.
+    """
+    log = logger.bind(collection=collection.name)
+    by_name = {spec.name: spec for spec in specs}
+    unknown = [name for name in names if name not in by_name]
+    if unknown:
+        raise IndexCheckError(f"{collection.name}: no index specs named {unknown}")
+    for name in names:
+        spec = by_name[name]
+        try:
+            await collection.drop_index(name)
+        except OperationFailure as e:
+            if e.code != INDEX_NOT_FOUND:
+                raise
+        await collection.create_index(list(spec.keys), **spec.options())
+        log.info("Index rebuilt", index=name, options=spec.options())
+
+
+def _has_stage(plan, stage: str) -> bool:
+    if isinstance(plan, dict):
+        return plan.get("stage") == stage or any(_has_stage(value, stage) for value in plan.values())
+    if isinstance(plan, list):
+        return any(_has_stage(item, stage) for item in plan)
+    return False
+
+
+async def find_collection_scans(collection, shapes: Sequence[QueryShape]) -> List[str]:
+    """Имена форм запросов, чей выигравший план содержит COLLSCAN."""
+    scans = []
+    for shape in shapes:
+        explained = await collection.find(shape.filter, shape.projection, sort=shape.sort).explain()
+        if _has_stage(explained["queryPlanner"]["winningPlan"], "COLLSCAN"):
+            scans.append(shape.name)
+    return scans
+
+
+async def maintain_indexes(collection, specs: Sequence[IndexSpec], shapes: Sequence[QueryShape], check: str) -> None:
+    """check: off - только построение индексов, warn - предупреждение о COLLSCAN, fail - IndexCheckError."""
+    log = logger.bind(collection=collection.name)
+    failed = await ensure_indexes(collection, specs)
+    if check == "off":
+        return
+    scans = await find_collection_scans(collection, shapes)
+    if not failed and not scans:
+        log.info("Index self-check passed", queries=len(shapes))
+        return
+    if check == "fail":
+        raise IndexCheckError(f"{collection.name}: failed indexes {failed}, COLLSCAN in {scans}")
+    log.warning("Index self-check found problems", failed_indexes=failed, collection_scans=scans)
+
+
+async def start_index_maintenance(collection, specs: Sequence[IndexSpec], shapes: Sequence[QueryShape], check: str) -> None:
+    """В режиме fail старт сервиса ждёт индексы и проверку, иначе они выполняются в фоне."""
+    if check == "fail":
+        await maintain_indexes(collection, specs, shapes, check)
+        return
+
+    async def run() -> None:
+        try:
+            await maintain_indexes(collection, specs, shapes, check)
+        except Exception as e:
+            logger.error("Index maintenance failed", collection=collection.name, error=str(e))
+
+    task = asyncio.create_task(run())
+    _background_tasks.add(task)
+    task.add_done_callback(_background_tasks.discard)
+
+
+def run_index_cli(argv: List[str], open_collection: Callable, specs: Sequence[IndexSpec], shapes: Sequence[QueryShape]) -> int:
+    """Точка входа index_cli сервиса: check - построить недостающие индексы и проверить планы, rebuild - миграция."""
+    parser = argparse.ArgumentParser(description="Index maintenance")
+    commands = parser.add_subparsers(dest="command", required=True)
+    commands.add_parser("check", help="build missing indexes and report option drift and COLLSCAN plans")
+    rebuild = commands.add_parser("rebuild", help="drop and rebuild indexes whose options changed (one-off migration)")
+    rebuild.add_argument("names", nargs="+", help="index names from the repository INDEXES")
+    args = parser.parse_args(argv)
+
+    async def run() -> int:
+        client, collection = open_collection()
+        try:
+            if args.command == "rebuild":
+                await rebuild_indexes(collection, specs, args.names)
+            await maintain_indexes(collection, specs, shapes, "fail")
+            return 0
+        except IndexCheckError as e:
+            logger.error("Index check failed", error=str(e))
+            return 1
+        finally:
+            await client.close()
+
+    return asyncio.run(run())
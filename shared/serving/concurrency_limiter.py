@@ -0,0 +1,112 @@
+"""Адаптивный лимит конкурентности по градиенту задержки (по мотивам Gradient2 из Netflix concurrency-limits).
+
+Лимит сравнивает текущую задержку с долгосрочной базовой: пока они близки, лимит
+растёт на sqrt(limit) (допустимая очередь), при росте задержки - уменьшается
+пропорционально градиенту. Запросы сверх лимита отклоняются сразу. Базовая
+задержка запоминается с первого окна, поэтому начальный лимит стоит выбирать
+ниже ожидаемой ёмкости: вверх лимит находит сам.
+
+Все вызовы выполняются из потока event loop, поэтому блокировки не нужны.
+"""
+import math
+from typing import Dict, Optional, Tuple
+
+from shared.metrics.registry import Counter, Gauge
+
+CONCURRENCY_LIMIT = Gauge("concurrency_limit", "Current adaptive concurrency limit", ["limit_class"])
+CONCURRENCY_IN_FLIGHT = Gauge("concurrency_in_flight", "RPCs currently admitted by the limiter", ["limit_class"])
+CONCURRENCY_SHED = Counter("concurrency_shed_total", "RPCs rejected with RESOURCE_EXHAUSTED by the limiter", ["limit_class"])
+
+
+class AdaptiveConcurrencyLimiter:
+    def __init__(
+        self,
+        name: str,
+        initial_limit: int = 20,
+        min_limit: int = 1,
+        max_limit: int = 1000,
+        smoothing: float = 0.2,
+        rtt_tolerance: float = 1.5,
+        window_size: int = 20,
+        long_window: int = 600,
+    ):
+        self.name = name
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.smoothing = smoothing
+        self.rtt_tolerance = rtt_tolerance
+        self.window_size = window_size
+        self.long_window = long_window
+        self.limit = float(min(max(initial_limit, min_limit), max_limit))
+        self.in_flight = 0
+        self.shed = 0
+        self._long_rtt: Optional[float] = None
+        self._short_rtt = 0.0
+        self._window_sum = 0.0
+        self._window_count = 0
+        self._window_max_in_flight = 0
+        CONCURRENCY_LIMIT.labels(name).set_function(lambda: int(self.limit))
+        CONCURRENCY_IN_FLIGHT.labels(name).set_function(lambda: self.in_flight)
+        self._shed_counter = CONCURRENCY_SHED.labels(name)
+
+    def try_acquire(self) -> bool:
+        if self.in_flight >= int(self.limit):
+            self.shed += 1
+            self._shed_counter.inc()
+            return False
+        self.in_flight += 1
+        return True
+
+    def release(self, rtt: Optional[float] = None) -> None:
+        """Освобождает слот; rtt=None - вызов без полезного замера (стрим, отмена)."""
+        in_flight = self.in_flight
+        self.in_flight -= 1
+        if rtt is None:
+            return
+        # Лимит пересчитывается раз в окно по средней задержке, а не на каждый вызов:
+        # так отдельные выбросы не двигают лимит, а long_window измеряется в окнах
+        self._window_sum += rtt
+        self._window_count += 1
+        self._window_max_in_flight = max(self._window_max_in_flight, in_flight)
+        if self._window_count >= self.window_size:
+            self._update(self._window_sum / self._window_count, self._window_max_in_flight)
+            self._window_sum = 0.0
+            self._window_count = 0
+            self._window_max_in_flight = 0
+
+    def _update(self, short_rtt: float, in_flight: int) -> None:
+        self._short_rtt = short_rtt
+        if self._long_rtt is None:
+            self._long_rtt = short_rtt
+            return
+        self._long_rtt += (short_rtt - self._long_rtt) / self.long_window
+        # После перегрузки базовая задержка завышена - ускоренно возвращаем её к текущей
+        if self._long_rtt / short_rtt > 2:
+            self._long_rtt *= 0.95
+
+        # Лимит не используется и наполовину - окно не говорит о том, выдержим ли больше
+        if in_flight < self.limit / 2:
+            return
+
+        gradient = max(0.5, min(1.0, self.rtt_tolerance * self._long_rtt / short_rtt))
+        new_limit = self.limit * gradient + math.sqrt(self.limit)
+        self.limit = min(self.max_limit, max(self.min_limit, self.limit * (1 - self.smoothing) + new_limit * self.smoothing))
+
+    def stats(self) -> dict:
+        return {
+            "limit": int(self.limit),
+            "in_flight": self.in_flight,
+            "shed": self.shed,
+            "long_rtt_ms": (self._long_rtt or 0.0) * 1000,
+            "short_rtt_ms": self._short_rtt * 1000,
+        }
+
+
+def parse_concurrency_limits(spec: str) -> Dict[str, Tuple[int, int, int]]:
+    """Разбирает строку вида "default=20:2:500,password=4:1:64" (класс=начальный:минимум:максимум)."""
+    limits = {}
+    for item in filter(None, (part.strip() for part in spec.split(","))):
+        name, _, values = item.partition("=")
+        initial, min_limit, max_limit = (int(value) for value in values.split(":"))
+        limits[name.strip()] = (initial, min_limit, max_limit)
+    return limits
@@ -0,0 +1,30 @@
+"""Стандартный gRPC health-сервис (grpc.health.v1) с готовностью по окончании прогрева.
+
+До вызова mark_serving сервер и все его сервисы отвечают NOT_SERVING: балансировщик
+и проверки готовности не отправляют трафик на реплику, пока она прогревается.
+При остановке статус снова NOT_SERVING, пока сервер дожидается текущих RPC.
+"""
+from typing import Iterable
+
+import grpc
+from grpc_health.v1 import health, health_pb2, health_pb2_grpc
+
+# Интерсепторы сервисов пропускают health без обёрток: при перегрузке проверки не должны
+# получать RESOURCE_EXHAUSTED, а долгий Watch - занимать слот лимита
+HEALTH_SERVICE_NAME = health.SERVICE_NAME
+
+# Пустое имя - состояние сервера целиком
+_SERVER = ""
+
+
+async def add_health_servicer(server: grpc.aio.Server, service_names: Iterable[str]) -> health.aio.HealthServicer:
+    servicer = health.aio.HealthServicer()
+    for name in (_SERVER, *service_names):
+        await servicer.set(name, health_pb2.HealthCheckResponse.NOT_SERVING)
+    health_pb2_grpc.add_HealthServicer_to_server(servicer, server)
+    return servicer
+
+
+async def mark_serving(servicer: health.aio.HealthServicer, service_names: Iterable[str]) -> None:
+    for name in (_SERVER, *service_names):
+        await servicer.set(name, health_pb2.HealthCheckResponse.SERVING)
@@ -0,0 +1,142 @@
+"""Супервизор процессов-воркеров gRPC.
+
+Каждый воркер - отдельный интерпретатор со своим event loop, DI-контейнером и
+клиентами MongoDB/Redis; все воркеры слушают один порт через SO_REUSEPORT, ядро
+распределяет между ними входящие соединения.
+
+Воркеры запускаются методом spawn, а не fork: у супервизора уже работает поток
+логирования, а gRPC core не переживает fork после инициализации.
+"""
+import asyncio
+import multiprocessing
+import signal
+import time
+from typing import Callable, List, Optional
+
+from structlog import get_logger
+
+logger = get_logger(__name__)
+
+_mp = multiprocessing.get_context("spawn")
+
+HEARTBEAT_INTERVAL = 1.0
+# Воркер, проживший меньше этого времени, считается падающим при старте и перезапускается с задержкой
+MIN_HEALTHY_UPTIME = 10.0
+MAX_RESTART_BACKOFF = 30.0
+
+
+async def run_heartbeat(heartbeat, interval: float = HEARTBEAT_INTERVAL) -> None:
+    """Обновляет отметку живости из event loop: если цикл завис, супервизор это увидит."""
+    while True:
+        heartbeat.value = time.monotonic()
+        await asyncio.sleep(interval)
+
+
+def install_shutdown_handler(callback: Callable[[], None]) -> None:
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGTERM, signal.SIGINT):
+        loop.add_signal_handler(sig, callback)
+
+
+class _Worker:
+    def __init__(self, index: int):
+        self.index = index
+        # time.monotonic() на Linux общий для всех процессов хоста
+        self.heartbeat = _mp.Value("d", 0.0, lock=False)
+        self.process: Optional[multiprocessing.process.BaseProcess] = None
+        self.started_at = 0.0
+        self.next_start_at = 0.0
+        self.failures = 0
+        self.restarts = 0
+
+
+class WorkerSupervisor:
+    """Запускает workers процессов target(worker_index, heartbeat), следит за ними и перезапускает.
+
+    Воркер перезапускается, если процесс завершился или его heartbeat не обновлялся
+    дольше heartbeat_timeout. По SIGTERM/SIGINT супервизор пересылает SIGTERM воркерам
+    (они перестают принимать RPC и дожидаются текущих) и ждёт их не дольше shutdown_timeout.
+    """
+
+    def __init__(
+        self,
+        target: Callable,
+        workers: int,
+        heartbeat_timeout: float = 30.0,
+        shutdown_timeout: float = 15.0,
+        poll_interval: float = 1.0,
+    ):
+        self.target = target
+        self.workers: List[_Worker] = [_Worker(index) for index in range(workers)]
+        self.heartbeat_timeout = heartbeat_timeout
+        self.shutdown_timeout = shutdown_timeout
+        self.poll_interval = poll_interval
+        self._stopping = False
+        self.logger = logger.bind(component="WorkerSupervisor")
+
+    def _request_stop(self, signum, frame) -> None:
+        self._stopping = True
+
+    def _start(self, worker: _Worker) -> None:
+        now = time.monotonic()
+        # Время на запуск интерпретатора и контейнера засчитывается как живость
+        worker.heartbeat.value = now
+        worker.process = _mp.Process(target=self.target, args=(worker.index, worker.heartbeat), name=f"grpc-worker-{worker.index}")
+        worker.process.start()
+        worker.started_at = now
+        self.logger.info("Worker started", worker=worker.index, pid=worker.process.pid, restarts=worker.restarts)
+
+    def _schedule_restart(self, worker: _Worker, now: float) -> None:
+        if now - worker.started_at < MIN_HEALTHY_UPTIME:
+            worker.failures += 1
+        else:
+            worker.failures = 0
+        delay = min(MAX_RESTART_BACKOFF, 2 ** (worker.failures - 1)) if worker.failures else 0.0
+        worker.process = None
+        worker.next_start_at = now + delay
+        worker.restarts += 1
+        self.logger.warning("Worker scheduled for restart", worker=worker.index, delay_s=delay, failures=worker.failures)
+
+    def _check(self) -> None:
+        now = time.monotonic()
+        for worker in self.workers:
+            process = worker.process
+            if process is None:
+                if now >= worker.next_start_at:
+                    self._start(worker)
+                continue
+            if not process.is_alive():
+                self.logger.error("Worker exited", worker=worker.index, pid=process.pid, exitcode=process.exitcode)
+                self._schedule_restart(worker, now)
+            elif now - worker.heartbeat.value > self.heartbeat_timeout:
+                self.logger.error("Worker heartbeat timed out, killing", worker=worker.index, pid=process.pid,
+                                  silent_s=round(now - worker.heartbeat.value, 1))
+                process.kill()
+                process.join(5)
+                self._schedule_restart(worker, now)
+
+    def _drain(self) -> None:
+        alive = [worker.process for worker in self.workers if worker.process is not None and worker.process.is_alive()]
+        self.logger.info("Draining workers", count=len(alive), timeout_s=self.shutdown_timeout)
+        for process in alive:
+            process.terminate()
+        deadline = time.monotonic() + self.shutdown_timeout
+        for process in alive:
+            process.join(max(0.0, deadline - time.monotonic()))
+        for process in alive:
+            if process.is_alive():
+                self.logger.warning("Worker did not drain in time, killing", pid=process.pid)
+                process.kill()
+                process.join()
+
+    def run(self) -> None:
+        signal.signal(signal.SIGTERM, self._request_stop)
+        signal.signal(signal.SIGINT, self._request_stop)
+        self.logger.info("Supervisor started", workers=len(self.workers))
+        try:
+            while not self._stopping:
+                self._check()
+                time.sleep(self.poll_interval)
+        finally:
+            self._drain()
+        self.logger.info("Supervisor stopped")
@@ -0,0 +1,47 @@
+"""Прогрев воркера перед приёмом трафика.
+
+Без прогрева первые запросы после деплоя платят за ленивое создание пула MongoDB,
+соединение с Redis, handshake исходящих gRPC-каналов и холодный кэш - на каждом
+выкатывании это видно как всплеск p99. Шаги выполняются параллельно, каждый с общим
+таймаутом; неудачный шаг только логируется: прогрев - оптимизация, а не проверка
+зависимостей, и реплика всё равно становится готовой.
+"""
+import asyncio
+import time
+from typing import Awaitable, Callable, Dict
+
+from structlog import get_logger
+
+logger = get_logger(__name__)
+
+WarmupStep = Callable[[], Awaitable[None]]
+
+
+async def warm_mongo_pool(client, connections: int) -> None:
+    """Выбор сервера, handshake и до connections соединений пула: конкурентные ping занимают каждый своё.
+
+    Драйвер создаёт не больше maxConnecting соединений одновременно, остаток до minPoolSize
+    пул добирает сам в фоне.
+    """
+    await asyncio.gather(*(client.admin.command("ping") for _ in range(max(1, connections))))
+
+
+async def warm_redis(client) -> None:
+    await client.ping()
+
+
+async def _run_step(name: str, step: WarmupStep, timeout: float) -> None:
+    started = time.perf_counter()
+    try:
+        await asyncio.wait_for(step(), timeout)
+        logger.info("Warm-up step finished", step=name, duration_ms=f"{(time.perf_counter() - started) * 1000:.2f}")
+    except asyncio.TimeoutError:
+        logger.warning("Warm-up step timed out", step=name, timeout_s=timeout)
+    except Exception as e:
+        logger.warning("Warm-up step failed", step=name, error=str(e))
+
+
+async def run_warmup(steps: Dict[str, WarmupStep], timeout: float) -> None:
+    started = time.perf_counter()
+    await asyncio.gather(*(_run_step(name, step, timeout) for name, step in steps.items()))
+    logger.info("Warm-up finished", steps=list(steps), duration_ms=f"{(time.perf_counter() - started) * 1000:.2f}")